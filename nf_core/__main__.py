@@ -7,22 +7,17 @@ import sys
 import rich
 import rich.console
 import rich.logging
-import rich.traceback
 import rich_click as click
 
+# Only lightweight modules are imported here, so that `nf-core --help`, `--version` and shell completion start quickly.
+# Commands import what they need when they are run.
 from nf_core import __version__
-from nf_core.download import DownloadError
-from nf_core.modules.modules_repo import NF_CORE_MODULES_REMOTE
-from nf_core.params_file import ParamsFileBuilder
-from nf_core.utils import check_if_outdated, rich_force_colors, setup_nfcore_dir
+from nf_core.startup import check_if_outdated, rich_force_colors, setup_nfcore_dir
 
 # Set up logging as the root logger
 # Submodules should all traverse back to this
 log = logging.getLogger()
 
-# Set up .nfcore directory for storing files between sessions
-setup_nfcore_dir()
-
 # Set up nicer formatting of click cli help messages
 click.rich_click.MAX_WIDTH = 100
 click.rich_click.USE_RICH_MARKUP = True
@@ -66,19 +61,27 @@ click.rich_click.OPTION_GROUPS = {
 stderr = rich.console.Console(stderr=True, force_terminal=rich_force_colors())
 stdout = rich.console.Console(force_terminal=rich_force_colors())
 
-# Set up the rich traceback
-rich.traceback.install(console=stderr, width=200, word_wrap=True, extra_lines=1)
-
 
 # Define exceptions for which no traceback should be printed,
 # because they are actually preliminary, but intended program terminations.
 # (Custom exceptions are cleaner than `sys.exit(1)`, which we used before)
+# The exceptions are given by module and name, as their modules are only imported by the commands raising them.
+QUIET_EXCEPTIONS = {("nf_core.download", "DownloadError")}  # extend set as needed
+
+
 def selective_traceback_hook(exctype, value, traceback):
-    if exctype in {DownloadError}:  # extend set as needed
+    if any(
+        module in sys.modules and issubclass(exctype, getattr(sys.modules[module], name))
+        for module, name in QUIET_EXCEPTIONS
+    ):
         log.error(value)
     else:
+        import rich.traceback
+
         # print the colored traceback for all other exceptions with rich as usual
-        stderr.print(rich.traceback.Traceback.from_exception(exctype, value, traceback))
+        stderr.print(
+            rich.traceback.Traceback.from_exception(exctype, value, traceback, width=200, word_wrap=True, extra_lines=1)
+        )
 
 
 sys.excepthook = selective_traceback_hook
@@ -97,18 +100,37 @@ def run_nf_core():
             f"[grey39]    nf-core/tools version {__version__} - [link=https://nf-co.re]https://nf-co.re[/]",
             highlight=False,
         )
-        try:
-            is_outdated, _, remote_vers = check_if_outdated()
-            if is_outdated:
-                stderr.print(
-                    f"[bold bright_yellow]    There is a new version of nf-core/tools available! ({remote_vers})",
-                    highlight=False,
-                )
-        except Exception as e:
-            log.debug(f"Could not check latest version: {e}")
+        # Only use a cached or already fetched version here, the check must never delay the command
+        version_checked = os.environ.get("NFCORE_NO_VERSION_CHECK", False) or print_version_notice()
         stderr.print("\n")
+    else:
+        version_checked = True
     # Launch the click cli
-    nf_core_cli(auto_envvar_prefix="NFCORE")
+    try:
+        nf_core_cli(auto_envvar_prefix="NFCORE")
+    finally:
+        # Report a newer version at exit if the background check has finished by then
+        if not version_checked:
+            print_version_notice()
+
+
+def print_version_notice():
+    """Print a notice if a newer version of nf-core/tools is available, without waiting for the check.
+
+    Returns:
+        bool: True if the latest version was known
+    """
+    try:
+        is_outdated, _, remote_vers = check_if_outdated(timeout=0)
+    except Exception as e:
+        log.debug(f"Could not check latest version: {e}")
+        return False
+    if is_outdated:
+        stderr.print(
+            f"[bold bright_yellow]    There is a new version of nf-core/tools available! ({remote_vers})",
+            highlight=False,
+        )
+    return remote_vers is not None
 
 
 @click.group(context_settings=dict(help_option_names=["-h", "--help"]))
@@ -144,6 +166,9 @@ def nf_core_cli(ctx, verbose, hide_progress, log_file):
         log_fh.setFormatter(logging.Formatter("[%(asctime)s] %(name)-20s [%(levelname)-7s]  %(message)s"))
         log.addHandler(log_fh)
 
+    # Set up .nfcore directory for storing files between sessions
+    setup_nfcore_dir()
+
     ctx.obj = {
         "verbose": verbose,
         "hide_progress": hide_progress or verbose,  # Always hide progress bar with verbose logging
@@ -162,7 +187,8 @@ def nf_core_cli(ctx, verbose, hide_progress, log_file):
 )
 @click.option("--json", is_flag=True, default=False, help="Print full output as JSON")
 @click.option("--show-archived", is_flag=True, default=False, help="Print archived workflows")
-def list(keywords, sort, json, show_archived):
+@click.option("--offline", is_flag=True, default=False, help="Use the local copy of the list of pipelines")
+def list(keywords, sort, json, show_archived, offline):
     """
     List available nf-core pipelines with local info.
 
@@ -171,7 +197,7 @@ def list(keywords, sort, json, show_archived):
     """
     from nf_core.list import list_workflows
 
-    stdout.print(list_workflows(keywords, sort, json, show_archived))
+    stdout.print(list_workflows(keywords, sort, json, show_archived, offline))
 
 
 # nf-core launch
@@ -201,7 +227,16 @@ def list(keywords, sort, json, show_archived):
 @click.option(
     "-u", "--url", type=str, default="https://nf-co.re/launch", help="Customise the builder URL (for development work)"
 )
-def launch(pipeline, id, revision, command_only, params_in, params_out, save_all, show_hidden, url):
+@click.option(
+    "--no-prompts",
+    is_flag=True,
+    default=False,
+    help="Use the params from --params-in and the cached pipeline schema without prompting",
+)
+@click.option("--dry-run", is_flag=True, default=False, help="Show the Nextflow command without running it")
+def launch(
+    pipeline, id, revision, command_only, params_in, params_out, save_all, show_hidden, url, no_prompts, dry_run
+):
     """
     Launch a pipeline using a web GUI or command line prompts.
 
@@ -217,7 +252,9 @@ def launch(pipeline, id, revision, command_only, params_in, params_out, save_all
     """
     from nf_core.launch import Launch
 
-    launcher = Launch(pipeline, revision, command_only, params_in, params_out, save_all, show_hidden, url, id)
+    launcher = Launch(
+        pipeline, revision, command_only, params_in, params_out, save_all, show_hidden, url, id, no_prompts, dry_run
+    )
     if not launcher.launch_pipeline():
         sys.exit(1)
 
@@ -250,6 +287,8 @@ def create_params_file(pipeline, revision, output, force, show_hidden):
     Run using a remote pipeline name (such as GitHub `user/repo` or a URL),
     a local pipeline directory.
     """
+    from nf_core.params_file import ParamsFileBuilder
+
     builder = ParamsFileBuilder(pipeline, revision)
 
     if not builder.write_params_file(output, show_hidden=show_hidden, force=force):
@@ -267,7 +306,10 @@ def create_params_file(pipeline, revision, output, force, show_hidden):
 )
 @click.option("-o", "--outdir", type=str, help="Output directory")
 @click.option(
-    "-x", "--compress", type=click.Choice(["tar.gz", "tar.bz2", "zip", "none"]), help="Archive compression type"
+    "-x",
+    "--compress",
+    type=click.Choice(["tar.gz", "tar.bz2", "tar.zst", "zip", "none"]),
+    help="Archive compression type",
 )
 @click.option("-f", "--force", is_flag=True, default=False, help="Overwrite existing files")
 @click.option("-t", "--tower", is_flag=True, default=False, help="Download for seqeralabs® Nextflow Tower")
@@ -305,6 +347,30 @@ def create_params_file(pipeline, revision, output, force, show_hidden):
     help="List of images already available in a remote `singularity.cacheDir`.",
 )
 @click.option("-p", "--parallel-downloads", type=int, default=4, help="Number of parallel image downloads")
+@click.option(
+    "-m",
+    "--container-pull-method",
+    type=click.Choice(["singularity", "oci"]),
+    default="singularity",
+    help="Pull images with Singularity or fetch them as OCI image layout without Singularity.",
+)
+@click.option(
+    "--update",
+    is_flag=True,
+    default=False,
+    help="Update an existing download in `--outdir`: only fetch new revisions and images, prune unused images.",
+)
+@click.option(
+    "--pipelines-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Download all pipelines listed in this file, one per line and optionally followed by revisions.",
+)
+@click.option(
+    "--all-released",
+    is_flag=True,
+    default=False,
+    help="Download the latest release of all released nf-core pipelines.",
+)
 def download(
     pipeline,
     revision,
@@ -318,6 +384,10 @@ def download(
     container_cache_utilisation,
     container_cache_index,
     parallel_downloads,
+    container_pull_method,
+    update,
+    pipelines_file,
+    all_released,
 ):
     """
     Download a pipeline, nf-core/configs and pipeline singularity images.
@@ -325,7 +395,29 @@ def download(
     Collects all files in a single archive and configures the downloaded
     workflow to use relative paths to the configs and singularity images.
     """
-    from nf_core.download import DownloadWorkflow
+    from nf_core.download import DownloadWorkflow, DownloadWorkflowBatch
+
+    if pipelines_file or all_released:
+        if pipeline or revision or tower or update:
+            raise click.UsageError(
+                "A pipeline, `--revision`, `--tower` and `--update` can not be used with `--pipelines-file` or `--all-released`."
+            )
+        dl = DownloadWorkflowBatch(
+            pipelines_file,
+            all_released,
+            outdir,
+            compress,
+            force,
+            download_configuration,
+            container_system,
+            container_library,
+            container_cache_utilisation,
+            container_cache_index,
+            parallel_downloads,
+            container_pull_method,
+        )
+        dl.download_workflows()
+        return
 
     dl = DownloadWorkflow(
         pipeline,
@@ -340,6 +432,8 @@ def download(
         container_cache_utilisation,
         container_cache_index,
         parallel_downloads,
+        container_pull_method,
+        update,
     )
     dl.download_workflow()
 
@@ -494,8 +588,8 @@ def lint(ctx, dir, release, fix, key, show_passed, fail_ignored, fail_warned, ma
     "-g",
     "--git-remote",
     type=str,
-    default=NF_CORE_MODULES_REMOTE,
-    help="Remote git repo to fetch files from",
+    default=None,
+    help="Remote git repo to fetch files from [default: https://github.com/nf-core/modules.git]",
 )
 @click.option("-b", "--branch", type=str, default=None, help="Branch of git repository hosting modules.")
 @click.option(
@@ -514,6 +608,11 @@ def modules(ctx, git_remote, branch, no_pull):
     # by means other than the `if` block below)
     ctx.ensure_object(dict)
 
+    if git_remote is None:
+        from nf_core.modules.modules_repo import NF_CORE_MODULES_REMOTE
+
+        git_remote = NF_CORE_MODULES_REMOTE
+
     # Place the arguments in a context object
     ctx.obj["modules_repo_url"] = git_remote
     ctx.obj["modules_repo_branch"] = branch
@@ -526,8 +625,8 @@ def modules(ctx, git_remote, branch, no_pull):
     "-g",
     "--git-remote",
     type=str,
-    default=NF_CORE_MODULES_REMOTE,
-    help="Remote git repo to fetch files from",
+    default=None,
+    help="Remote git repo to fetch files from [default: https://github.com/nf-core/modules.git]",
 )
 @click.option("-b", "--branch", type=str, default=None, help="Branch of git repository hosting modules.")
 @click.option(
@@ -546,6 +645,11 @@ def subworkflows(ctx, git_remote, branch, no_pull):
     # by means other than the `if` block below)
     ctx.ensure_object(dict)
 
+    if git_remote is None:
+        from nf_core.modules.modules_repo import NF_CORE_MODULES_REMOTE
+
+        git_remote = NF_CORE_MODULES_REMOTE
+
     # Place the arguments in a context object
     ctx.obj["modules_repo_url"] = git_remote
     ctx.obj["modules_repo_branch"] = branch
@@ -1492,6 +1596,52 @@ def validate(pipeline, params):
         sys.exit(1)
 
 
+# nf-core schema validate-batch
+@schema.command("validate-batch")
+@click.argument("pipeline", required=True, metavar="<pipeline name>")
+@click.argument("params", type=click.Path(exists=True), nargs=-1, metavar="<JSON params files>")
+@click.option(
+    "-j", "--jobs", type=int, help=r"Number of processes to validate files in [dim]\[default: number of CPUs][/]"
+)
+@click.option("-o", "--output", type=click.File("w"), default="-", help=r"JSON lines report [dim]\[default: stdout][/]")
+@click.option(
+    "--server",
+    is_flag=True,
+    default=False,
+    help="Read params file paths or JSON requests from stdin and answer on stdout, one per line",
+)
+def validate_batch(pipeline, params, jobs, output, server):
+    """
+    Validate many sets of parameters against a pipeline schema.
+
+    The schema is loaded once and the params files (JSON or YAML) are validated in parallel.
+    The result for each file is written as a line of JSON, with all invalid parameters.
+
+    With [bold]--server[/], the command keeps running and validates requests from stdin:
+    the path of a params file, or a JSON object with the [bold]params[/] and an optional [bold]id[/].
+    """
+    from nf_core.schema import PipelineSchema
+    from nf_core.schema_batch import SchemaBatchValidator
+
+    schema_obj = PipelineSchema()
+    try:
+        schema_obj.get_schema_path(pipeline)
+        # Load and check schema
+        schema_obj.load_lint_schema()
+    except AssertionError as e:
+        log.error(e)
+        sys.exit(1)
+
+    validator = SchemaBatchValidator(schema_obj, jobs)
+    if server:
+        validator.serve(sys.stdin, output)
+        return
+    num_valid, num_invalid = validator.write_report(params, output)
+    log.info(f"Validated {num_valid + num_invalid} params files: {num_valid} valid, {num_invalid} invalid")
+    if num_invalid:
+        sys.exit(1)
+
+
 # nf-core schema build
 @schema.command()
 @click.option(
@@ -1655,15 +1805,25 @@ def bump_version(new_version, dir, nextflow):
     "-d",
     "--dir",
     type=click.Path(exists=True),
-    default=".",
-    help=r"Pipeline directory. [dim]\[default: current working directory][/]",
+    multiple=True,
+    default=["."],
+    help=r"Pipeline directory, can be given multiple times to sync several pipelines. [dim]\[default: current working directory][/]",
 )
 @click.option("-b", "--from-branch", type=str, help="The git branch to use to fetch workflow variables.")
 @click.option("-p", "--pull-request", is_flag=True, default=False, help="Make a GitHub pull-request with the changes.")
 @click.option("-g", "--github-repository", type=str, help="GitHub PR: target repository.")
 @click.option("-u", "--username", type=str, help="GitHub PR: auth username.")
 @click.option("-t", "--template-yaml", help="Pass a YAML file to customize the template")
-def sync(dir, from_branch, pull_request, github_repository, username, template_yaml):
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    help=r"Number of pipelines to sync at the same time. [dim]\[default: number of CPUs, at most 8][/]",
+)
+@click.option(
+    "--delta", is_flag=True, default=False, help="Only write the template files that changed, instead of all files."
+)
+def sync(dir, from_branch, pull_request, github_repository, username, template_yaml, jobs, delta):
     """
     Sync a pipeline [cyan i]TEMPLATE[/] branch with the nf-core template.
 
@@ -1676,14 +1836,29 @@ def sync(dir, from_branch, pull_request, github_repository, username, template_y
     the pipeline. It is run automatically for all pipelines when ever a
     new release of [link=https://github.com/nf-core/tools]nf-core/tools[/link] (and the included template) is made.
     """
-    from nf_core.sync import PipelineSync, PullRequestException, SyncException
+    from nf_core.sync import (
+        PipelineSync,
+        PipelineSyncBatch,
+        PullRequestException,
+        SyncException,
+    )
     from nf_core.utils import is_pipeline_directory
 
-    # Check if pipeline directory contains necessary files
-    is_pipeline_directory(dir)
+    # Check if pipeline directories contain necessary files
+    for pipeline_dir in dir:
+        is_pipeline_directory(pipeline_dir)
+
+    # Sync several pipelines in one go
+    if len(dir) > 1:
+        if github_repository is not None or template_yaml is not None:
+            log.error("The options `--github-repository` and `--template-yaml` can only be used with a single pipeline")
+            sys.exit(1)
+        if not PipelineSyncBatch(dir, from_branch, pull_request, username, jobs, delta).sync():
+            sys.exit(1)
+        return
 
     # Sync the given pipeline dir
-    sync_obj = PipelineSync(dir, from_branch, pull_request, github_repository, username, template_yaml)
+    sync_obj = PipelineSync(dir[0], from_branch, pull_request, github_repository, username, template_yaml, delta=delta)
     try:
         sync_obj.sync()
     except (SyncException, PullRequestException) as e:
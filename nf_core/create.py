@@ -2,29 +2,125 @@
 organization's specification based on a template.
 """
 import configparser
+import functools
+import json
 import logging
 import os
-import random
 import re
-import shutil
+import stat
 import sys
-import time
+import tempfile
 from pathlib import Path
 
-import filetype
 import git
 import jinja2
 import questionary
-import requests
 import yaml
 
 import nf_core
+import nf_core.nextflow_config
+import nf_core.pipeline_logo
 import nf_core.schema
 import nf_core.utils
 from nf_core.lint_utils import run_prettier_on_file
 
 log = logging.getLogger(__name__)
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "pipeline-template")
+
+# The pipeline config file, as shipped with the template
+CONFIG_FN = nf_core.utils.CONFIG_PATHS[0]
+
+
+@functools.lru_cache()
+def template_environment():
+    """The Jinja environment of the pipeline template.
+
+    The environment is shared by all pipelines created in this process, so that each template
+    file is only read and compiled once.
+    """
+    return jinja2.Environment(
+        loader=jinja2.PackageLoader("nf_core", "pipeline-template"),
+        keep_trailing_newline=True,
+        cache_size=-1,
+        auto_reload=False,
+    )
+
+
+@functools.lru_cache()
+def template_files(skip_paths=frozenset()):
+    """List the files of the pipeline template.
+
+    Args:
+        skip_paths (frozenset): Prefixes of the paths to leave out, for the skipped template areas.
+
+    Returns:
+        tuple: The path relative to the template directory, whether it is a binary file and the permissions of each file.
+    """
+    if skip_paths:
+        return tuple(f for f in template_files() if not any(f[0].startswith(sp) for sp in skip_paths))
+
+    ignore_strs = [".pyc", "__pycache__", ".pyo", ".pyd", ".DS_Store", ".egg"]
+    files = []
+    # Can't use glob.glob() as need recursive hidden dotfiles - https://stackoverflow.com/a/58126417/713980
+    for template_fn_path in sorted(Path(TEMPLATE_DIR).glob("**/*")):
+        if template_fn_path.is_dir():
+            continue
+        if any([s in str(template_fn_path) for s in ignore_strs]):
+            log.debug(f"Ignoring '{template_fn_path}' in jinja2 template creation")
+            continue
+        files.append(
+            (
+                template_fn_path.relative_to(TEMPLATE_DIR).as_posix(),
+                bool(nf_core.utils.is_file_binary(template_fn_path)),
+                stat.S_IMODE(template_fn_path.stat().st_mode),
+            )
+        )
+    return tuple(files)
+
+
+@functools.lru_cache(maxsize=None)
+def read_template_file(template_fn):
+    """Read a file of the pipeline template, to copy it without Jinja"""
+    with open(os.path.join(TEMPLATE_DIR, template_fn), "rb") as fh:
+        return fh.read()
+
+
+def write_template_files(outdir, files):
+    """Write a rendered pipeline template to a directory.
+
+    Args:
+        outdir (str): Path to the output directory.
+        files (dict): The rendered template, see :meth:`PipelineCreate.render_files`.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    for fn, (content, mode) in files.items():
+        output_path = os.path.join(outdir, fn)
+        log.debug(f"Writing to output file: '{output_path}'")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "wb") as fh:
+            fh.write(content)
+        os.chmod(output_path, mode)
+
+
+def run_prettier_on_template_files(files, file_names):
+    """Format files of a rendered pipeline template with Prettier.
+
+    Prettier runs once for all files, with the Prettier config of the template.
+
+    Args:
+        files (dict): The rendered template, see :meth:`PipelineCreate.render_files`.
+        file_names (list): Paths of the files to format.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_template_files(
+            tmp_dir, {fn: files[fn] for fn in [".prettierrc.yml", ".prettierignore", *file_names] if fn in files}
+        )
+        run_prettier_on_file([os.path.join(tmp_dir, fn) for fn in file_names])
+        for fn in file_names:
+            with open(os.path.join(tmp_dir, fn), "rb") as fh:
+                files[fn] = (fh.read(), files[fn][1])
+
 
 class PipelineCreate:
     """Creates a nf-core pipeline a la carte from the nf-core best-practice template.
@@ -277,139 +373,154 @@ class PipelineCreate:
                 log.error(f"Output directory '{self.outdir}' exists!")
                 log.info("Use -f / --force to overwrite existing files")
                 sys.exit(1)
-        else:
-            os.makedirs(self.outdir)
 
-        # Run jinja2 for each file in the template folder
-        env = jinja2.Environment(
-            loader=jinja2.PackageLoader("nf_core", "pipeline-template"), keep_trailing_newline=True
-        )
-        template_dir = os.path.join(os.path.dirname(__file__), "pipeline-template")
+        # Render the whole pipeline in memory, then write it in one go
+        write_template_files(self.outdir, self.render_files())
+
+    def render_files(self):
+        """Renders the pipeline template in memory, including the changes for the template customisation.
+
+        Returns:
+            dict: The content (bytes) and file permissions of each file, by path relative to the pipeline directory.
+        """
+        env = template_environment()
         object_attrs = self.template_params
         object_attrs["nf_core_version"] = nf_core.__version__
 
-        # Can't use glob.glob() as need recursive hidden dotfiles - https://stackoverflow.com/a/58126417/713980
-        template_files = list(Path(template_dir).glob("**/*"))
-        template_files += list(Path(template_dir).glob("*"))
-        ignore_strs = [".pyc", "__pycache__", ".pyo", ".pyd", ".DS_Store", ".egg"]
         short_name = self.template_params["short_name"]
         rename_files = {
             "workflows/pipeline.nf": f"workflows/{short_name}.nf",
             "lib/WorkflowPipeline.groovy": f"lib/Workflow{short_name[0].upper()}{short_name[1:]}.groovy",
         }
 
-        # Set the paths to skip according to customization
-        for template_fn_path_obj in template_files:
-            template_fn_path = str(template_fn_path_obj)
-
-            # Skip files that are in the self.skip_paths list
-            for skip_path in self.skip_paths:
-                if os.path.relpath(template_fn_path, template_dir).startswith(skip_path):
-                    break
+        files = {}
+        for template_fn, is_binary, mode in template_files(frozenset(self.skip_paths)):
+            output_fn = rename_files.get(template_fn, template_fn)
+            # Just copy binary files
+            if is_binary:
+                log.debug(f"Copying binary file without Jinja: '{output_fn}'")
+                content = read_template_file(template_fn)
             else:
-                if os.path.isdir(template_fn_path):
-                    continue
-                if any([s in template_fn_path for s in ignore_strs]):
-                    log.debug(f"Ignoring '{template_fn_path}' in jinja2 template creation")
-                    continue
-
-                # Set up vars and directories
-                template_fn = os.path.relpath(template_fn_path, template_dir)
-                output_path = self.outdir / template_fn
-                if template_fn in rename_files:
-                    output_path = self.outdir / rename_files[template_fn]
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
                 try:
-                    # Just copy binary files
-                    if nf_core.utils.is_file_binary(template_fn_path):
-                        raise AttributeError(f"Binary file: {template_fn_path}")
-
-                    # Got this far - render the template
                     log.debug(f"Rendering template file: '{template_fn}'")
-                    j_template = env.get_template(template_fn)
-                    rendered_output = j_template.render(object_attrs)
-
-                    # Write to the pipeline output file
-                    with open(output_path, "w") as fh:
-                        log.debug(f"Writing to output file: '{output_path}'")
-                        fh.write(rendered_output)
+                    content = env.get_template(template_fn).render(object_attrs).encode("utf-8")
 
                 # Copy the file directly instead of using Jinja
-                except (AttributeError, UnicodeDecodeError) as e:
-                    log.debug(f"Copying file without Jinja: '{output_path}' - {e}")
-                    shutil.copy(template_fn_path, output_path)
+                except UnicodeDecodeError as e:
+                    log.debug(f"Copying file without Jinja: '{output_fn}' - {e}")
+                    content = read_template_file(template_fn)
 
                 # Something else went wrong
                 except Exception as e:
-                    log.error(f"Copying raw file as error rendering with Jinja: '{output_path}' - {e}")
-                    shutil.copy(template_fn_path, output_path)
+                    log.error(f"Copying raw file as error rendering with Jinja: '{output_fn}' - {e}")
+                    content = read_template_file(template_fn)
+            files[output_fn] = (content, mode)
 
-                # Mirror file permissions
-                template_stat = os.stat(template_fn_path)
-                os.chmod(output_path, template_stat.st_mode)
+        # Files changed below are formatted with Prettier afterwards
+        prettier_files = []
 
         # Remove all unused parameters in the nextflow schema
         if not self.template_params["igenomes"] or not self.template_params["nf_core_configs"]:
-            self.update_nextflow_schema()
+            self.update_nextflow_schema(files)
+            prettier_files.append("nextflow_schema.json")
 
         if self.template_params["branded"]:
             # Make a logo and save it, if it is a nf-core pipeline
-            self.make_pipeline_logo()
+            self.make_pipeline_logo(files)
         else:
             if self.template_params["github"]:
                 # Remove field mentioning nf-core docs
                 # in the github bug report template
-                self.remove_nf_core_in_bug_report_template()
+                self.remove_nf_core_in_bug_report_template(files)
+                prettier_files.append(".github/ISSUE_TEMPLATE/bug_report.yml")
 
             # Update the .nf-core.yml with linting configurations
-            self.fix_linting()
+            self.fix_linting(files)
+            prettier_files.append(CONFIG_FN)
 
         if self.template_yaml:
-            config_fn, config_yml = nf_core.utils.load_tools_config(self.outdir)
-            with open(self.outdir / config_fn, "w") as fh:
-                config_yml.update(template=self.template_yaml)
-                yaml.safe_dump(config_yml, fh)
-                log.debug(f"Dumping pipeline template yml to pipeline config file '{config_fn.name}'")
-                run_prettier_on_file(self.outdir / config_fn)
-
-    def update_nextflow_schema(self):
+            log.debug(f"Dumping pipeline template yml to pipeline config file '{CONFIG_FN}'")
+            config_yml = yaml.safe_load(files[CONFIG_FN][0]) or {}
+            config_yml.update(template=self.template_yaml)
+            files[CONFIG_FN] = (yaml.safe_dump(config_yml).encode("utf-8"), files[CONFIG_FN][1])
+            prettier_files.append(CONFIG_FN)
+
+        if prettier_files:
+            run_prettier_on_template_files(files, sorted(set(prettier_files)))
+
+        return files
+
+    def update_nextflow_schema(self, files):
         """
         Removes unused parameters from the nextflow schema.
+
+        Args:
+            files (dict): The rendered template, see :meth:`render_files`.
         """
-        schema_path = self.outdir / "nextflow_schema.json"
+        schema_content, schema_mode = files["nextflow_schema.json"]
 
         schema = nf_core.schema.PipelineSchema()
-        schema.schema_filename = schema_path
+        schema.schema_filename = self.outdir / "nextflow_schema.json"
         schema.no_prompts = True
-        schema.load_schema()
-        schema.get_wf_params()
+        schema.schema = json.loads(schema_content)
+        schema.pipeline_params = self.get_config_params(files)
         schema.remove_schema_notfound_configs()
-        schema.save_schema(suppress_logging=True)
-        run_prettier_on_file(schema_path)
+        files["nextflow_schema.json"] = (json.dumps(schema.schema, indent=4).encode("utf-8"), schema_mode)
+
+    def get_config_params(self, files):
+        """
+        Get the params set by the rendered Nextflow config.
+
+        The config is evaluated from memory where possible, and with Nextflow otherwise.
+
+        Args:
+            files (dict): The rendered template, see :meth:`render_files`.
 
-    def remove_nf_core_in_bug_report_template(self):
+        Returns:
+            dict: Values of the flat params, by param name.
+        """
+        wf_path = os.path.abspath(self.outdir)
+        config_files = {
+            os.path.normpath(os.path.join(wf_path, fn)): content.decode("utf-8")
+            for fn, (content, _) in files.items()
+            if fn.endswith(".config")
+        }
+        try:
+            config = nf_core.nextflow_config.NextflowConfigEvaluator(wf_path, files=config_files).evaluate()
+        except nf_core.nextflow_config.UnsupportedConfigError as e:
+            log.debug(f"Running Nextflow to evaluate the template config: {e}")
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                write_template_files(tmp_dir, {fn: files[fn] for fn in files if fn.endswith(".config")})
+                config = nf_core.utils.fetch_wf_config(tmp_dir, cache_config=False).items()
+        return {k[7:]: v for k, v in config if k.startswith("params.") and "." not in k[7:]}
+
+    def remove_nf_core_in_bug_report_template(self, files):
         """
         Remove the field mentioning nf-core documentation
         in the github bug report template
-        """
-        bug_report_path = self.outdir / ".github" / "ISSUE_TEMPLATE" / "bug_report.yml"
 
-        with open(bug_report_path, "r") as fh:
-            contents = yaml.load(fh, Loader=yaml.FullLoader)
+        Args:
+            files (dict): The rendered template, see :meth:`render_files`.
+        """
+        bug_report_fn = ".github/ISSUE_TEMPLATE/bug_report.yml"
+        content, mode = files[bug_report_fn]
+        contents = yaml.load(content, Loader=yaml.FullLoader)
 
         # Remove the first item in the body, which is the information about the docs
         contents["body"].pop(0)
 
-        with open(bug_report_path, "w") as fh:
-            yaml.dump(contents, fh, default_flow_style=False, sort_keys=False)
-
-        run_prettier_on_file(bug_report_path)
+        files[bug_report_fn] = (
+            yaml.dump(contents, default_flow_style=False, sort_keys=False).encode("utf-8"),
+            mode,
+        )
 
-    def fix_linting(self):
+    def fix_linting(self, files):
         """
         Updates the .nf-core.yml with linting configurations
         for a customized pipeline.
+
+        Args:
+            files (dict): The rendered template, see :meth:`render_files`.
         """
         # Create a lint config
         short_name = self.template_params["short_name"]
@@ -498,68 +609,31 @@ class PipelineCreate:
             lint_config["files_unchanged"].extend([".github/ISSUE_TEMPLATE/bug_report.yml"])
 
         # Add the lint content to the preexisting nf-core config
-        config_fn, nf_core_yml = nf_core.utils.load_tools_config(self.outdir)
+        content, mode = files[CONFIG_FN]
+        nf_core_yml = yaml.safe_load(content) or {}
         nf_core_yml["lint"] = lint_config
-        with open(self.outdir / config_fn, "w") as fh:
-            yaml.dump(nf_core_yml, fh, default_flow_style=False, sort_keys=False)
+        files[CONFIG_FN] = (yaml.dump(nf_core_yml, default_flow_style=False, sort_keys=False).encode("utf-8"), mode)
 
-        run_prettier_on_file(os.path.join(self.outdir, config_fn))
+    def make_pipeline_logo(self, files):
+        """Get the logos for the new pipeline from the nf-core website, or from the logo cache
 
-    def make_pipeline_logo(self):
-        """Fetch a logo for the new pipeline from the nf-core website"""
+        Logos that can't be fetched are left out.
 
-        logo_url = f"https://nf-co.re/logo/{self.template_params['short_name']}?theme=light"
-        log.debug(f"Fetching logo from {logo_url}")
+        Args:
+            files (dict): The rendered template, see :meth:`render_files`.
+        """
+        short_name = self.template_params["short_name"]
+        name_noslash = self.template_params["name_noslash"]
+        log.debug(f"Getting logos for '{short_name}'")
 
-        email_logo_path = self.outdir / "assets" / f"{self.template_params['name_noslash']}_logo_light.png"
-        self.download_pipeline_logo(f"{logo_url}?w=600&theme=light", email_logo_path)
-        for theme in ["dark", "light"]:
-            readme_logo_url = f"{logo_url}?w=600&theme={theme}"
-            readme_logo_path = (
-                self.outdir / "docs" / "images" / f"{self.template_params['name_noslash']}_logo_{theme}.png"
-            )
-            self.download_pipeline_logo(readme_logo_url, readme_logo_path)
-
-    def download_pipeline_logo(self, url, img_fn):
-        """Attempt to download a logo from the website. Retry if it fails."""
-        os.makedirs(os.path.dirname(img_fn), exist_ok=True)
-        attempt = 0
-        max_attempts = 10
-        retry_delay = 0  # x up to 10 each time, so first delay will be 1-100 seconds
-        while attempt < max_attempts:
-            # If retrying, wait a while
-            if retry_delay > 0:
-                log.info(f"Waiting {retry_delay} seconds before next image fetch attempt")
-                time.sleep(retry_delay)
-
-            attempt += 1
-            # Use a random number to avoid the template sync hitting the website simultaneously for all pipelines
-            retry_delay = random.randint(1, 100) * attempt
-            log.debug(f"Fetching logo '{img_fn}' (attempt {attempt})")
-            try:
-                # Try to fetch the logo from the website
-                r = requests.get(url, timeout=180)
-                if r.status_code != 200:
-                    raise UserWarning(f"Got status code {r.status_code}")
-                # Check that the returned image looks right
-
-            except (ConnectionError, UserWarning) as e:
-                # Something went wrong - try again
-                log.warning(e)
-                log.error("Connection error - retrying")
-                continue
-
-            # Write the new logo to the file
-            with open(img_fn, "wb") as fh:
-                fh.write(r.content)
-            # Check that the file looks valid
-            image_type = filetype.guess(img_fn).extension
-            if image_type != "png":
-                log.error(f"Logo from the website didn't look like an image: '{image_type}'")
-                continue
-
-            # Got this far, presumably it's good - break the retry loop
-            break
+        logos = {
+            theme: nf_core.pipeline_logo.get_logo(short_name, theme) for theme in nf_core.pipeline_logo.LOGO_THEMES
+        }
+        if logos["light"] is not None:
+            files[f"assets/{name_noslash}_logo_light.png"] = (logos["light"], 0o644)
+        for theme, logo in logos.items():
+            if logo is not None:
+                files[f"docs/images/{name_noslash}_logo_{theme}.png"] = (logo, 0o644)
 
     def git_init_pipeline(self):
         """Initialises the new pipeline as a Git repository and submits first commit.
@@ -2,17 +2,23 @@
 
 from __future__ import print_function
 
+import collections
 import concurrent.futures
+import hashlib
 import io
+import json
 import logging
 import os
 import re
 import shutil
+import struct
 import subprocess
 import tarfile
 import textwrap
+import time
+import zlib
 from datetime import datetime
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 import git
 import questionary
@@ -25,6 +31,7 @@ from pkg_resources import parse_version as VersionParser
 
 import nf_core
 import nf_core.list
+import nf_core.oci_registry
 import nf_core.utils
 from nf_core.synced_repo import RemoteProgressbar, SyncedRepo
 from nf_core.utils import (
@@ -38,6 +45,24 @@ stderr = rich.console.Console(
     stderr=True, style="dim", highlight=False, force_terminal=nf_core.utils.rich_force_colors()
 )
 
+# Patterns for the container image discovery, compiled once. See find_container_images() for details.
+# Start of a `container` directive up to and including its opening quote.
+CONTAINER_DIRECTIVE_REGEX = re.compile(r"container\s+[\\s{}=$]*(?P<quote>[\'\"])")
+# Quoted strings in process scopes of configs, ignoring escaped quotes.
+CONFIG_CONTAINER_REGEX = re.compile(r"[\\s{}=$]*(?P<quote>(?<![\\])[\'\"])(?P<param>(?:.(?!(?<![\\])\1))*.?)\1[\\s}]*")
+# Quoted strings inside a container directive, ignoring escaped quotes.
+CONTAINER_VALUE_REGEX = re.compile(r"[^\"\'](?P<quote>(?<![\\])[\'\"])(?P<param>(?:.(?!(?<![\\])\1))*.?)\1")
+# Thanks Stack Overflow for the regex: https://stackoverflow.com/a/3809435/713980
+URL_REGEX = r"https?:\/\/(www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*)"
+# Thanks Stack Overflow for the regex: https://stackoverflow.com/a/39672069/713980
+DOCKER_REGEX = r"^(?:(?=[^:\/]{1,253})(?!-)[a-zA-Z0-9-]{1,63}(?<!-)(?:\.(?!-)[a-zA-Z0-9-]{1,63}(?<!-))*(?::[0-9]{1,5})?/)?((?![._-])(?:[a-z0-9._-]*)(?<![._-])(?:/(?![._-])[a-z0-9._-]*(?<![._-]))*)(?::(?![.-])[a-zA-Z0-9_.-]{1,128})?$"
+# Either a URL for direct download or a Docker URI.
+URL_OR_DOCKER_REGEX = re.compile(f"{URL_REGEX}|{DOCKER_REGEX}", re.S)
+# Image file name in an index of a remote $NXF_SINGULARITY_CACHEDIR.
+REMOTE_CONTAINER_REGEX = re.compile(r"([^\/\\]+\.img)", re.S)
+# Lists the revisions and container images of a download, see DownloadWorkflow.write_download_manifest()
+DOWNLOAD_MANIFEST = "nf-core-download.json"
+
 
 class DownloadError(RuntimeError):
     """A custom exception that is raised when nf-core download encounters a problem that we already took into consideration.
@@ -89,6 +114,10 @@ class DownloadWorkflow:
         container (bool): Flag, if the Singularity container should be downloaded as well. Defaults to False.
         tower (bool): Flag, to customize the download for Nextflow Tower (convert to git bare repo). Defaults to False.
         outdir (str): Path to the local download directory. Defaults to None.
+        container_pull_method (str): Pull images with ``singularity`` or fetch them natively from the registries
+            into an ``oci`` image layout. Defaults to ``singularity``.
+        update (bool): Update an existing download in :attr:`outdir` according to its download manifest. Defaults to False.
+        wfs (nf_core.list.Workflows): Remote workflows that were already fetched. Defaults to None.
     """
 
     def __init__(
@@ -105,6 +134,9 @@ class DownloadWorkflow:
         container_cache_utilisation=None,
         container_cache_index=None,
         parallel_downloads=4,
+        container_pull_method="singularity",
+        update=False,
+        wfs=None,
     ):
         self.pipeline = pipeline
         if isinstance(revision, str):
@@ -136,6 +168,9 @@ class DownloadWorkflow:
         self.container_cache_index = container_cache_index
         # allows to specify a container library / registry or a respective mirror to download images from
         self.parallel_downloads = parallel_downloads
+        # fetch images with `singularity pull` or natively from the registries as OCI image layout
+        self.container_pull_method = container_pull_method or "singularity"
+        self.update = update
 
         self.wf_revisions = {}
         self.wf_branches = {}
@@ -143,11 +178,23 @@ class DownloadWorkflow:
         self.wf_download_url = {}
         self.nf_config = {}
         self.containers = []
-        self.containers_remote = []  # stores the remote images provided in the file.
-
-        # Fetch remote workflows
-        self.wfs = nf_core.list.Workflows()
-        self.wfs.get_remote_workflows()
+        self.containers_remote = set()  # stores the remote images provided in the file.
+        self.containers_remote_details = {}  # size and digest of the remote images, if provided in the file.
+        self.archive = None  # DownloadArchive that files are streamed into, if compression was requested.
+        self.archived_paths = set()  # Paths below self.outdir that were already moved into the archive.
+        self.module_findings_cache = {}  # Containers found in module files, by sha256 of the file contents.
+        self.manifest = {}  # Download manifest of a previous download, read in update mode.
+        self.configs_sha = None  # Commit of nf-core/configs that was downloaded.
+        self.revision_containers = {}  # Containers required by each downloaded revision.
+        self.container_details = {}  # Size and digest of images, which were recorded before they were archived.
+        self.oci_images = {}  # Descriptors of the images fetched into the OCI image layout.
+        self.oci_layout_dir = None  # OCI image layout shared with other pipelines, instead of <outdir>/oci-images.
+
+        # Fetch remote workflows, unless they were already fetched for several downloads
+        if wfs is None:
+            wfs = nf_core.list.Workflows()
+            wfs.get_remote_workflows()
+        self.wfs = wfs
 
     def download_workflow(self):
         """Starts a nf-core workflow download."""
@@ -171,8 +218,8 @@ class DownloadWorkflow:
             self.prompt_singularity_cachedir_creation()
             self.prompt_singularity_cachedir_utilization()
             self.prompt_singularity_cachedir_remote()
-            # Nothing meaningful to compress here.
-            if not self.tower:
+            # Nothing meaningful to compress here. Updates are applied to an uncompressed download.
+            if not self.tower and not self.update:
                 self.prompt_compression_type()
         except AssertionError as e:
             raise DownloadError(e) from e
@@ -206,8 +253,14 @@ class DownloadWorkflow:
         else:
             summary_log.append(f"Enabled for seqeralabs® Nextflow Tower: '{self.tower}'")
 
+        if self.update:
+            # Read the manifest of the download that is updated
+            self.read_download_manifest()
+            summary_log.append(
+                f"Updating previous download of revision{'s' if len(self.manifest['revisions']) > 1 else ''}: '{', '.join(self.manifest['revisions'])}'"
+            )
         # Check that the outdir doesn't already exist
-        if os.path.exists(self.outdir):
+        elif os.path.exists(self.outdir):
             if not self.force:
                 raise DownloadError(
                     f"Output directory '{self.outdir}' already exists (use [red]--force[/] to overwrite)"
@@ -234,38 +287,102 @@ class DownloadWorkflow:
             self.download_workflow_static()
 
     def download_workflow_static(self):
-        """Downloads a nf-core workflow from GitHub to the local file system in a self-contained manner."""
+        """Downloads a nf-core workflow from GitHub to the local file system in a self-contained manner.
 
-        # Download the centralised configs first
-        if self.include_configs:
-            log.info("Downloading centralised configs from GitHub")
-            self.download_configs()
+        If compression was requested, every revision and container image is streamed into the archive as soon
+        as it is complete and deleted from :attr:`self.outdir` afterwards, so the download is not staged twice on disk.
+        """
+
+        if self.compress_type is not None:
+            self.archive = DownloadArchive(self.output_filename, self.compress_type)
+
+        try:
+            # Download the centralised configs first
+            if self.include_configs:
+                log.info("Downloading centralised configs from GitHub")
+                self.download_configs()
+
+            # Download the pipeline files for each selected revision
+            log.info("Downloading workflow files from GitHub")
+            revision_dirnames = self.download_revisions()
+
+            # Collect the required singularity images of all revisions first, then fetch each image only once
+            if self.container_system == "singularity":
+                self.find_revision_containers(revision_dirnames)
 
-        # Download the pipeline files for each selected revision
-        log.info("Downloading workflow files from GitHub")
+                try:
+                    self.get_singularity_images(current_revision=", ".join(self.revision_containers))
+                except OSError as e:
+                    raise DownloadError(f"[red]{e}[/]") from e
+
+                if self.update:
+                    self.prune_singularity_images()
+                    self.prune_oci_images()
+
+            self.write_download_manifest(revision_dirnames)
+
+            # The revisions are complete, move them into the archive
+            if self.archive is not None:
+                for revision_dirname in revision_dirnames.values():
+                    self.add_to_archive(os.path.join(self.outdir, revision_dirname))
+
+            # Compress into an archive
+            if self.compress_type is not None:
+                log.info("Compressing output into archive")
+                self.compress_download()
+        except BaseException:
+            if self.archive is not None and self.archive.md5 is None:
+                log.debug(f"Deleting incomplete archive: '{self.output_filename}'")
+                self.archive.discard()
+            raise
+
+    def download_revisions(self):
+        """Download the files of all selected revisions and make them use the local configs, if these are included.
 
+        Returns:
+            dict: The directory names of the revisions downloaded in this run. In update mode,
+            revisions that were already downloaded at the same commit are skipped.
+        """
+        revision_dirnames = {}
         for item in zip(self.revision, self.wf_sha.values(), self.wf_download_url.values()):
+            # In update mode, revisions that were already downloaded at the same commit are kept
+            previous = self.manifest.get("revisions", {}).get(item[0])
+            if previous:
+                if previous["sha"] == item[1]:
+                    log.info(f"Revision '{item[0]}' is up to date")
+                    continue
+                log.info(f"Revision '{item[0]}' has changed and is downloaded again")
+                shutil.rmtree(os.path.join(self.outdir, previous["directory"]))
+                del self.manifest["revisions"][item[0]]
+
             revision_dirname = self.download_wf_files(revision=item[0], wf_sha=item[1], download_url=item[2])
+            revision_dirnames[item[0]] = revision_dirname
 
             if self.include_configs:
                 try:
                     self.wf_use_local_configs(revision_dirname)
                 except FileNotFoundError as e:
                     raise DownloadError("Error editing pipeline config file to use local configs!") from e
+        return revision_dirnames
 
-            # Collect all required singularity images
-            if self.container_system == "singularity":
-                self.find_container_images(os.path.join(self.outdir, revision_dirname))
-
-                try:
-                    self.get_singularity_images(current_revision=item[0])
-                except OSError as e:
-                    raise DownloadError(f"[red]{e}[/]") from e
+    def find_revision_containers(self, revision_dirnames):
+        """Find the containers of the downloaded revisions and collect the union in :attr:`self.containers`.
 
-        # Compress into an archive
-        if self.compress_type is not None:
-            log.info("Compressing output into archive")
-            self.compress_download()
+        Args:
+            revision_dirnames (dict): The directory names of the revisions downloaded in this run. The containers of
+                revisions kept from a previous download are taken from the download manifest.
+        """
+        revision_containers = self.find_container_images_revisions(
+            [os.path.join(self.outdir, revision_dirname) for revision_dirname in revision_dirnames.values()]
+        )
+        for revision, revision_dirname in revision_dirnames.items():
+            self.revision_containers[revision] = revision_containers[os.path.join(self.outdir, revision_dirname)]
+        for revision, previous in self.manifest.get("revisions", {}).items():
+            if revision not in self.revision_containers:
+                self.revision_containers[revision] = previous.get("containers", [])
+        self.containers = self.prioritize_direct_download(
+            [container for containers in self.revision_containers.values() for container in containers]
+        )
 
     def download_workflow_tower(self, location=None):
         """Create a bare-cloned git repository of the workflow, so it can be launched with `tw launch` as file:/ pipeline"""
@@ -294,10 +411,11 @@ class DownloadWorkflow:
                 # Collect all required singularity images
                 self.find_container_images(self.workflow_repo.access())
 
-                try:
-                    self.get_singularity_images(current_revision=revision)
-                except OSError as e:
-                    raise DownloadError(f"[red]{e}[/]") from e
+            # Fetch the deduplicated images of all revisions at once
+            try:
+                self.get_singularity_images(current_revision=", ".join(self.wf_sha.keys()))
+            except OSError as e:
+                raise DownloadError(f"[red]{e}[/]") from e
 
         # Justify why compression is skipped for Tower downloads (Prompt is not shown, but CLI argument could have been set)
         if self.compress_type is not None:
@@ -532,24 +650,54 @@ class DownloadWorkflow:
         self.read_remote_containers()
 
     def read_remote_containers(self):
-        """Reads the file specified as index for the remote Singularity cache dir"""
+        """Reads the file specified as index for the remote Singularity cache dir
+
+        The index is either a plain text file with the paths of the images, like the output of
+        `find $NXF_SINGULARITY_CACHEDIR -name "*.img"`, or a JSON file. The JSON file is a list (optionally under a
+        `containers` key) of image paths or of objects with the image path as `file` and optionally its `size` in bytes
+        and `digest` (e.g. `sha256:...`). Sizes and digests are used to detect outdated images on the remote system.
+        """
         if (
             self.container_system == "singularity"
             and self.container_cache_utilisation == "remote"
             and self.container_cache_index is not None
         ):
-            n_total_images = 0
+            self.containers_remote = set()
+            self.containers_remote_details = {}
             try:
                 with open(self.container_cache_index) as indexfile:
-                    for line in indexfile.readlines():
-                        match = re.search(r"([^\/\\]+\.img)", line, re.S)
+                    index = indexfile.read()
+                if index.lstrip().startswith(("[", "{")):
+                    entries = json.loads(index)
+                    if isinstance(entries, dict):
+                        entries = entries.get("containers", [])
+                    for entry in entries:
+                        entry = {"file": entry} if isinstance(entry, str) else entry
+                        match = REMOTE_CONTAINER_REGEX.search(str(entry.get("file", "")))
+                        if match:
+                            self.containers_remote.add(match.group(0))
+                            details = {}
+                            if entry.get("size") is not None:
+                                try:
+                                    details["size"] = int(entry["size"])
+                                except (TypeError, ValueError):
+                                    log.warning(
+                                        f"Ignoring the invalid size '{entry['size']}' of '{match.group(0)}' in the index file."
+                                    )
+                            if entry.get("digest") is not None:
+                                details["digest"] = str(entry["digest"])
+                            self.containers_remote_details[match.group(0)] = details
+                            algorithm = str(entry.get("digest", "")).rpartition(":")[0] or "sha256"
+                            if algorithm not in hashlib.algorithms_available:
+                                raise LookupError(f"Unsupported digest algorithm '{algorithm}' in the index file.")
+                else:
+                    for line in index.splitlines():
+                        match = REMOTE_CONTAINER_REGEX.search(line)
                         if match:
-                            n_total_images += 1
-                            self.containers_remote.append(match.group(0))
-                    if n_total_images == 0:
-                        raise LookupError("Could not find valid container names in the index file.")
-                    self.containers_remote = sorted(list(set(self.containers_remote)))
-            except (FileNotFoundError, LookupError) as e:
+                            self.containers_remote.add(match.group(0))
+                if not self.containers_remote:
+                    raise LookupError("Could not find valid container names in the index file.")
+            except (FileNotFoundError, LookupError, ValueError, AttributeError) as e:
                 log.error(f"[red]Issue with reading the specified remote $NXF_SINGULARITY_CACHE index:[/]\n{e}\n")
                 if stderr.is_interactive and rich.prompt.Confirm.ask(f"[blue]Specify a new index file and try again?"):
                     self.container_cache_index = None  # reset chosen path to index file.
@@ -578,6 +726,7 @@ class DownloadWorkflow:
                     "none",
                     "tar.gz",
                     "tar.bz2",
+                    "tar.zst",
                     "zip",
                 ],
                 style=nf_core.utils.nfcore_question_style,
@@ -623,6 +772,12 @@ class DownloadWorkflow:
         url = requests.get(configs_zip_url)
         with ZipFile(io.BytesIO(url.content)) as zipfile:
             zipfile.extractall(self.outdir)
+            # GitHub stores the commit of the archive as comment
+            self.configs_sha = zipfile.comment.decode("utf-8") or None
+
+        # Replace the configs of a previous download
+        if os.path.exists(os.path.join(self.outdir, "configs")):
+            shutil.rmtree(os.path.join(self.outdir, "configs"))
 
         # Rename the internal directory name to be more friendly
         os.rename(os.path.join(self.outdir, configs_local_dir), os.path.join(self.outdir, "configs"))
@@ -660,7 +815,27 @@ class DownloadWorkflow:
         with open(nfconfig_fn, "w") as nfconfig_fh:
             nfconfig_fh.write(nfconfig)
 
-    def find_container_images(self, workflow_directory):
+    def find_container_images_revisions(self, workflow_directories):
+        """Find the container image names of several downloaded revisions.
+
+        Running `nextflow config` is slow, so the configs of all revisions are extracted in parallel.
+        The containers of all revisions are then accumulated in :attr:`self.containers`.
+
+        Args:
+            workflow_directories (list of str): The directories of the downloaded revisions.
+
+        Returns:
+            dict: The containers required by each of the workflow directories.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
+            nf_configs = list(pool.map(nf_core.utils.fetch_wf_config, workflow_directories))
+
+        return {
+            workflow_directory: self.find_container_images(workflow_directory, nf_config=nf_config)
+            for workflow_directory, nf_config in zip(workflow_directories, nf_configs)
+        }
+
+    def find_container_images(self, workflow_directory, nf_config=None):
         """Find container image names for workflow.
 
         Starts by using `nextflow config` to pull out any process.container
@@ -670,6 +845,13 @@ class DownloadWorkflow:
         Second, we look for DSL2 containers. These can't be found with
         `nextflow config` at the time of writing, so we scrape the pipeline files.
         This returns raw matches that will likely need to be cleaned.
+
+        Args:
+            workflow_directory (str): The directory of the downloaded workflow.
+            nf_config (dict, None): The flattened workflow config, if it was already fetched.
+
+        Returns:
+            list: The containers required by this workflow directory alone.
         """
 
         log.debug("Fetching container names for workflow")
@@ -679,7 +861,7 @@ class DownloadWorkflow:
         module_findings = []
 
         # Use linting code to parse the pipeline nextflow config
-        self.nf_config = nf_core.utils.fetch_wf_config(workflow_directory)
+        self.nf_config = nf_config if nf_config is not None else nf_core.utils.fetch_wf_config(workflow_directory)
 
         # Find any config variables that look like a container
         for k, v in self.nf_config.items():
@@ -692,10 +874,7 @@ class DownloadWorkflow:
                 """
 
                 # for DSL2 syntax in process scope of configs
-                config_regex = re.compile(
-                    r"[\\s{}=$]*(?P<quote>(?<![\\])[\'\"])(?P<param>(?:.(?!(?<![\\])\1))*.?)\1[\\s}]*"
-                )
-                config_findings_dsl2 = re.findall(config_regex, v)
+                config_findings_dsl2 = CONFIG_CONTAINER_REGEX.findall(v)
 
                 if bool(config_findings_dsl2):
                     # finding fill always be a tuple of length 2, first the quote used and second the enquoted value.
@@ -715,43 +894,73 @@ class DownloadWorkflow:
         config_findings = self.rectify_raw_container_matches(config_findings[:])
 
         # Recursive search through any DSL2 module files for container spec lines.
-        for subdir, _, files in os.walk(os.path.join(workflow_directory, "modules")):
-            for file in files:
-                if file.endswith(".nf"):
-                    file_path = os.path.join(subdir, file)
-                    with open(file_path, "r") as fh:
-                        # Look for any lines with container "xxx" or container 'xxx'
-                        search_space = fh.read()
-                        """
-                        Figure out which quotes were used and match everything until the closing quote.
-                        Since the other quote typically appears inside, a simple r"container\\s*[\"\']([^\"\']*)[\"\']" unfortunately abridges the matches.
-
-                        container\\s+[\\s{}$=]* matches the literal word "container" followed by whitespace, brackets, equal or variable names.
-                        (?P<quote>[\'\"]) The quote character is captured into the quote group \1.
-                        The pattern (?:.(?!\1))*.? is used to match any character (.) not followed by the closing quote character (?!\1).
-                        This capture happens greedy *, but we add a .? to ensure that we don't match the whole file until the last occurrence
-                        of the closing quote character, but rather stop at the first occurrence. \1 inserts the matched quote character into the regex, either " or '.
-                        It may be followed by whitespace or closing bracket [\\s}]*
-                        re.DOTALL is used to account for the string to be spread out across multiple lines.
-                        """
-                        container_regex = re.compile(
-                            r"container\s+[\\s{}=$]*(?P<quote>[\'\"])(?P<param>(?:.(?!\1))*.?)\1[\\s}]*", re.DOTALL
-                        )
-
-                        local_module_findings = re.findall(container_regex, search_space)
+        module_files = [
+            os.path.join(subdir, file)
+            for subdir, _, files in os.walk(os.path.join(workflow_directory, "modules"))
+            for file in files
+            if file.endswith(".nf")
+        ]
 
-                        # finding fill always be a tuple of length 2, first the quote used and second the enquoted value.
-                        for finding in local_module_findings:
-                            # append finding since we want to collect them from all modules
-                            # also append search_space because we need to start over later if nothing was found.
-                            module_findings.append((finding + (search_space, file_path)))
+        def read_module_file(file_path):
+            with open(file_path, "r") as fh:
+                return fh.read()
+
+        # Reading many small files is I/O bound, so read them concurrently (helps a lot on network file systems)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
+            module_contents = pool.map(read_module_file, module_files)
+
+            for file_path, search_space in zip(module_files, module_contents):
+                # Modules rarely change between revisions, so the findings are cached by file content.
+                content_hash = hashlib.sha256(search_space.encode("utf-8")).hexdigest()
+                if content_hash not in self.module_findings_cache:
+                    # append search_space because we need to start over later if nothing was found.
+                    local_module_findings = [
+                        finding + (search_space, file_path) for finding in self.find_container_directives(search_space)
+                    ]
+                    self.module_findings_cache[content_hash] = self.rectify_raw_container_matches(local_module_findings)
+                module_findings.extend(self.module_findings_cache[content_hash])
 
         # Not sure if there will ever be multiple container definitions per module, but beware DSL3.
-        # Like above run on shallow copy, because length may change at runtime.
-        module_findings = self.rectify_raw_container_matches(module_findings[:])
+        module_findings = self.prioritize_direct_download(module_findings)
 
         # Again clean list, in case config declares Docker URI but module or previous finding already had the http:// download
         self.containers = self.prioritize_direct_download(previous_findings + config_findings + module_findings)
+        return self.prioritize_direct_download(config_findings + module_findings)
+
+    @staticmethod
+    def find_container_directives(search_space):
+        """Find the raw values of all `container` directives in the contents of a module file.
+
+        Figure out which quotes were used and take everything until the closing quote.
+        Since the other quote typically appears inside, a simple r"container\\s*[\"\']([^\"\']*)[\"\']" unfortunately abridges the matches.
+
+        :data:`CONTAINER_DIRECTIVE_REGEX` matches the literal word "container" followed by whitespace, brackets, equal or
+        variable names and captures the opening quote character. The value is then everything up to the next occurrence of
+        the same quote, which may be spread out across multiple lines. Scanning continues after the closing quote,
+        so the contents are traversed only once, unlike with the former backtracking ``(?:.(?!\\1))*.?`` pattern.
+
+        Args:
+            search_space (str): The contents of a module file.
+
+        Returns:
+            list of tuple: Tuples of length 2, first the quote used and second the enquoted value.
+        """
+        findings = []
+        position = 0
+        while True:
+            directive = CONTAINER_DIRECTIVE_REGEX.search(search_space, position)
+            if directive is None:
+                return findings
+            quote = directive.group("quote")
+            closing_quote = search_space.find(quote, directive.end())
+            if closing_quote == -1:
+                # unterminated string, continue looking for the next directive
+                position = directive.start() + 1
+                continue
+            # an empty container directive does not declare any image
+            if closing_quote > directive.end():
+                findings.append((quote, search_space[directive.end() : closing_quote]))
+            position = closing_quote + 1
 
     def rectify_raw_container_matches(self, raw_findings):
         """Helper function to rectify the raw extracted container matches into fully qualified container names.
@@ -783,16 +992,6 @@ class DownloadWorkflow:
         """
         cleaned_matches = []
 
-        # Thanks Stack Overflow for the regex: https://stackoverflow.com/a/3809435/713980
-        url_regex = (
-            r"https?:\/\/(www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*)"
-        )
-        # Thanks Stack Overflow for the regex: https://stackoverflow.com/a/39672069/713980
-        docker_regex = r"^(?:(?=[^:\/]{1,253})(?!-)[a-zA-Z0-9-]{1,63}(?<!-)(?:\.(?!-)[a-zA-Z0-9-]{1,63}(?<!-))*(?::[0-9]{1,5})?/)?((?![._-])(?:[a-z0-9._-]*)(?<![._-])(?:/(?![._-])[a-z0-9._-]*(?<![._-]))*)(?::(?![.-])[a-zA-Z0-9_.-]{1,128})?$"
-
-        # at this point, we don't have to distinguish anymore, because we will later prioritize direct downloads over Docker URIs.
-        either_url_or_docker = re.compile(f"{url_regex}|{docker_regex}", re.S)
-
         for _, container_value, search_space, file_path in raw_findings:
             """
             Now we need to isolate all container paths (typically quoted strings) from the raw container_value
@@ -830,7 +1029,7 @@ class DownloadWorkflow:
             or a plain URL like in the old DSL2 convention
 
             """
-            direct_match = re.match(either_url_or_docker, container_value.strip())
+            direct_match = URL_OR_DOCKER_REGEX.match(container_value.strip())
             if direct_match:
                 cleaned_matches.append(direct_match.group(0))
                 continue  # oh yes, that was plain sailing
@@ -843,9 +1042,7 @@ class DownloadWorkflow:
             (?P<param>(?:.(?!(?<![\\])\1))*.?)\1 is basically what I used above, but again has the (?<![\\]) inserted before \1 to account for escapes.
             """
 
-            container_value_defs = re.findall(
-                r"[^\"\'](?P<quote>(?<![\\])[\'\"])(?P<param>(?:.(?!(?<![\\])\1))*.?)\1", container_value
-            )
+            container_value_defs = CONTAINER_VALUE_REGEX.findall(container_value)
 
             """
             eliminate known false positives and create plain list out of the tuples returned by the regex above
@@ -864,7 +1061,7 @@ class DownloadWorkflow:
             At this point, we just add everything that is either a URL or a Docker URI to cleaned matches.
             """
 
-            valid_containers = list(filter(either_url_or_docker.match, container_value_defs))
+            valid_containers = list(filter(URL_OR_DOCKER_REGEX.match, container_value_defs))
 
             if valid_containers:
                 cleaned_matches = cleaned_matches + valid_containers
@@ -955,7 +1152,7 @@ class DownloadWorkflow:
             log.info("No container names found in workflow")
         else:
             log.info(
-                f"Processing workflow revision {current_revision}, found {len(self.containers)} container image{'s' if len(self.containers) > 1 else ''} in total."
+                f"Processing workflow revision{'s' if ',' in current_revision else ''} {current_revision}, found {len(self.containers)} container image{'s' if len(self.containers) > 1 else ''} in total."
             )
 
             with DownloadProgress() as progress:
@@ -968,23 +1165,25 @@ class DownloadWorkflow:
                 containers_cache = []
                 containers_download = []
                 containers_pull = []
+                checked_dirs = set()
                 for container in self.containers:
                     # Fetch the output and cached filenames for this container
                     out_path, cache_path = self.singularity_image_filenames(container)
 
-                    # Check that the directories exist
-                    out_path_dir = os.path.dirname(out_path)
-                    if not os.path.isdir(out_path_dir):
-                        log.debug(f"Output directory not found, creating: {out_path_dir}")
-                        os.makedirs(out_path_dir)
-                    if cache_path:
-                        cache_path_dir = os.path.dirname(cache_path)
-                        if not os.path.isdir(cache_path_dir):
-                            log.debug(f"Cache directory not found, creating: {cache_path_dir}")
-                            os.makedirs(cache_path_dir)
+                    # Check that the directories exist, only once for all containers
+                    for path_dir in {os.path.dirname(out_path), os.path.dirname(cache_path) if cache_path else None}:
+                        if path_dir and path_dir not in checked_dirs:
+                            checked_dirs.add(path_dir)
+                            if not os.path.isdir(path_dir):
+                                log.debug(f"Directory not found, creating: {path_dir}")
+                                os.makedirs(path_dir)
 
                     # We already have the target file in place or in remote cache, return
-                    if os.path.exists(out_path) or os.path.basename(out_path) in self.containers_remote:
+                    if (
+                        os.path.exists(out_path)
+                        or out_path in self.archived_paths
+                        or self.singularity_image_in_remote_cache(out_path, cache_path)
+                    ):
                         containers_exist.append(container)
                         continue
 
@@ -1002,7 +1201,7 @@ class DownloadWorkflow:
                     containers_pull.append([container, out_path, cache_path])
 
                 # Exit if we need to pull images and Singularity is not installed
-                if len(containers_pull) > 0:
+                if len(containers_pull) > 0 and self.container_pull_method == "singularity":
                     if not (shutil.which("singularity") or shutil.which("apptainer")):
                         raise OSError(
                             "Singularity/Apptainer is needed to pull images, but it is not installed or not in $PATH"
@@ -1024,16 +1223,20 @@ class DownloadWorkflow:
                         self.singularity_copy_cache_image(*container)
                         progress.update(task, advance=1)
 
+                if containers_pull and self.container_pull_method == "oci":
+                    self.oci_pull_images(containers_pull, progress, task)
+                    containers_pull = []
+
                 if containers_download or containers_pull:
                     # if clause gives slightly better UX, because Download is no longer displayed if nothing is left to be downloaded.
                     with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
                         progress.update(task, description="Downloading singularity images")
 
                         # Kick off concurrent downloads
-                        future_downloads = [
-                            pool.submit(self.singularity_download_image, *container, progress)
+                        future_downloads = {
+                            pool.submit(self.singularity_download_image, *container, progress): container
                             for container in containers_download
-                        ]
+                        }
 
                         # Make ctrl-c work with multi-threading
                         self.kill_with_fire = False
@@ -1042,6 +1245,8 @@ class DownloadWorkflow:
                             # Iterate over each threaded download, waiting for them to finish
                             for future in concurrent.futures.as_completed(future_downloads):
                                 future.result()
+                                # Archive writes happen on the main thread only
+                                self.singularity_archive_image(*future_downloads[future][1:])
                                 try:
                                     progress.update(task, advance=1)
                                 except Exception as e:
@@ -1064,6 +1269,7 @@ class DownloadWorkflow:
                         for library in self.container_library[:]:
                             try:
                                 self.singularity_pull_image(*container, library, progress)
+                                self.singularity_archive_image(*container[1:])
                                 # Pulling the image was successful, no ContainerError was raised, break the library loop
                                 break
                             except ContainerError.ImageExists as e:
@@ -1105,6 +1311,33 @@ class DownloadWorkflow:
                         # Task should advance in any case. Failure to pull will not kill the download process.
                         progress.update(task, advance=1)
 
+    def singularity_image_in_remote_cache(self, out_path, cache_path):
+        """Check if an image is already available in the remote $NXF_SINGULARITY_CACHEDIR.
+
+        Images are found by file name. If the index provides the size or digest of an image and
+        there is a local copy in $NXF_SINGULARITY_CACHEDIR, the remote image also has to match these.
+        Otherwise the remote copy is considered outdated and the image is transferred again.
+        """
+        image_name = os.path.basename(out_path)
+        if image_name not in self.containers_remote:
+            return False
+        details = self.containers_remote_details.get(image_name, {})
+        if not details or not cache_path or not os.path.exists(cache_path):
+            return True
+        if "size" in details and os.path.getsize(cache_path) != details["size"]:
+            log.debug(f"Remote image '{image_name}' differs in size from the cached copy and will be retrieved.")
+            return False
+        if "digest" in details:
+            algorithm, _, expected_digest = details["digest"].rpartition(":")
+            hash_digest = hashlib.new(algorithm or "sha256")
+            with open(cache_path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(io.DEFAULT_BUFFER_SIZE), b""):
+                    hash_digest.update(chunk)
+            if hash_digest.hexdigest() != expected_digest:
+                log.debug(f"Remote image '{image_name}' differs in digest from the cached copy and will be retrieved.")
+                return False
+        return True
+
     def singularity_image_filenames(self, container):
         """Check Singularity cache for image, copy to destination folder if found.
 
@@ -1154,8 +1387,25 @@ class DownloadWorkflow:
         """Copy Singularity image from NXF_SINGULARITY_CACHEDIR to target folder."""
         # Copy to destination folder if we have a cached version
         if cache_path and os.path.exists(cache_path):
-            log.debug(f"Copying {container} from cache: '{os.path.basename(out_path)}'")
-            shutil.copyfile(cache_path, out_path)
+            if self.archive is not None:
+                log.debug(f"Archiving {container} from cache: '{os.path.basename(out_path)}'")
+                self.singularity_archive_image(out_path, cache_path)
+            else:
+                log.debug(f"Copying {container} from cache: '{os.path.basename(out_path)}'")
+                shutil.copyfile(cache_path, out_path)
+
+    def singularity_archive_image(self, out_path, cache_path):
+        """Stream a retrieved image into the archive, if the download is being compressed.
+
+        Images in $NXF_SINGULARITY_CACHEDIR are read from there directly, all others are
+        deleted from the output directory once archived. Images that are only amended to
+        the cache are not part of the output and thus not archived.
+        """
+        if self.archive is not None and nf_core.utils.is_relative_to(out_path, os.path.abspath(self.outdir)):
+            # The image is deleted after archiving, so record it for the download manifest now
+            if cache_path is None:
+                self.container_details[os.path.abspath(out_path)] = self.image_details(out_path)
+            self.add_to_archive(out_path, source_path=cache_path)
 
     def singularity_download_image(self, container, out_path, cache_path, progress):
         """Download a singularity image from the web.
@@ -1206,8 +1456,8 @@ class DownloadWorkflow:
             os.rename(output_path_tmp, output_path)
             output_path_tmp = None
 
-            # Copy cached download if we are using the cache
-            if cache_path:
+            # Copy cached download if we are using the cache, unless it is streamed into the archive
+            if cache_path and self.archive is None:
                 log.debug(f"Copying {container} from cache: '{os.path.basename(out_path)}'")
                 progress.update(task, description="Copying from cache to target directory")
                 shutil.copyfile(cache_path, out_path)
@@ -1292,44 +1542,692 @@ class DownloadWorkflow:
                     error_msg=lines,
                 )
 
-        # Copy cached download if we are using the cache
-        if cache_path:
+        # Copy cached download if we are using the cache, unless it is streamed into the archive
+        if cache_path and self.archive is None:
             log.debug(f"Copying {container} from cache: '{os.path.basename(out_path)}'")
             progress.update(task, current_log="Copying from cache to target directory")
             shutil.copyfile(cache_path, out_path)
 
         progress.remove_task(task)
 
+    def oci_pull_images(self, containers, progress, task):
+        """Fetch images natively from the registries into a shared OCI image layout.
+
+        This does not need Singularity/Apptainer on the download host. Manifests and layers are fetched
+        concurrently and layers shared by several images are only downloaded once. Building SIF files from
+        the layout is left to the user, e.g. on the offline cluster.
+
+        Args:
+            containers (list): ``[container, out_path, cache_path]`` of the images to fetch.
+        """
+        layout_dir = self.oci_layout_dir or os.path.join(self.outdir, "oci-images")
+        progress.update(task, description="Fetching images from registries")
+        pulled = {}
+        with nf_core.oci_registry.OCIRegistryClient(layout_dir, max_workers=self.parallel_downloads) as client:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
+                future_pulls = {
+                    pool.submit(self.oci_pull_image, client, container): container for container, _, _ in containers
+                }
+                try:
+                    for future in concurrent.futures.as_completed(future_pulls):
+                        descriptor = future.result()
+                        if descriptor is not None:
+                            pulled[future_pulls[future]] = descriptor
+                        progress.update(task, advance=1)
+                except KeyboardInterrupt:
+                    for future in future_pulls:
+                        future.cancel()
+                    raise
+
+        self.oci_images.update(pulled)
+        if pulled:
+            log.info(
+                f"Fetched {len(pulled)} image{'s' if len(pulled) > 1 else ''} into the OCI image layout '{layout_dir}'. "
+                f"Build Singularity images with [bright_magenta]singularity build <image>.img oci:{os.path.basename(layout_dir)}:<reference>[/]"
+            )
+        if self.archive is not None:
+            self.add_to_archive(layout_dir)
+        return pulled
+
+    def oci_pull_image(self, client, container):
+        """Fetch a single image into the OCI image layout, trying all container libraries.
+
+        Returns:
+            dict: Descriptor of the image in the layout index, or None if the image could not be fetched.
+        """
+        # An explicitly specified registry overrides the container libraries
+        absolute_URI = nf_core.oci_registry.parse_image_reference(container, default_registry=None)[0] is not None
+        for library in self.container_library[:1] if absolute_URI else self.container_library:
+            try:
+                return client.pull(container, default_registry=library)
+            except nf_core.oci_registry.OCIRegistryError as e:
+                log.debug(f"Fetching '{container}' from '{library}' failed: {e}")
+        log.error(f"Not able to fetch image of {container}. Service might be down or internet connection is dead.")
+        return None
+
+    def prune_singularity_images(self):
+        """Delete images from the output directory, which are not required by any of the downloaded revisions."""
+        images_dir = os.path.join(self.outdir, "singularity-images")
+        if not os.path.isdir(images_dir):
+            return
+        required = {os.path.basename(self.singularity_image_filenames(container)[0]) for container in self.containers}
+        unreferenced = sorted(set(os.listdir(images_dir)) - required)
+        for image in unreferenced:
+            log.debug(f"Deleting unreferenced image: '{image}'")
+            os.remove(os.path.join(images_dir, image))
+        if unreferenced:
+            log.info(f"Deleted {len(unreferenced)} image{'s' if len(unreferenced) > 1 else ''} no longer required")
+
+    def prune_oci_images(self):
+        """Delete images from the OCI image layout, which are not required by any of the downloaded revisions.
+
+        Blobs that are only used by the deleted images are deleted too.
+        """
+        layout_dir = self.oci_layout_dir or os.path.join(self.outdir, "oci-images")
+        if not os.path.exists(os.path.join(layout_dir, "index.json")):
+            return
+        # Images are recorded under the container library they were fetched from, keep all candidates
+        required = {
+            nf_core.oci_registry.image_ref_name(container, default_registry=library)
+            for container in self.containers
+            if not container.startswith("http")
+            for library in self.container_library
+        }
+        removed_images, removed_blobs = nf_core.oci_registry.prune_layout(layout_dir, required)
+        if removed_images or removed_blobs:
+            log.info(
+                f"Deleted {removed_images} image{'s' if removed_images != 1 else ''} and {removed_blobs} "
+                f"blob{'s' if removed_blobs != 1 else ''} no longer required from the OCI image layout"
+            )
+
+    @staticmethod
+    def image_details(path, algorithm="sha256"):
+        """Size and digest of an image file, as used in the download manifest and the remote container index."""
+        hash_digest = hashlib.new(algorithm)
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(io.DEFAULT_BUFFER_SIZE * 16), b""):
+                hash_digest.update(chunk)
+        return {"size": os.path.getsize(path), "digest": f"{algorithm}:{hash_digest.hexdigest()}"}
+
+    def read_download_manifest(self):
+        """Read the manifest of the download in :attr:`self.outdir`, which is updated.
+
+        Revisions whose directory has been deleted since are dropped from the manifest,
+        so that their images are pruned if no other revision needs them.
+        """
+        manifest_path = os.path.join(self.outdir, DOWNLOAD_MANIFEST)
+        if self.tower:
+            raise DownloadError("Downloads for Tower can not be updated.")
+        if self.compress_type is not None:
+            raise DownloadError("Updates are applied to an uncompressed download, `--compress` can not be used.")
+        if not os.path.exists(manifest_path):
+            raise DownloadError(f"No download manifest '{manifest_path}' found, nothing to update.")
+        try:
+            with open(manifest_path, "r") as fh:
+                self.manifest = json.load(fh)
+        except json.JSONDecodeError as e:
+            raise DownloadError(f"Could not read the download manifest '{manifest_path}': {e}") from e
+        if self.manifest.get("pipeline") != self.pipeline:
+            raise DownloadError(
+                f"'{self.outdir}' contains a download of '{self.manifest.get('pipeline')}', not '{self.pipeline}'."
+            )
+        self.manifest["revisions"] = {
+            revision: details
+            for revision, details in self.manifest.get("revisions", {}).items()
+            if os.path.isdir(os.path.join(self.outdir, details["directory"]))
+        }
+
+    def write_download_manifest(self, revision_dirnames):
+        """Write the download manifest, which lists the revisions, the configs commit and the container images.
+
+        The manifest is required by ``--update`` and can also be used as ``--container-cache-index`` on the target system.
+
+        Args:
+            revision_dirnames (dict): Directories of the revisions downloaded in this run.
+        """
+        revisions = dict(self.manifest.get("revisions", {}))
+        for revision, revision_dirname in revision_dirnames.items():
+            revisions[revision] = {"sha": self.wf_sha[revision], "directory": revision_dirname}
+        for revision in revisions:
+            if revision in self.revision_containers:
+                revisions[revision]["containers"] = self.revision_containers[revision]
+
+        # Re-use the digests of unchanged images from the previous manifest, hashing large images is slow
+        previous_details = {entry.get("file"): entry for entry in self.manifest.get("containers", [])}
+
+        def container_entry(container):
+            if container in self.oci_images:
+                return {
+                    "container": container,
+                    "file": os.path.relpath(
+                        os.path.join(self.oci_layout_dir or os.path.join(self.outdir, "oci-images"), "index.json"),
+                        self.outdir,
+                    ),
+                    "reference": self.oci_images[container]["annotations"]["org.opencontainers.image.ref.name"],
+                    "digest": self.oci_images[container]["digest"],
+                }
+            out_path, cache_path = self.singularity_image_filenames(container)
+            entry = {"container": container}
+            if nf_core.utils.is_relative_to(out_path, os.path.abspath(self.outdir)):
+                entry["file"] = os.path.relpath(out_path, os.path.abspath(self.outdir))
+            else:
+                entry["file"] = out_path
+            image_path = next((path for path in [out_path, cache_path] if path and os.path.exists(path)), None)
+            previous = previous_details.get(entry["file"], {})
+            if os.path.abspath(out_path) in self.container_details:
+                entry.update(self.container_details[os.path.abspath(out_path)])
+            elif image_path and previous.get("size") == os.path.getsize(image_path) and "digest" in previous:
+                entry.update({"size": previous["size"], "digest": previous["digest"]})
+            elif image_path:
+                entry.update(self.image_details(image_path))
+            return entry
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
+            containers = list(pool.map(container_entry, self.containers))
+
+        manifest = {
+            "pipeline": self.pipeline,
+            "nf_core_version": nf_core.__version__,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "configs": (
+                {"sha": self.configs_sha} if self.include_configs and self.configs_sha else self.manifest.get("configs")
+            ),
+            "revisions": revisions,
+            "containers": containers,
+        }
+        manifest_path = os.path.join(self.outdir, DOWNLOAD_MANIFEST)
+        log.debug(f"Writing download manifest: '{manifest_path}'")
+        with open(manifest_path, "w") as fh:
+            json.dump(manifest, fh, indent=4)
+            fh.write("\n")
+
+    def archive_name(self, path):
+        """Name of a path below :attr:`self.outdir` inside the archive."""
+        return os.path.relpath(os.path.abspath(path), os.path.dirname(os.path.abspath(self.outdir)))
+
+    def add_to_archive(self, out_path, source_path=None):
+        """Move a file or directory from the output directory into the archive.
+
+        Args:
+            out_path (str): Path below :attr:`self.outdir` that the file or directory should be archived as.
+            source_path (str, None): Read the contents from this path (e.g. an image in $NXF_SINGULARITY_CACHEDIR)
+                instead of ``out_path``. The source is not deleted.
+        """
+        # Directory entries of all parents, up to and including self.outdir
+        parents = []
+        parent = os.path.dirname(os.path.abspath(out_path))
+        while parent != os.path.dirname(os.path.abspath(self.outdir)):
+            parents.insert(0, parent)
+            parent = os.path.dirname(parent)
+        for parent in parents:
+            self.archive.add_directory_entry(parent, self.archive_name(parent))
+        self.archive.add(source_path or out_path, arcname=self.archive_name(out_path))
+        self.archived_paths.add(os.path.abspath(out_path))
+        if source_path is None:
+            if os.path.isdir(out_path):
+                shutil.rmtree(out_path)
+            else:
+                os.remove(out_path)
+
     def compress_download(self):
-        """Take the downloaded files and make a compressed .tar.gz archive."""
-        log.debug(f"Creating archive: {self.output_filename}")
+        """Take the downloaded files and make a compressed archive.
 
-        # .tar.gz and .tar.bz2 files
-        if self.compress_type in ["tar.gz", "tar.bz2"]:
-            ctype = self.compress_type.split(".")[1]
-            with tarfile.open(self.output_filename, f"w:{ctype}") as tar:
-                tar.add(self.outdir, arcname=os.path.basename(self.outdir))
-            tar_flags = "xzf" if ctype == "gz" else "xjf"
-            log.info(f"Command to extract files: [bright_magenta]tar -{tar_flags} {self.output_filename}[/]")
+        Anything that has not already been streamed into the archive during the download is added now.
+        The archive is written as a stream, so the MD5 checksum is calculated while writing
+        and the output file does not have to be read again afterwards.
+        """
+        log.debug(f"Creating archive: {self.output_filename}")
 
-        # .zip files
-        if self.compress_type == "zip":
-            with ZipFile(self.output_filename, "w") as zip_file:
-                # Iterate over all the files in directory
-                for folder_name, _, filenames in os.walk(self.outdir):
-                    for filename in filenames:
-                        # create complete filepath of file in directory
-                        file_path = os.path.join(folder_name, filename)
-                        # Add file to zip
-                        zip_file.write(file_path)
-            log.info(f"Command to extract files: [bright_magenta]unzip {self.output_filename}[/]")
+        if self.archive is None:
+            self.archive = DownloadArchive(self.output_filename, self.compress_type)
+        with self.archive:
+            self.archive.add(self.outdir, arcname=self.archive_name(self.outdir))
+        log.info(
+            f"Command to extract files: [bright_magenta]{DownloadArchive.EXTRACT_COMMANDS[self.compress_type]} {self.output_filename}[/]"
+        )
 
         # Delete original files
         log.debug(f"Deleting uncompressed files: '{self.outdir}'")
         shutil.rmtree(self.outdir)
 
-        # Calculate md5sum for output file
-        log.info(f"MD5 checksum for '{self.output_filename}': [blue]{nf_core.utils.file_md5(self.output_filename)}[/]")
+        # MD5 checksum of the output file was calculated during writing
+        log.info(f"MD5 checksum for '{self.output_filename}': [blue]{self.archive.md5}[/]")
+
+
+def link_or_copy(source, destination):
+    """Hard-link a file, so that it does not take up additional space. Copy it if linking is not possible."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class DownloadWorkflowBatch:
+    """Downloads several nf-core workflows at once, e.g. to mirror them for offline use.
+
+    The list of remote workflows and the institutional configs are fetched only once. The containers
+    of all pipelines and revisions are resolved first and their union is downloaded in a single pass with
+    :attr:`parallel_downloads` at a time. Then every pipeline is laid out in its own self-contained directory
+    below :attr:`outdir`, where the configs and container images are hard-linked where possible.
+
+    Args:
+        pipelines_file (str): A file listing one pipeline per line, optionally followed by the revisions
+            to download, e.g. ``nf-core/rnaseq 3.12.0 3.13.0``. Without revisions, the latest release is downloaded.
+        all_released (bool): Download the latest release of all released nf-core pipelines that are not archived.
+        outdir (str): Path to the local download directory. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        pipelines_file=None,
+        all_released=False,
+        outdir=None,
+        compress_type=None,
+        force=False,
+        download_configuration=None,
+        container_system=None,
+        container_library=None,
+        container_cache_utilisation=None,
+        container_cache_index=None,
+        parallel_downloads=4,
+        container_pull_method="singularity",
+    ):
+        self.pipelines_file = pipelines_file
+        self.all_released = all_released
+        self.outdir = outdir if outdir else f"nf-core-pipelines_{datetime.now().strftime('%Y-%m-%d_%H-%M')}"
+        self.compress_type = None if compress_type == "none" else compress_type
+        self.output_filename = f"{self.outdir}.{self.compress_type}" if self.compress_type else None
+        self.force = force
+        self.include_configs = bool(download_configuration)
+        self.parallel_downloads = parallel_downloads
+
+        self.wfs = nf_core.list.Workflows()
+        self.wfs.get_remote_workflows()
+
+        # Shared assets (configs and container images) are retrieved once into the top-level directory
+        self.shared = DownloadWorkflow(
+            outdir=self.outdir,
+            compress_type=self.compress_type,
+            container_system=container_system,
+            container_library=container_library,
+            container_cache_utilisation=container_cache_utilisation,
+            container_cache_index=container_cache_index,
+            parallel_downloads=parallel_downloads,
+            container_pull_method=container_pull_method,
+            wfs=self.wfs,
+        )
+        self.shared.output_filename = self.output_filename
+        self.downloads = []
+
+    def download_workflows(self):
+        """Starts the download of all selected nf-core workflows."""
+        pipelines = self.get_pipelines()
+
+        # Check that the outdir and compressed output file don't already exist
+        for path in [self.outdir, self.output_filename]:
+            if path and os.path.exists(path):
+                if not self.force:
+                    raise DownloadError(f"'{path}' already exists (use [red]--force[/] to overwrite)")
+                log.warning(f"Deleting existing output: '{path}'")
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+
+        log.info(
+            f"Saving {len(pipelines)} pipeline{'s' if len(pipelines) > 1 else ''} to '{self.output_filename or self.outdir}'"
+        )
+        self.shared.read_remote_containers()
+        os.makedirs(self.outdir)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
+            # Resolving the revisions queries the GitHub API for every pipeline
+            try:
+                futures = [pool.submit(self.prepare_download, pipeline, revisions) for pipeline, revisions in pipelines]
+                self.downloads = [future.result() for future in futures]
+            except AssertionError as e:
+                raise DownloadError(e) from e
+            for download in self.downloads:
+                log.info(
+                    f"Pipeline '{download.pipeline}', revision{'s' if len(download.revision) > 1 else ''}: '{', '.join(download.revision)}'"
+                )
+
+            if self.include_configs:
+                log.info("Downloading centralised configs from GitHub")
+                self.shared.download_configs()
+
+            log.info("Downloading workflow files from GitHub")
+            revision_dirnames = list(pool.map(self.download_pipeline, self.downloads))
+
+            if self.shared.container_system == "singularity":
+                # Modules are mostly shared between pipelines, so share the findings as well
+                for download in self.downloads:
+                    download.module_findings_cache = self.shared.module_findings_cache
+                list(pool.map(DownloadWorkflow.find_revision_containers, self.downloads, revision_dirnames))
+
+        if self.shared.container_system == "singularity":
+            # Fetch the union of the containers of all pipelines only once
+            self.shared.containers = self.shared.prioritize_direct_download(
+                [container for download in self.downloads for container in download.containers]
+            )
+            try:
+                self.shared.get_singularity_images(current_revision=", ".join(d.pipeline for d in self.downloads))
+            except OSError as e:
+                raise DownloadError(f"[red]{e}[/]") from e
+            self.link_singularity_images()
+
+        for download, dirnames in zip(self.downloads, revision_dirnames):
+            download.write_download_manifest(dirnames)
+
+        # The shared copies have been laid out into the pipeline directories
+        for shared_dir in ["configs", "singularity-images"]:
+            if os.path.isdir(os.path.join(self.outdir, shared_dir)):
+                shutil.rmtree(os.path.join(self.outdir, shared_dir))
+
+        if self.compress_type is not None:
+            log.info("Compressing output into archive")
+            self.shared.compress_download()
+
+    def get_pipelines(self):
+        """Collect the pipelines to download from the list file and the released nf-core pipelines.
+
+        Returns:
+            list: Tuples of the pipeline name and a list of the revisions to download.
+        """
+        pipelines = []
+        if self.pipelines_file:
+            try:
+                with open(self.pipelines_file, "r") as fh:
+                    for line in fh:
+                        # Skip empty lines and comments
+                        line = line.split("#")[0].strip()
+                        if line:
+                            pipeline, *revisions = line.split()
+                            pipelines.append((pipeline, revisions))
+            except OSError as e:
+                raise DownloadError(f"Could not read the list of pipelines: {e}") from e
+        if self.all_released:
+            listed = {pipeline for pipeline, _ in pipelines}
+            for wf in sorted(self.wfs.remote_workflows, key=lambda wf: wf.full_name):
+                if wf.releases and not wf.archived and not {wf.name, wf.full_name} & listed:
+                    pipelines.append((wf.full_name, []))
+        if not pipelines:
+            raise DownloadError("No pipelines were selected for download.")
+        return pipelines
+
+    def prepare_download(self, pipeline, revisions):
+        """Set up the download of a single pipeline. Without revisions, the latest release is downloaded."""
+        download = DownloadWorkflow(
+            pipeline=pipeline,
+            revision=tuple(revisions),
+            download_configuration=self.include_configs,
+            container_system=self.shared.container_system,
+            container_library=tuple(self.shared.container_library),
+            container_cache_utilisation=self.shared.container_cache_utilisation,
+            parallel_downloads=self.parallel_downloads,
+            container_pull_method=self.shared.container_pull_method,
+            wfs=self.wfs,
+        )
+        download.pipeline, download.wf_revisions, download.wf_branches = nf_core.utils.get_repo_releases_branches(
+            pipeline, self.wfs
+        )
+        if not download.revision:
+            if not download.wf_revisions:
+                raise AssertionError(f"No releases of {download.pipeline} available for download.")
+            download.revision = [download.wf_revisions[0]["tag_name"]]
+        download.outdir = os.path.join(self.outdir, download.pipeline.replace("/", "-").lower())
+        # OCI images are fetched into one layout for all pipelines
+        download.oci_layout_dir = os.path.join(self.outdir, "oci-images")
+        download.get_revision_hash()
+        return download
+
+    def download_pipeline(self, download):
+        """Lay out the configs and download the revisions of a single pipeline."""
+        os.makedirs(download.outdir)
+        if self.include_configs:
+            shutil.copytree(
+                os.path.join(self.outdir, "configs"),
+                os.path.join(download.outdir, "configs"),
+                copy_function=link_or_copy,
+            )
+            download.configs_sha = self.shared.configs_sha
+        return download.download_revisions()
+
+    def link_singularity_images(self):
+        """Lay out the images required by each pipeline from the shared download."""
+        shared_images = {}
+        for container in self.shared.containers:
+            shared_path, _ = self.shared.singularity_image_filenames(container)
+            if os.path.exists(shared_path):
+                shared_images[container] = shared_path
+
+        # Hash every shared image only once for the download manifests
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as pool:
+            details = dict(zip(shared_images, pool.map(DownloadWorkflow.image_details, shared_images.values())))
+
+        for download in self.downloads:
+            for container in download.containers:
+                if container in self.shared.oci_images:
+                    download.oci_images[container] = self.shared.oci_images[container]
+                out_path, _ = download.singularity_image_filenames(container)
+                # Images amended to $NXF_SINGULARITY_CACHEDIR are not part of the output
+                if container not in shared_images or out_path == shared_images[container]:
+                    continue
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                link_or_copy(shared_images[container], out_path)
+                download.container_details[os.path.abspath(out_path)] = details[container]
+
+
+class HashingWriter:
+    """A write-only file wrapper, which calculates the MD5 checksum of everything written through it.
+
+    The wrapper deliberately does not implement ``tell()`` and ``seek()``, so that ``ZipFile``
+    treats it as an unseekable stream and never rewrites data that has already been hashed.
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.hash_md5 = hashlib.md5()
+
+    def write(self, data):
+        self.hash_md5.update(data)
+        return self.fileobj.write(data)
+
+    def flush(self):
+        self.fileobj.flush()
+
+    def hexdigest(self):
+        return self.hash_md5.hexdigest()
+
+
+class ParallelGzipWriter:
+    """Compress a stream into a single gzip member, using multiple threads like `pigz`.
+
+    The input is cut into blocks, which are deflated concurrently (zlib releases the GIL).
+    Every block is primed with the last 32 KiB of its predecessor as dictionary and ends on a
+    byte boundary (``Z_SYNC_FLUSH``), so the concatenated blocks form one valid deflate stream.
+    The CRC32 of the uncompressed data is calculated sequentially on the calling thread.
+
+    Args:
+        fileobj: Writable file object receiving the compressed bytes.
+        level (int): Compression level. Defaults to 6, like `gzip`.
+        threads (int): Number of compression threads. Defaults to the number of CPUs.
+        block_size (int): Size of the uncompressed blocks. Defaults to 1 MiB.
+    """
+
+    DICT_SIZE = 32 * 1024
+
+    def __init__(self, fileobj, level=6, threads=None, block_size=1024 * 1024):
+        self.fileobj = fileobj
+        self.level = level
+        self.default_level = level
+        self.threads = threads or os.cpu_count() or 1
+        self.block_size = block_size
+        self.buffer = bytearray()
+        self.dictionary = b""
+        self.crc = 0
+        self.size = 0
+        self.pending = collections.deque()
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.threads)
+        # gzip header: magic number, deflate, no flags, mtime, no extra flags, unknown OS
+        self.fileobj.write(b"\x1f\x8b\x08\x00" + struct.pack("<I", int(time.time())) + b"\x00\xff")
+
+    @staticmethod
+    def _deflate_block(data, dictionary, level, last):
+        if dictionary:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, 0, dictionary)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+    def _submit_block(self, last=False):
+        data = bytes(self.buffer)
+        self.buffer = bytearray()
+        self.pending.append(self.pool.submit(self._deflate_block, data, self.dictionary, self.level, last))
+        self.dictionary = data[-self.DICT_SIZE :] if len(data) >= self.DICT_SIZE else self.dictionary + data
+        self.dictionary = self.dictionary[-self.DICT_SIZE :]
+        # Limit the number of compressed blocks held in memory
+        while len(self.pending) > 2 * self.threads:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def set_level(self, level):
+        """Change the compression level for all data written from now on, e.g. 0 to store incompressible files."""
+        if level != self.level:
+            if self.buffer:
+                self._submit_block()
+            self.level = level
+
+    def write(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            remainder = self.buffer[self.block_size :]
+            del self.buffer[self.block_size :]
+            self._submit_block()
+            self.buffer = remainder
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Compress the remaining data and write the gzip trailer. Does not close the underlying file object."""
+        self._submit_block(last=True)
+        while self.pending:
+            self.fileobj.write(self.pending.popleft().result())
+        self.pool.shutdown()
+        self.fileobj.write(struct.pack("<II", self.crc, self.size & 0xFFFFFFFF))
+
+
+class DownloadArchive:
+    """Writes files and directories into a compressed archive in a single streaming pass.
+
+    Supported types are ``tar.gz`` (multi-threaded gzip), ``tar.bz2``, ``tar.zst`` (multi-threaded zstd,
+    requires the `zstandard` package) and ``zip``. Container images are already compressed,
+    so they are stored instead of being compressed a second time wherever the format allows.
+    The MD5 checksum of the archive is available as :attr:`md5` after closing.
+
+    Args:
+        filename (str): Path of the archive to create.
+        compress_type (str): One of :attr:`EXTRACT_COMMANDS`.
+        threads (int): Number of compression threads. Defaults to the number of CPUs.
+    """
+
+    EXTRACT_COMMANDS = {
+        "tar.gz": "tar -xzf",
+        "tar.bz2": "tar -xjf",
+        "tar.zst": "tar --zstd -xf",
+        "zip": "unzip",
+    }
+    STORED_EXTENSIONS = (".img", ".sif")
+
+    def __init__(self, filename, compress_type, threads=None):
+        if compress_type not in self.EXTRACT_COMMANDS:
+            raise DownloadError(f"Unsupported compression type: '{compress_type}'")
+        self.filename = filename
+        self.compress_type = compress_type
+        self.threads = threads or os.cpu_count() or 1
+        self.md5 = None
+        self.compressor = None
+        self.directories = set()
+
+        self.fh = open(filename, "wb")
+        self.hasher = HashingWriter(self.fh)
+        if compress_type == "zip":
+            self.archive = ZipFile(self.hasher, "w", compression=ZIP_DEFLATED)
+        elif compress_type == "tar.bz2":
+            self.archive = tarfile.open(fileobj=self.hasher, mode="w|bz2")
+        else:
+            if compress_type == "tar.gz":
+                self.compressor = ParallelGzipWriter(self.hasher, threads=self.threads)
+            else:
+                try:
+                    import zstandard
+                except ImportError as e:
+                    self.fh.close()
+                    os.remove(filename)
+                    raise DownloadError(
+                        "The Python package `zstandard` is required for `tar.zst` compression: `pip install zstandard`"
+                    ) from e
+                self.compressor = zstandard.ZstdCompressor(threads=self.threads, write_checksum=True).stream_writer(
+                    self.hasher, closefd=False
+                )
+            self.archive = tarfile.open(fileobj=self.compressor, mode="w|")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, path, arcname):
+        """Add a file or recursively add a directory to the archive."""
+        if os.path.isdir(path) and not os.path.islink(path):
+            self.add_directory_entry(path, arcname)
+            for entry in sorted(os.listdir(path)):
+                self.add(os.path.join(path, entry), f"{arcname}/{entry}")
+        else:
+            self.add_file(path, arcname)
+
+    def add_directory_entry(self, path, arcname):
+        """Add a directory entry. Entries are only written once, even if files are streamed into the directory later."""
+        if arcname in self.directories:
+            return
+        self.directories.add(arcname)
+        if self.compress_type == "zip":
+            self.archive.write(path, arcname)
+        else:
+            self.archive.addfile(self.archive.gettarinfo(path, arcname))
+
+    def add_file(self, path, arcname):
+        """Add a single file to the archive. Container images are stored without compression."""
+        # Layers in OCI image layouts are already compressed
+        stored = arcname.endswith(self.STORED_EXTENSIONS) or "/blobs/sha256/" in arcname
+        if self.compress_type == "zip":
+            self.archive.write(path, arcname, compress_type=ZIP_STORED if stored else ZIP_DEFLATED)
+            return
+        if isinstance(self.compressor, ParallelGzipWriter):
+            self.compressor.set_level(0 if stored else self.compressor.default_level)
+        with open(path, "rb") as fh:
+            self.archive.addfile(self.archive.gettarinfo(path, arcname), fh)
+
+    def close(self):
+        if self.md5 is not None:
+            return
+        self.archive.close()
+        if self.compressor is not None:
+            self.compressor.close()
+        self.fh.close()
+        self.md5 = self.hasher.hexdigest()
+
+    def discard(self):
+        """Abandon an incomplete archive and delete it."""
+        if isinstance(self.compressor, ParallelGzipWriter):
+            self.compressor.pool.shutdown()
+        self.fh.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
 
 
 class WorkflowRepo(SyncedRepo):
@@ -1378,6 +2276,8 @@ class WorkflowRepo(SyncedRepo):
         self.fullname = nf_core.modules.modules_utils.repo_full_name_from_remote(self.remote_url)
         self.retries = 0  # retries for setting up the locally cached repository
         self.hide_progress = hide_progress
+        self.selected_refs = {}  # refs of the bare repository and their source in the local repository
+        self.latest = None  # tag that the "latest" branch is created from
 
         self.setup_local_repo(remote=remote_url, location=location, in_cache=in_cache)
 
@@ -1480,88 +2380,100 @@ class WorkflowRepo(SyncedRepo):
 
     def tidy_tags_and_branches(self):
         """
-        Function to delete all tags and branches that are not of interest to the downloader.
-        This allows a clutter-free experience in Tower. The untagged commits are evidently still available.
-
-        However, due to local caching, the downloader might also want access to revisions that had been deleted before.
-        In that case, don't bother with re-adding the tags and rather download  anew from Github.
-        """
-        if self.revision and self.repo and self.repo.tags:
-            # create a set to keep track of the revisions to process & check
-            desired_revisions = set(self.revision)
+        Select the tags and branches that are of interest to the downloader.
+        This allows a clutter-free experience in Tower.
 
-            # determine what needs pruning
-            tags_to_remove = {tag for tag in self.repo.tags if tag.name not in desired_revisions.union({"latest"})}
-            heads_to_remove = {head for head in self.repo.heads if head.name not in desired_revisions.union({"latest"})}
+        The locally cached repository is not modified, the selection is applied by :meth:`bare_clone`, which
+        only transfers these refs and the objects reachable from them. If no branch is selected, a "latest"
+        branch is added, which is required for Tower's UI to display revisions correctly.
 
+        If the local cache lacks a selected revision, don't bother with fetching it and rather download anew from Github.
+        """
+        self.selected_refs = {}
+        self.latest = None
+        if self.revision and self.repo:
             try:
-                # delete unwanted tags from repository
-                for tag in tags_to_remove:
-                    self.repo.delete_tag(tag)
-                self.tags = self.repo.tags
-
-                # switch to a revision that should be kept, because deleting heads fails, if they are checked out (e.g. "master")
-                self.checkout(self.revision[0])
-
-                # delete unwanted heads/branches from repository
-                for head in heads_to_remove:
-                    self.repo.delete_head(head)
-
-                # ensure all desired revisions/branches are available
-                for revision in desired_revisions:
-                    if not self.repo.is_valid_object(revision):
-                        self.checkout(revision)
-                        self.repo.create_head(revision, revision)
-                        if self.repo.head.is_detached:
-                            self.repo.head.reset(index=True, working_tree=True)
-
-                # no branch exists, but one is required for Tower's UI to display revisions correctly). Thus, "latest" will be created.
-                if not bool(self.repo.heads):
-                    if self.repo.is_valid_object("latest"):
-                        # "latest" exists as tag but not as branch
-                        self.repo.create_head("latest", "latest")  # create a new head for latest
-                        self.checkout("latest")
-                    else:
-                        # desired revisions may contain arbitrary branch names that do not correspond to valid sematic versioning patterns.
-                        valid_versions = [
-                            VersionParser(v)
-                            for v in desired_revisions
-                            if re.match(r"\d+\.\d+(?:\.\d+)*(?:[\w\-_])*", v)
-                        ]
-                        # valid versions sorted in ascending order, last will be aliased as "latest".
-                        latest = sorted(valid_versions)[-1]
-                        self.repo.create_head("latest", latest)
-                        self.checkout(latest)
-                    if self.repo.head.is_detached:
-                        self.repo.head.reset(index=True, working_tree=True)
-
-                self.heads = self.repo.heads
-
-                # get all tags and available remote_branches
-                completed_revisions = {revision.name for revision in self.repo.heads + self.repo.tags}
-
-                # verify that all requested revisions are available.
-                # a local cache might lack revisions that were deleted during a less comprehensive previous download.
-                if bool(desired_revisions - completed_revisions):
-                    log.info(
-                        f"Locally cached version of the pipeline lacks selected revisions {', '.join(desired_revisions - completed_revisions)}. Downloading anew from GitHub..."
-                    )
-                    self.retry_setup_local_repo(skip_confirm=True)
-                    self.tidy_tags_and_branches()
+                # Read all refs with a single git call instead of iterating over them
+                refs = set(
+                    self.repo.git.for_each_ref("--format=%(refname)", "refs/tags", "refs/heads", "refs/remotes/origin")
+                    .strip()
+                    .splitlines()
+                )
             except (GitCommandError, InvalidGitRepositoryError) as e:
                 log.error(f"[red]Adapting your pipeline download unfortunately failed:[/]\n{e}\n")
                 self.retry_setup_local_repo(skip_confirm=True)
                 raise DownloadError(e) from e
 
+            def find_ref(name):
+                for prefix, destination in [
+                    ("refs/tags/", "refs/tags/"),
+                    ("refs/heads/", "refs/heads/"),
+                    ("refs/remotes/origin/", "refs/heads/"),
+                ]:
+                    if f"{prefix}{name}" in refs:
+                        return f"{prefix}{name}", f"{destination}{name}"
+                return None, None
+
+            missing_revisions = set()
+            for revision in dict.fromkeys(self.revision + ["latest"]):
+                source, destination = find_ref(revision)
+                if source is not None:
+                    self.selected_refs[destination] = source
+                elif revision != "latest":
+                    missing_revisions.add(revision)
+
+            # verify that all requested revisions are available.
+            # a local cache might lack revisions that were deleted during a less comprehensive previous download.
+            if missing_revisions:
+                if self.retries > 0:
+                    raise DownloadError(
+                        f"Revisions {', '.join(sorted(missing_revisions))} of '{self.fullname}' are not available."
+                    )
+                log.info(
+                    f"Locally cached version of the pipeline lacks selected revisions {', '.join(sorted(missing_revisions))}. Downloading anew from GitHub..."
+                )
+                self.retry_setup_local_repo(skip_confirm=True)
+                return self.tidy_tags_and_branches()
+
+            # no branch exists, but one is required for Tower's UI to display revisions correctly. Thus, "latest" will be created.
+            if not any(destination.startswith("refs/heads/") for destination in self.selected_refs):
+                if "refs/tags/latest" in self.selected_refs:
+                    # "latest" exists as tag but not as branch
+                    self.latest = "latest"
+                else:
+                    # desired revisions may contain arbitrary branch names that do not correspond to valid sematic versioning patterns.
+                    valid_versions = [v for v in self.revision if re.match(r"\d+\.\d+(?:\.\d+)*(?:[\w\-_])*", v)]
+                    # valid versions sorted in ascending order, last will be aliased as "latest".
+                    self.latest = sorted(valid_versions, key=VersionParser)[-1] if valid_versions else self.revision[0]
+
     def bare_clone(self, destination):
+        """Create a bare repository that only contains the selected tags and branches.
+
+        Only the objects reachable from these refs are transferred, with a single ``git fetch``
+        from the locally cached repository. Call :meth:`tidy_tags_and_branches` first to select the refs.
+        """
         if self.repo:
             try:
-                destfolder = os.path.abspath(destination)
-                if not os.path.exists(destfolder):
-                    os.makedirs(destfolder)
+                destination = os.path.abspath(destination)
                 if os.path.exists(destination):
-                    shutil.rmtree(os.path.abspath(destination))
-                self.repo.clone(os.path.abspath(destination), bare=True)
+                    shutil.rmtree(destination)
+                selected_refs = self.selected_refs or {"refs/heads/*": "refs/heads/*", "refs/tags/*": "refs/tags/*"}
+                bare_repo = git.Repo.init(destination, bare=True)
+                bare_repo.git.fetch(
+                    "--no-tags",
+                    "--quiet",
+                    self.local_repo_dir,
+                    *[f"+{source}:{target}" for target, source in selected_refs.items()],
+                )
+                if self.latest:
+                    bare_repo.git.update_ref("refs/heads/latest", f"refs/tags/{self.latest}^{{commit}}")
+                # Point HEAD to an existing branch, "latest" if available
+                heads = [head.name for head in bare_repo.heads]
+                if heads:
+                    bare_repo.git.symbolic_ref("HEAD", f"refs/heads/{'latest' if 'latest' in heads else heads[0]}")
+
+                self.tags = bare_repo.tags
+                self.heads = bare_repo.heads
             except (OSError, GitCommandError, InvalidGitRepositoryError) as e:
                 log.error(f"[red]Failure to create the pipeline download[/]\n{e}\n")
 
@@ -3,6 +3,7 @@
 from __future__ import print_function
 
 import copy
+import hashlib
 import json
 import logging
 import os
@@ -10,6 +11,7 @@ import re
 import subprocess
 import webbrowser
 
+import git
 import questionary
 from rich.console import Console
 from rich.markdown import Markdown
@@ -21,6 +23,108 @@ from nf_core.lint_utils import dump_json_with_prettier
 
 log = logging.getLogger(__name__)
 
+# Resolved schemas of remote pipelines, reused by launches without prompts
+LAUNCH_SCHEMA_CACHE_DIR = os.path.join(nf_core.utils.NFCORE_CACHE_DIR, "launch_schemas", nf_core.__version__)
+_launch_schema_cache = {}
+
+
+def load_cached_launch_schema(key, persistent=True):
+    """Get a schema and its defaults from the launch schema cache, in memory or on disk.
+
+    Returns:
+        dict: The ``schema`` and ``schema_defaults``, or None if they are not cached.
+    """
+    if key not in _launch_schema_cache and persistent:
+        cache_fn = os.path.join(LAUNCH_SCHEMA_CACHE_DIR, f"{hashlib.sha256(json.dumps(key).encode()).hexdigest()}.json")
+        try:
+            with open(cache_fn) as fh:
+                _launch_schema_cache[key] = json.load(fh)
+            log.debug(f"Using cached schema of {key[0]} ({key[1]}): {cache_fn}")
+        except (OSError, ValueError):
+            pass
+    return _launch_schema_cache.get(key)
+
+
+def save_cached_launch_schema(key, cached_schema, persistent=True):
+    """Add a schema and its defaults to the launch schema cache, in memory and on disk."""
+    _launch_schema_cache[key] = cached_schema
+    if not persistent:
+        return
+    cache_fn = os.path.join(LAUNCH_SCHEMA_CACHE_DIR, f"{hashlib.sha256(json.dumps(key).encode()).hexdigest()}.json")
+    try:
+        os.makedirs(LAUNCH_SCHEMA_CACHE_DIR, exist_ok=True)
+        tmp_fn = f"{cache_fn}.{os.getpid()}.tmp"
+        with open(tmp_fn, "w") as fh:
+            json.dump(cached_schema, fh)
+        os.replace(tmp_fn, cache_fn)
+    except OSError as e:
+        log.debug(f"Could not cache the schema of {key[0]} ({key[1]}): {e}")
+
+
+def read_launch_schema(pipeline_dir):
+    """Load and lint the schema of a local pipeline, for the launch schema cache."""
+    schema_obj = nf_core.schema.PipelineSchema()
+    schema_obj.get_schema_path(pipeline_dir)
+    schema_obj.load_lint_schema()
+    return {"schema": schema_obj.schema, "schema_defaults": schema_obj.schema_defaults}
+
+
+def get_launch_schema(pipeline, revision=None):
+    """Get the schema of a pipeline with its defaults, for launches without prompts.
+
+    The schema of a remote pipeline is cached by the commit that its revision points to.
+    Release tags and full commit SHAs always point to the same commit, so they are also cached
+    by revision and later launches of them don't need git or the network. Branches are looked up
+    in the local copy of the pipeline every time, as they can move.
+    The schema of a local pipeline is read again when its schema file changes.
+
+    Args:
+        pipeline (str): Local pipeline directory, or full name of a remote pipeline.
+        revision (str): Revision of a remote pipeline.
+
+    Returns:
+        PipelineSchema: A copy of the schema and its defaults that can be changed by the caller.
+
+    Raises:
+        AssertionError: If the pipeline schema can't be found or is not valid.
+    """
+    if os.path.exists(pipeline):
+        schema_fn = os.path.join(pipeline, "nextflow_schema.json") if os.path.isdir(pipeline) else pipeline
+        try:
+            stat = os.stat(schema_fn)
+        except OSError:
+            raise AssertionError(f"Could not find pipeline schema for '{pipeline}': {schema_fn}")
+        key = (os.path.abspath(schema_fn), stat.st_mtime_ns, stat.st_size)
+        cached_schema = load_cached_launch_schema(key, persistent=False)
+        if cached_schema is None:
+            cached_schema = read_launch_schema(pipeline)
+            save_cached_launch_schema(key, cached_schema, persistent=False)
+    else:
+        cached_schema = load_cached_launch_schema((pipeline, revision))
+        if cached_schema is None:
+            pipeline_dir = nf_core.list.get_local_wf(pipeline, revision=revision)
+            try:
+                repo = git.Repo(pipeline_dir)
+                commit_sha = repo.head.commit.hexsha
+                fixed_revision = revision == commit_sha or revision in [tag.name for tag in repo.tags]
+            except (git.InvalidGitRepositoryError, git.NoSuchPathError, ValueError) as e:
+                log.debug(f"Could not find the commit of {pipeline} ({revision}), not caching its schema: {e}")
+                commit_sha = None
+                fixed_revision = False
+            if commit_sha is not None:
+                cached_schema = load_cached_launch_schema((pipeline, commit_sha))
+            if cached_schema is None:
+                cached_schema = read_launch_schema(pipeline_dir)
+                if commit_sha is not None:
+                    save_cached_launch_schema((pipeline, commit_sha), cached_schema)
+            if fixed_revision:
+                save_cached_launch_schema((pipeline, revision), cached_schema)
+
+    schema_obj = nf_core.schema.PipelineSchema()
+    schema_obj.schema = copy.deepcopy(cached_schema["schema"])
+    schema_obj.schema_defaults = copy.deepcopy(cached_schema["schema_defaults"])
+    return schema_obj
+
 
 class Launch:
     """Class to hold config option to launch a pipeline"""
@@ -36,11 +140,15 @@ class Launch:
         show_hidden=False,
         url=None,
         web_id=None,
+        no_prompts=False,
+        dry_run=False,
     ):
         """Initialise the Launcher class
 
         Args:
           schema: An nf_core.schema.PipelineSchema() object
+          no_prompts: Build the command from the parameters in params_in and the cached pipeline schema, without prompts
+          dry_run: Only show the command and write the params file, don't run Nextflow
         """
 
         self.pipeline = pipeline
@@ -59,10 +167,11 @@ class Launch:
             self.web_schema_launch_web_url = f"{self.web_schema_launch_url}?id={web_id}"
             self.web_schema_launch_api_url = f"{self.web_schema_launch_url}?id={web_id}&api=true"
         self.nextflow_cmd = None
+        self.no_prompts = no_prompts
+        self.dry_run = dry_run
 
-        # Fetch remote workflows
+        # Remote workflows, only fetched when needed
         self.wfs = nf_core.list.Workflows()
-        self.wfs.get_remote_workflows()
 
         # Prepend property names with a single hyphen in case we have parameters with the same ID
         self.nxf_flag_schema = {
@@ -97,7 +206,19 @@ class Launch:
         self.params_user = {}
         self.cli_launch = True
 
+    def get_remote_workflows(self):
+        """Fetch the list of remote workflows, if not done yet"""
+        if not self.wfs.remote_workflows:
+            self.wfs.get_remote_workflows()
+
     def launch_pipeline(self):
+        # Build the command without any prompts
+        if self.no_prompts:
+            if not self.build_launch():
+                return False
+            self.launch_workflow()
+            return True
+
         # Prompt for pipeline if not supplied and no web launch ID
         if self.pipeline is None and self.web_id is None:
             launch_type = questionary.select(
@@ -108,6 +229,7 @@ class Launch:
 
             if launch_type == "Remote pipeline":
                 try:
+                    self.get_remote_workflows()
                     self.pipeline = nf_core.utils.prompt_remote_pipeline_name(self.wfs)
                 except AssertionError as e:
                     log.error(e.args[0])
@@ -189,6 +311,51 @@ class Launch:
         self.launch_workflow()
         return True
 
+    def build_launch(self):
+        """Build the `nextflow run` command and params file without any prompts.
+
+        The parameters are taken from params_in and the pipeline schema from :func:`get_launch_schema`,
+        so once the schema of the pipeline revision is cached, this needs neither git nor the network.
+        The command is stored in self.nextflow_cmd and the parameters in self.schema_obj.input_params.
+
+        Returns:
+            bool: True if the parameters are valid and the command was built
+        """
+        if self.pipeline is None:
+            log.error("A pipeline is required to launch without prompts")
+            return False
+        if self.web_id is not None:
+            log.error("A web launch ID can't be used to launch without prompts")
+            return False
+
+        localpath = os.path.abspath(os.path.expanduser(self.pipeline))
+        if os.path.exists(localpath):
+            self.pipeline = localpath
+            self.pipeline_revision = None
+            self.nextflow_cmd = f"nextflow run {localpath}"
+        else:
+            # Without a revision the schema could change with every release of the pipeline
+            if not self.pipeline_revision:
+                log.error("A revision is required to launch a remote pipeline without prompts")
+                return False
+            # Assume nf-core if no org given
+            if self.pipeline.count("/") == 0:
+                self.pipeline = f"nf-core/{self.pipeline}"
+            self.nextflow_cmd = f"nextflow run {self.pipeline} -r {self.pipeline_revision}"
+
+        try:
+            self.schema_obj = get_launch_schema(self.pipeline, self.pipeline_revision)
+        except AssertionError as e:
+            log.error(e.args[0])
+            return False
+        self.set_schema_inputs()
+        if not self.schema_obj.validate_params():
+            return False
+        if not self.save_all:
+            self.strip_default_params()
+        self.build_command()
+        return True
+
     def get_pipeline_schema(self):
         """Load and validate the schema from the supplied pipeline"""
 
@@ -209,6 +376,7 @@ class Launch:
 
             if not self.pipeline_revision:
                 try:
+                    self.get_remote_workflows()
                     self.pipeline, wf_releases, wf_branches = nf_core.utils.get_repo_releases_branches(
                         self.pipeline, self.wfs
                     )
@@ -698,7 +866,13 @@ class Launch:
         if len(self.schema_obj.input_params) > 0:
             # Write the user selection to a file and run nextflow with that
             if self.use_params_file:
-                dump_json_with_prettier(self.params_out, self.schema_obj.input_params)
+                if self.no_prompts:
+                    # Prettier is slow to start, which adds up when building many launches
+                    with open(self.params_out, "w") as fh:
+                        json.dump(self.schema_obj.input_params, fh, indent=4)
+                        fh.write("\n")
+                else:
+                    dump_json_with_prettier(self.params_out, self.schema_obj.input_params)
                 self.nextflow_cmd += f' -params-file "{os.path.relpath(self.params_out)}"'
 
             # Call nextflow with a list of command line flags
@@ -718,6 +892,8 @@ class Launch:
         """Launch nextflow if required"""
         log.info(f"[bold underline]Nextflow command:[/]\n[magenta]{self.nextflow_cmd}\n\n")
 
-        if Confirm.ask("Do you want to run this command now? ", default=True):
+        if self.dry_run:
+            return
+        if self.no_prompts or Confirm.ask("Do you want to run this command now? ", default=True):
             log.info("Launching workflow! :rocket:")
             subprocess.call(self.nextflow_cmd, shell=True)
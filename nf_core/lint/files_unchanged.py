@@ -1,8 +1,7 @@
-import filecmp
 import logging
 import os
-import shutil
 import tempfile
+from pathlib import Path
 
 import yaml
 
@@ -113,26 +112,25 @@ def files_unchanged(self):
     # Only show error messages from pipeline creation
     logging.getLogger("nf_core.create").setLevel(logging.ERROR)
 
-    # Generate a new pipeline with nf-core create that we can compare to
-    tmp_dir = tempfile.mkdtemp()
-
-    # Create a template.yaml file for the pipeline creation
-    template_yaml = {
-        "name": short_name,
-        "description": self.nf_config["manifest.description"].strip("\"'"),
-        "author": self.nf_config["manifest.author"].strip("\"'"),
-        "prefix": prefix,
-    }
-
-    template_yaml_path = os.path.join(tmp_dir, "template.yaml")
-    with open(template_yaml_path, "w") as fh:
-        yaml.dump(template_yaml, fh, default_flow_style=False)
-
-    test_pipeline_dir = os.path.join(tmp_dir, f"{prefix}-{short_name}")
-    create_obj = nf_core.create.PipelineCreate(
-        None, None, None, no_git=True, outdir=test_pipeline_dir, template_yaml_path=template_yaml_path
-    )
-    create_obj.init_pipeline()
+    # Render a new pipeline with nf-core create in memory that we can compare to
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Create a template.yaml file for the pipeline creation
+        template_yaml = {
+            "name": short_name,
+            "description": self.nf_config["manifest.description"].strip("\"'"),
+            "author": self.nf_config["manifest.author"].strip("\"'"),
+            "prefix": prefix,
+        }
+
+        template_yaml_path = os.path.join(tmp_dir, "template.yaml")
+        with open(template_yaml_path, "w") as fh:
+            yaml.dump(template_yaml, fh, default_flow_style=False)
+
+        test_pipeline_dir = os.path.join(tmp_dir, f"{prefix}-{short_name}")
+        create_obj = nf_core.create.PipelineCreate(
+            None, None, None, no_git=True, outdir=test_pipeline_dir, template_yaml_path=template_yaml_path
+        )
+        template_files = create_obj.render_files()
 
     # Helper functions for file paths
     def _pf(file_path):
@@ -140,8 +138,11 @@ def files_unchanged(self):
         return os.path.join(self.wf_path, file_path)
 
     def _tf(file_path):
-        """Helper function - get file path for template file"""
-        return os.path.join(test_pipeline_dir, file_path)
+        """Helper function - get the content of the template file"""
+        try:
+            return template_files[Path(file_path).as_posix()][0]
+        except KeyError:
+            raise FileNotFoundError(file_path)
 
     # Files that must be completely unchanged from template
     for files in files_exact:
@@ -158,12 +159,16 @@ def files_unchanged(self):
         else:
             for f in files:
                 try:
-                    if filecmp.cmp(_pf(f), _tf(f), shallow=True):
+                    template_file = _tf(f)
+                    with open(_pf(f), "rb") as fh:
+                        pipeline_file = fh.read()
+                    if pipeline_file == template_file:
                         passed.append(f"`{f}` matches the template")
                     else:
                         if "files_unchanged" in self.fix:
                             # Try to fix the problem by overwriting the pipeline file
-                            shutil.copy(_tf(f), _pf(f))
+                            with open(_pf(f), "wb") as fh:
+                                fh.write(template_file)
                             passed.append(f"`{f}` matches the template")
                             fixed.append(f"`{f}` overwritten with template file")
                         else:
@@ -189,15 +194,12 @@ def files_unchanged(self):
                 try:
                     with open(_pf(f), "r") as fh:
                         pipeline_file = fh.read()
-                    with open(_tf(f), "r") as fh:
-                        template_file = fh.read()
+                    template_file = _tf(f).decode("utf-8")
                     if template_file in pipeline_file:
                         passed.append(f"`{f}` matches the template")
                     else:
                         if "files_unchanged" in self.fix:
                             # Try to fix the problem by overwriting the pipeline file
-                            with open(_tf(f), "r") as fh:
-                                template_file = fh.read()
                             with open(_pf(f), "w") as fh:
                                 fh.write(template_file)
                             passed.append(f"`{f}` matches the template")
@@ -208,7 +210,4 @@ def files_unchanged(self):
                 except FileNotFoundError:
                     pass
 
-    # cleaning up temporary dir
-    shutil.rmtree(tmp_dir)
-
     return {"passed": passed, "failed": failed, "ignored": ignored, "fixed": fixed, "could_fix": could_fix}
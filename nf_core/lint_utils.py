@@ -58,16 +58,18 @@ def run_prettier_on_file(file):
     """Run the pre-commit hook prettier on a file.
 
     Args:
-        file (Path | str): A file identifier as a string or pathlib.Path.
+        file (Path | str | list): A file identifier as a string or pathlib.Path, or a list of them
+            to format several files with one run of Prettier.
 
     Warns:
         If Prettier is not installed, a warning is logged.
     """
 
     nf_core_pre_commit_config = Path(nf_core.__file__).parent / ".pre-commit-prettier-config.yaml"
+    files = file if isinstance(file, list) else [file]
     try:
         subprocess.run(
-            ["pre-commit", "run", "--config", nf_core_pre_commit_config, "prettier", "--files", file],
+            ["pre-commit", "run", "--config", nf_core_pre_commit_config, "prettier", "--files", *files],
             capture_output=True,
             check=True,
         )
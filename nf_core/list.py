@@ -2,14 +2,17 @@
 
 from __future__ import print_function
 
+import concurrent.futures
 import json
 import logging
 import os
 import re
+import time
 from datetime import datetime
 
 import git
 import requests
+import requests_cache
 import rich.console
 import rich.table
 
@@ -20,8 +23,19 @@ log = logging.getLogger(__name__)
 # Set up local caching for requests to speed up remote queries
 nf_core.utils.setup_requests_cachedir()
 
+# Catalogue of nf-core pipelines, kept locally and only downloaded again if it changed
+PIPELINES_CATALOGUE_URL = "https://nf-co.re/pipelines.json"
+PIPELINES_CATALOGUE = os.path.join(nf_core.utils.NFCORE_CACHE_DIR, "pipelines.json")
+# Seconds after which to check nf-co.re for changes of the catalogue
+PIPELINES_CATALOGUE_MAX_AGE = 3600
 
-def list_workflows(filter_by=None, sort_by="release", as_json=False, show_archived=False):
+# Details of local workflows, reused while their git repositories don't change
+LOCAL_WORKFLOWS_CACHE = os.path.join(nf_core.utils.NFCORE_CACHE_DIR, "local_workflows.json")
+# Number of local workflows to inspect at the same time
+LOCAL_WORKFLOWS_MAX_WORKERS = 8
+
+
+def list_workflows(filter_by=None, sort_by="release", as_json=False, show_archived=False, offline=False):
     """Prints out a list of all nf-core workflows.
 
     Args:
@@ -29,8 +43,9 @@ def list_workflows(filter_by=None, sort_by="release", as_json=False, show_archiv
         sort_by (str): workflows can be sorted by keywords. Keyword must be one of
             `release` (default), `name`, `stars`.
         as_json (boolean): Set to true, if the lists should be printed in JSON.
+        offline (boolean): Set to true, to use the local copy of the pipelines catalogue without checking nf-co.re.
     """
-    wfs = Workflows(filter_by, sort_by, show_archived)
+    wfs = Workflows(filter_by, sort_by, show_archived, offline)
     wfs.get_remote_workflows()
     wfs.get_local_nf_workflows()
     wfs.compare_remote_local()
@@ -83,29 +98,37 @@ class Workflows:
         filter_by (list): A list of strings that can be used for filtering.
         sort_by (str): workflows can be sorted by keywords. Keyword must be one of
             `release` (default), `name`, `stars`.
+        show_archived (bool): Include archived pipelines.
+        offline (bool): Only use the local copy of the pipelines catalogue, don't check nf-co.re for updates.
     """
 
-    def __init__(self, filter_by=None, sort_by="release", show_archived=False):
+    def __init__(self, filter_by=None, sort_by="release", show_archived=False, offline=False):
         self.remote_workflows = []
+        self.remote_workflows_by_name = {}
+        self.keyword_index = None
         self.local_workflows = []
         self.local_unmatched = []
         self.keyword_filters = filter_by if filter_by is not None else []
         self.sort_workflows_by = sort_by
         self.show_archived = show_archived
+        self.offline = offline
 
     def get_remote_workflows(self):
         """Retrieves remote workflows from `nf-co.re <https://nf-co.re>`_.
 
-        Remote workflows are stored in :attr:`self.remote_workflows` list.
+        The catalogue of pipelines is kept locally and only downloaded again if it changed on nf-co.re.
+        Remote workflows are stored in :attr:`self.remote_workflows` list,
+        and by name and full name in :attr:`self.remote_workflows_by_name`.
         """
-        # List all repositories at nf-core
         log.debug("Fetching list of nf-core workflows")
-        nfcore_url = "https://nf-co.re/pipelines.json"
-        response = requests.get(nfcore_url, timeout=10)
-        if response.status_code == 200:
-            repos = response.json()["remote_workflows"]
-            for repo in repos:
-                self.remote_workflows.append(RemoteWorkflow(repo))
+        catalogue = PipelineCatalogue()
+        catalogue.refresh(offline=self.offline)
+        for repo in catalogue.remote_workflows:
+            self.remote_workflows.append(RemoteWorkflow(repo))
+        for wf in self.remote_workflows:
+            self.remote_workflows_by_name[wf.name] = wf
+            self.remote_workflows_by_name[wf.full_name] = wf
+        self.keyword_index = catalogue.keyword_index
 
     def get_local_nf_workflows(self):
         """Retrieves local Nextflow workflows.
@@ -137,8 +160,13 @@ class Workflows:
 
         # Find additional information about each workflow by checking its git history
         log.debug(f"Fetching extra info about {len(self.local_workflows)} local workflows")
-        for wf in self.local_workflows:
-            wf.get_local_nf_workflow_details()
+        details_cache = load_local_workflows_cache()
+        details_cache_before = json.dumps(details_cache, sort_keys=True)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=LOCAL_WORKFLOWS_MAX_WORKERS) as pool:
+            # Consume the results to raise any exceptions
+            list(pool.map(lambda wf: wf.get_local_nf_workflow_details(details_cache), self.local_workflows))
+        if json.dumps(details_cache, sort_keys=True) != details_cache_before:
+            save_local_workflows_cache(details_cache)
 
     def compare_remote_local(self):
         """Matches local to remote workflows.
@@ -149,15 +177,16 @@ class Workflows:
         A boolean flag in :attr:`RemoteWorkflow.local_is_latest` is set to True, if the local workflow
         is the latest.
         """
+        local_workflows_by_name = {lwf.full_name: lwf for lwf in self.local_workflows}
         for rwf in self.remote_workflows:
-            for lwf in self.local_workflows:
-                if rwf.full_name == lwf.full_name:
-                    rwf.local_wf = lwf
-                    if rwf.releases:
-                        if rwf.releases[-1]["tag_sha"] == lwf.commit_sha:
-                            rwf.local_is_latest = True
-                        else:
-                            rwf.local_is_latest = False
+            lwf = local_workflows_by_name.get(rwf.full_name)
+            if lwf is not None:
+                rwf.local_wf = lwf
+                if rwf.releases:
+                    if rwf.releases[-1]["tag_sha"] == lwf.commit_sha:
+                        rwf.local_is_latest = True
+                    else:
+                        rwf.local_is_latest = False
 
     def filtered_workflows(self):
         """Filters remote workflows for keywords.
@@ -165,13 +194,25 @@ class Workflows:
         Returns:
             list: Filtered remote workflows.
         """
+        # Look up keywords in the index of the catalogue where we can
+        matching_names = None
+        unindexed_filters = []
+        for k in self.keyword_filters:
+            if self.keyword_index is not None and re.fullmatch(r"\w+", k):
+                names = {name for term, names in self.keyword_index.items() if k in term for name in names}
+                matching_names = names if matching_names is None else matching_names & names
+            else:
+                unindexed_filters.append(k)
+
         filtered_workflows = []
         for wf in self.remote_workflows:
             # Skip archived pipelines
             if not self.show_archived and wf.archived:
                 continue
-            # Search through any supplied keywords
-            for k in self.keyword_filters:
+            if matching_names is not None and wf.full_name not in matching_names:
+                continue
+            # Search through any other supplied keywords
+            for k in unindexed_filters:
                 in_name = k in wf.name if wf.name else False
                 in_desc = k in wf.description if wf.description else False
                 in_topics = any(k in t for t in wf.topics)
@@ -272,6 +313,134 @@ class Workflows:
         )
 
 
+class PipelineCatalogue:
+    """Local copy of the catalogue of nf-core pipelines from nf-co.re.
+
+    The catalogue is refreshed with a conditional request, so that it is only downloaded again when it changed,
+    and is used as it is on systems without internet access.
+    Keyword searches use an index of the words in the names, descriptions and topics of the pipelines.
+
+    Args:
+        path (str): Path of the local copy of the catalogue.
+    """
+
+    def __init__(self, path=None):
+        self.path = path if path is not None else PIPELINES_CATALOGUE
+        self.remote_workflows = None
+        self.keyword_index = None
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = None
+
+    def load(self):
+        """Load the local copy of the catalogue.
+
+        Returns:
+            bool: True if there was a local copy.
+        """
+        try:
+            with open(self.path) as fh:
+                catalogue = json.load(fh)
+            self.remote_workflows = catalogue["remote_workflows"]
+            self.keyword_index = catalogue["keyword_index"]
+        except (OSError, ValueError, KeyError):
+            return False
+        self.etag = catalogue.get("etag")
+        self.last_modified = catalogue.get("last_modified")
+        self.fetched_at = catalogue.get("fetched_at", 0)
+        return True
+
+    def save(self):
+        """Save the local copy of the catalogue."""
+        catalogue = {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+            "remote_workflows": self.remote_workflows,
+            "keyword_index": self.keyword_index,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as fh:
+                json.dump(catalogue, fh)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.debug(f"Could not save the pipelines catalogue: {e}")
+
+    def refresh(self, offline=False):
+        """Load the catalogue, and download it again if it changed on nf-co.re.
+
+        Args:
+            offline (bool): Only use the local copy.
+
+        Raises:
+            AssertionError, if there is no local copy to use offline.
+        """
+        has_local_copy = self.load()
+        if offline:
+            if not has_local_copy:
+                raise AssertionError(
+                    "No local copy of the nf-core pipelines catalogue found. Run the command once without `--offline`."
+                )
+            log.debug(f"Using the local copy of the pipelines catalogue from {self.path}")
+            return
+        if has_local_copy and time.time() - self.fetched_at < PIPELINES_CATALOGUE_MAX_AGE:
+            log.debug("Local copy of the pipelines catalogue is recent, not checking nf-co.re")
+            return
+
+        headers = {}
+        if has_local_copy and self.etag:
+            headers["If-None-Match"] = self.etag
+        if has_local_copy and self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        try:
+            # The local copy is our cache, revalidate it directly with nf-co.re
+            with requests_cache.disabled():
+                response = requests.get(PIPELINES_CATALOGUE_URL, headers=headers, timeout=10)
+        except requests.exceptions.RequestException as e:
+            if not has_local_copy:
+                raise
+            log.warning(f"Could not fetch the list of nf-core pipelines, using the local copy: {e}")
+            return
+
+        if response.status_code == 304:
+            log.debug("Pipelines catalogue has not changed")
+        elif response.status_code == 200:
+            self.remote_workflows = response.json()["remote_workflows"]
+            self.keyword_index = self.build_keyword_index(self.remote_workflows)
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+        else:
+            if has_local_copy:
+                log.warning(
+                    f"Could not fetch the list of nf-core pipelines ({response.status_code}), using the local copy"
+                )
+            else:
+                self.remote_workflows = []
+            return
+        self.fetched_at = time.time()
+        self.save()
+
+    @staticmethod
+    def build_keyword_index(remote_workflows):
+        """Index the pipelines by the words in their names, descriptions and topics.
+
+        Keywords made of word characters can only match within the name, a topic or a single word
+        of the description, so searching the terms of the index finds the same pipelines as
+        searching the full texts.
+
+        Returns:
+            dict: Sorted full names of the pipelines, by term.
+        """
+        keyword_index = {}
+        for wf in remote_workflows:
+            terms = {wf.get("name") or "", *wf.get("topics", []), *re.findall(r"\w+", wf.get("description") or "")}
+            for term in terms:
+                keyword_index.setdefault(term, set()).add(wf["full_name"])
+        return {term: sorted(names) for term, names in keyword_index.items()}
+
+
 class RemoteWorkflow:
     """A information container for a remote workflow.
 
@@ -324,8 +493,14 @@ class LocalWorkflow:
         self.last_pull_date = None
         self.last_pull_pretty = None
 
-    def get_local_nf_workflow_details(self):
-        """Get full details about a local cached workflow"""
+    def get_local_nf_workflow_details(self, details_cache=None):
+        """Get full details about a local cached workflow
+
+        Args:
+            details_cache (dict): Details of workflows from earlier runs, by workflow name. Used instead of
+                inspecting the git repository if its HEAD and FETCH_HEAD haven't been modified since,
+                and updated with the new details otherwise.
+        """
 
         if self.local_path is None:
             # Try to guess the local cache directory
@@ -339,14 +514,18 @@ class LocalWorkflow:
                 log.debug(f"Guessed nextflow assets workflow directory: {nf_wfdir}")
                 self.local_path = nf_wfdir
 
-            # Use `nextflow info` to get more details about the workflow
-            else:
-                nfinfo_raw = str(nf_core.utils.nextflow_cmd(f"nextflow info -d {self.full_name}"))
-                re_patterns = {"repository": r"repository\s*: (.*)", "local_path": r"local path\s*: (.*)"}
-                for key, pattern in re_patterns.items():
-                    m = re.search(pattern, nfinfo_raw)
-                    if m:
-                        setattr(self, key, m.group(1))
+        # Use the details from an earlier run if the repository hasn't changed
+        if details_cache is not None and self.load_cached_details(details_cache.get(self.full_name)):
+            return
+
+        # Use `nextflow info` to get more details about the workflow
+        if self.local_path is None:
+            nfinfo_raw = str(nf_core.utils.nextflow_cmd(f"nextflow info -d {self.full_name}"))
+            re_patterns = {"repository": r"repository\s*: (.*)", "local_path": r"local path\s*: (.*)"}
+            for key, pattern in re_patterns.items():
+                m = re.search(pattern, nfinfo_raw)
+                if m:
+                    setattr(self, key, m.group(1))
 
         # Pull information from the local git repository
         if self.local_path is not None:
@@ -366,10 +545,16 @@ class LocalWorkflow:
                     self.branch = None
 
                 # See if we are on a tag (release)
+                # Resolve all tags to their commits with a single git call, instead of reading each tag object
                 self.active_tag = None
-                for tag in repo.tags:
-                    if str(tag.commit) == str(self.commit_sha):
-                        self.active_tag = str(tag)
+                tag_refs = repo.git.for_each_ref(
+                    "refs/tags", format="%(refname:short)%00%(objectname)%00%(*objectname)"
+                )
+                for tag_ref in tag_refs.splitlines():
+                    tag, tag_object, tag_commit = tag_ref.split("\0")
+                    # Lightweight tags point to the commit directly, annotated tags are peeled
+                    if (tag_commit or tag_object) == self.commit_sha:
+                        self.active_tag = tag
 
             # I'm not sure that we need this any more, it predated the self.branch catch above for detacted HEAD
             except (TypeError, git.InvalidGitRepositoryError) as e:
@@ -380,6 +565,72 @@ class LocalWorkflow:
                     f"\n   [magenta]rm -rf {self.local_path}"
                     f"\n   [magenta]nextflow pull {self.full_name}",
                 )
+            else:
+                if details_cache is not None:
+                    details_cache[self.full_name] = self.cached_details()
+
+    def cached_details(self):
+        """Details of the workflow to store in the cache, with the modification times of the git repository."""
+        return {
+            "git_mtimes": git_mtimes(self.local_path),
+            "local_path": self.local_path,
+            "repository": self.repository,
+            "commit_sha": self.commit_sha,
+            "remote_url": self.remote_url,
+            "branch": self.branch,
+            "active_tag": self.active_tag,
+            "last_pull": self.last_pull,
+        }
+
+    def load_cached_details(self, details):
+        """Set the details of the workflow from the cache, if they are still up to date.
+
+        Returns:
+            bool: True if the cached details were used.
+        """
+        if details is None or self.local_path not in [None, details["local_path"]]:
+            return False
+        if git_mtimes(details["local_path"]) != details["git_mtimes"]:
+            return False
+        log.debug(f"Using cached git info for {self.full_name}")
+        for key in ["local_path", "repository", "commit_sha", "remote_url", "branch", "active_tag", "last_pull"]:
+            setattr(self, key, details[key])
+        self.last_pull_date = datetime.fromtimestamp(self.last_pull).strftime("%Y-%m-%d %H:%M:%S")
+        self.last_pull_pretty = pretty_date(self.last_pull)
+        return True
+
+
+def git_mtimes(local_path):
+    """Modification times of HEAD and FETCH_HEAD of a git repository, which change with every checkout and pull.
+
+    Returns:
+        list: The modification times, or None if the files don't exist.
+    """
+    try:
+        return [os.stat(os.path.join(local_path, ".git", fn)).st_mtime for fn in ["HEAD", "FETCH_HEAD"]]
+    except OSError:
+        return None
+
+
+def load_local_workflows_cache():
+    """Load the cached details of local workflows from earlier runs of `nf-core list`."""
+    try:
+        with open(LOCAL_WORKFLOWS_CACHE) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_local_workflows_cache(details_cache):
+    """Save the details of local workflows for the next run of `nf-core list`."""
+    try:
+        os.makedirs(os.path.dirname(LOCAL_WORKFLOWS_CACHE), exist_ok=True)
+        tmp_path = f"{LOCAL_WORKFLOWS_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(details_cache, fh)
+        os.replace(tmp_path, LOCAL_WORKFLOWS_CACHE)
+    except OSError as e:
+        log.debug(f"Could not save the local workflows cache: {e}")
 
 
 def pretty_date(time):
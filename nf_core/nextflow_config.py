@@ -0,0 +1,886 @@
+"""
+A pure-Python evaluator for the common subset of Nextflow configuration files.
+
+Produces the same ``key = value`` pairs as ``nextflow config -flat``, without starting a JVM.
+Anything beyond simple assignments, scopes, process selectors, ``includeConfig``, profiles
+and simple Groovy expressions raises :class:`UnsupportedConfigError`, so that callers can fall
+back to Nextflow itself.
+"""
+
+import datetime
+import logging
+import os
+import re
+
+log = logging.getLogger(__name__)
+
+IDENTIFIER_REGEX = re.compile(r"^[A-Za-z_$][A-Za-z0-9_$]*$")
+NUMBER_REGEX = re.compile(r"\d+(\.\d+)?([eE][+-]?\d+)?")
+NAME_REGEX = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+# Longest operators first, so that e.g. `?:` is not tokenised as `?` followed by `:`
+OPERATORS = [
+    "?:",
+    "?.",
+    "==",
+    "!=",
+    "<=",
+    ">=",
+    "&&",
+    "||",
+    "->",
+    "..",
+    "{",
+    "}",
+    "(",
+    ")",
+    "[",
+    "]",
+    ",",
+    ":",
+    ";",
+    ".",
+    "=",
+    "?",
+    "!",
+    "+",
+    "-",
+    "*",
+    "/",
+    "%",
+    "<",
+    ">",
+]
+MEMORY_UNITS = {"B": 0, "KB": 1, "MB": 2, "GB": 3, "TB": 4, "PB": 5}
+DURATION_UNITS = {"ms": 1, "s": 1000, "sec": 1000, "m": 60000, "min": 60000, "h": 3600000, "d": 86400000}
+# Java SimpleDateFormat patterns and their strftime equivalents
+DATE_FORMATS = {"yyyy": "%Y", "MM": "%m", "dd": "%d", "HH": "%H", "mm": "%M", "ss": "%S"}
+
+
+class UnsupportedConfigError(Exception):
+    """The configuration uses a construct that can only be evaluated by Nextflow"""
+
+
+class Token:
+    def __init__(self, kind, value, start, end):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r})"
+
+
+class ConfigScope(dict):
+    """A configuration scope like ``process`` or ``params``, which is flattened into dotted keys"""
+
+
+class Closure:
+    """A Groovy closure. Closures are never evaluated, Nextflow prints them as their source code."""
+
+    def __init__(self, source):
+        self.source = source
+
+
+class MemoryUnit:
+    def __init__(self, value, unit):
+        self.value = value
+        self.unit = unit
+
+    def __str__(self):
+        return f"{self.value} {self.unit}"
+
+
+class Duration:
+    def __init__(self, millis):
+        self.millis = millis
+
+    def __str__(self):
+        parts = []
+        remainder = self.millis
+        for unit in ["d", "h", "m", "s", "ms"]:
+            amount, remainder = divmod(remainder, DURATION_UNITS[unit])
+            if amount:
+                parts.append(f"{amount:g}{unit}")
+        return " ".join(parts) or "0ms"
+
+
+def tokenize(text):
+    """Split a configuration file into tokens.
+
+    Newlines are significant as statement separators, except inside parentheses and brackets.
+    Double-quoted strings are returned as ``GSTRING`` tokens with a list of literal parts and
+    ``${...}``/``$name`` expressions.
+    """
+    tokens = []
+    depth = []
+    pos = 0
+    length = len(text)
+    while pos < length:
+        char = text[pos]
+        if char == "\n":
+            if not depth or depth[-1] == "{":
+                tokens.append(Token("NEWLINE", "\n", pos, pos + 1))
+            pos += 1
+        elif char in " \t\r\f" or text.startswith("\\\n", pos):
+            pos += 1 if char != "\\" else 2
+        elif text.startswith("//", pos) or (pos == 0 and text.startswith("#!")):
+            end = text.find("\n", pos)
+            pos = length if end == -1 else end
+        elif text.startswith("/*", pos):
+            end = text.find("*/", pos + 2)
+            if end == -1:
+                raise UnsupportedConfigError("Unterminated comment")
+            pos = end + 2
+        elif char in "'\"":
+            token = _read_string(text, pos)
+            tokens.append(token)
+            pos = token.end
+        elif char.isdigit():
+            # `8.GB` is a number followed by a property, the regex requires digits after a decimal point
+            match = NUMBER_REGEX.match(text, pos)
+            value = match.group(0)
+            number = float(value) if "." in value or "e" in value.lower() else int(value)
+            tokens.append(Token("NUMBER", number, pos, match.end()))
+            pos = match.end()
+        elif NAME_REGEX.match(text, pos):
+            match = NAME_REGEX.match(text, pos)
+            tokens.append(Token("NAME", match.group(0), pos, match.end()))
+            pos = match.end()
+        else:
+            # Other characters only matter in closures and functions, which are not evaluated
+            operator = next((op for op in OPERATORS if text.startswith(op, pos)), char)
+            if operator in "([{":
+                depth.append(operator)
+            elif operator in ")]}" and depth:
+                depth.pop()
+            tokens.append(Token("OP", operator, pos, pos + len(operator)))
+            pos += len(operator)
+    tokens.append(Token("EOF", None, length, length))
+    return tokens
+
+
+def _read_string(text, pos):
+    """Read a single-, double- or triple-quoted string starting at ``pos``."""
+    quote = text[pos] * 3 if text.startswith(text[pos] * 3, pos) else text[pos]
+    interpolate = quote[0] == '"'
+    parts = []
+    literal = ""
+    i = pos + len(quote)
+    escapes = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+    while True:
+        if i >= len(text) or (len(quote) == 1 and text[i] == "\n"):
+            raise UnsupportedConfigError("Unterminated string")
+        if text.startswith(quote, i):
+            break
+        char = text[i]
+        if char == "\\":
+            next_char = text[i + 1]
+            if next_char == "u":
+                literal += chr(int(text[i + 2 : i + 6], 16))
+                i += 6
+                continue
+            literal += escapes.get(next_char, next_char if next_char != "\n" else "")
+            i += 2
+        elif interpolate and char == "$":
+            if text.startswith("${", i):
+                end = _matching_brace(text, i + 1)
+                expression = text[i + 2 : end]
+                i = end + 1
+            else:
+                match = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*").match(text, i + 1)
+                if not match:
+                    raise UnsupportedConfigError("Invalid '$' in string")
+                expression = match.group(0)
+                i = match.end()
+            if literal:
+                parts.append(literal)
+                literal = ""
+            parts.append(tokenize(expression))
+        else:
+            literal += char
+            i += 1
+    if literal or not parts:
+        parts.append(literal)
+    end = i + len(quote)
+    if interpolate and any(isinstance(part, list) for part in parts):
+        return Token("GSTRING", parts, pos, end)
+    return Token("STRING", "".join(parts), pos, end)
+
+
+def _matching_brace(text, pos):
+    """Index of the brace closing the one at ``pos`` in a string interpolation."""
+    depth = 0
+    for i in range(pos, len(text)):
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise UnsupportedConfigError("Unterminated string interpolation")
+
+
+class NextflowConfigEvaluator:
+    """Evaluates ``nextflow.config`` of a pipeline the way ``nextflow config`` does.
+
+    Args:
+        wf_path (str): Pipeline directory.
+        profiles (list of str): Profiles to activate. Nextflow uses the ``standard`` profile if none are given.
+        files (dict): Contents of config files by absolute path, read instead of the files on disk.
+            Used to evaluate configs that have not been written yet.
+    """
+
+    def __init__(self, wf_path, profiles=None, files=None):
+        self.wf_path = os.path.abspath(wf_path)
+        self.profiles = profiles or ["standard"]
+        self.files = files
+        self.config = ConfigScope()
+        self.variables = {
+            "projectDir": self.wf_path,
+            "baseDir": self.wf_path,
+            "launchDir": os.getcwd(),
+        }
+        self.in_try = False
+        self.current_file = None
+        self.text = ""
+        self.tokens = []
+        self.pos = 0
+
+    def evaluate(self):
+        """Evaluate the configuration.
+
+        Returns:
+            list of (str, str): Flat configuration keys and rendered values, like ``nextflow config -flat``.
+        """
+        self.include(os.path.join(self.wf_path, "nextflow.config"), [])
+        return flatten(self.config)
+
+    # Token handling
+
+    def peek(self, offset=0):
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def at(self, value, offset=0):
+        token = self.peek(offset)
+        return token.kind in ["OP", "NAME"] and token.value == value
+
+    def expect(self, value):
+        token = self.next()
+        if token.value != value or token.kind not in ["OP", "NAME"]:
+            raise UnsupportedConfigError(f"Expected '{value}' but found {token.value!r} in {self.current_file}")
+        return token
+
+    def skip_newlines(self):
+        while self.peek().kind == "NEWLINE" or self.at(";"):
+            self.pos += 1
+
+    def continues_with(self, keyword):
+        """Consume ``keyword`` if it follows on the next lines, e.g. the ``else`` of an ``if`` block.
+
+        Otherwise the newlines are left in place, as they terminate the current statement.
+        """
+        offset = 0
+        while self.peek(offset).kind == "NEWLINE":
+            offset += 1
+        if self.at(keyword, offset):
+            self.pos += offset + 1
+            return True
+        return False
+
+    def skip_block(self):
+        """Skip a ``{ ... }`` block and return its source code."""
+        start = self.expect("{")
+        depth = 1
+        while depth:
+            token = self.next()
+            if token.kind == "EOF":
+                raise UnsupportedConfigError(f"Unterminated block in {self.current_file}")
+            if token.kind == "OP" and token.value == "{":
+                depth += 1
+            elif token.kind == "OP" and token.value == "}":
+                depth -= 1
+        return self.text[start.start : token.end]
+
+    def skip_parentheses(self):
+        self.expect("(")
+        depth = 1
+        while depth:
+            token = self.next()
+            if token.kind == "EOF":
+                raise UnsupportedConfigError(f"Unterminated parentheses in {self.current_file}")
+            if token.kind == "OP" and token.value == "(":
+                depth += 1
+            elif token.kind == "OP" and token.value == ")":
+                depth -= 1
+
+    # Statements
+
+    def include(self, path, scope):
+        """Evaluate a configuration file in the given scope."""
+        path = os.path.normpath(path)
+        if self.files is not None:
+            if path not in self.files:
+                raise UnsupportedConfigError(f"Cannot read config file '{path}'")
+            text = self.files[path]
+        else:
+            try:
+                with open(path, "r") as fh:
+                    text = fh.read()
+            except OSError as e:
+                raise UnsupportedConfigError(f"Cannot read config file '{path}': {e}")
+        state = (self.current_file, self.text, self.tokens, self.pos)
+        self.current_file, self.text, self.tokens, self.pos = path, text, tokenize(text), 0
+        self.statements(scope, end=None)
+        self.current_file, self.text, self.tokens, self.pos = state
+
+    def statements(self, scope, end="}"):
+        while True:
+            self.skip_newlines()
+            token = self.peek()
+            if token.kind == "EOF":
+                if end is not None:
+                    raise UnsupportedConfigError(f"Unterminated block in {self.current_file}")
+                return
+            if end is not None and self.at(end):
+                self.next()
+                return
+            self.statement(scope)
+
+    def block(self, scope):
+        self.expect("{")
+        self.statements(scope)
+
+    def statement(self, scope):
+        token = self.peek()
+        if token.kind == "NAME" and token.value == "includeConfig":
+            self.next()
+            self.include_config(self.expression(), scope)
+        elif token.kind == "NAME" and token.value == "def":
+            self.definition()
+        elif token.kind == "NAME" and token.value == "try":
+            self.try_catch(scope)
+        elif token.kind == "NAME" and token.value == "if":
+            self.conditional(scope)
+        elif token.kind == "NAME" and token.value == "profiles" and self.at("{", 1) and not scope:
+            self.next()
+            self.profile_definitions()
+        elif token.kind == "NAME" and token.value == "plugins" and self.at("{", 1) and not scope:
+            self.next()
+            self.plugins()
+        elif token.kind == "NAME" and token.value in ["withName", "withLabel"] and self.at(":", 1):
+            self.next()
+            self.next()
+            selector = self.next()
+            if selector.kind not in ["NAME", "STRING"]:
+                raise UnsupportedConfigError(f"Unsupported process selector in {self.current_file}")
+            self.block(scope + [f"{token.value}:{selector.value}"])
+        elif token.kind in ["NAME", "STRING"]:
+            keys = [self.next().value]
+            while self.at("."):
+                self.next()
+                key = self.next()
+                if key.kind not in ["NAME", "STRING"]:
+                    raise UnsupportedConfigError(f"Invalid config key in {self.current_file}")
+                keys.append(key.value)
+            if self.at("{"):
+                self.block(scope + keys)
+            elif self.at("="):
+                self.next()
+                self.assign(scope + keys, self.expression())
+            else:
+                raise UnsupportedConfigError(f"Unsupported statement '{'.'.join(keys)}' in {self.current_file}")
+        else:
+            raise UnsupportedConfigError(f"Unsupported statement {token.value!r} in {self.current_file}")
+        if not (self.peek().kind in ["NEWLINE", "EOF"] or self.at(";") or self.at("}")):
+            raise UnsupportedConfigError(f"Unexpected {self.peek().value!r} in {self.current_file}")
+
+    def assign(self, keys, value):
+        target = self.config
+        for key in keys[:-1]:
+            if not isinstance(target.get(key), ConfigScope):
+                target[key] = ConfigScope()
+            target = target[key]
+        target[keys[-1]] = value
+
+    def include_config(self, path, scope):
+        if not isinstance(path, str):
+            raise UnsupportedConfigError(f"Invalid includeConfig path in {self.current_file}")
+        if re.match(r"^\w+://", path):
+            # Remote includes (i.e. nf-core/configs) are only attempted inside `try` blocks, where Nextflow
+            # tolerates them failing. They define institutional profiles, which are not part of the output.
+            if self.in_try:
+                log.debug(f"Skipping remote config include '{path}'")
+                return
+            raise UnsupportedConfigError(f"Cannot include remote config '{path}'")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(self.current_file), path)
+        self.include(path, scope)
+
+    def definition(self):
+        self.expect("def")
+        name = self.next()
+        if self.at("("):
+            # Function definitions are only called from closures, which are not evaluated
+            self.skip_parentheses()
+            self.skip_newlines()
+            self.skip_block()
+        else:
+            self.expect("=")
+            self.variables[name.value] = self.expression()
+
+    def try_catch(self, scope):
+        self.expect("try")
+        in_try, self.in_try = self.in_try, True
+        self.block(scope)
+        self.in_try = in_try
+        while self.continues_with("catch"):
+            self.skip_parentheses()
+            self.skip_block()
+        if self.continues_with("finally"):
+            raise UnsupportedConfigError(f"Unsupported 'finally' block in {self.current_file}")
+
+    def conditional(self, scope):
+        self.expect("if")
+        self.expect("(")
+        condition = truthy(self.expression())
+        self.expect(")")
+        self.skip_newlines()
+        self.branch(scope, condition)
+        if self.continues_with("else"):
+            self.skip_newlines()
+            if self.at("if"):
+                if condition:
+                    self.skip_conditional()
+                else:
+                    self.conditional(scope)
+            else:
+                self.branch(scope, not condition)
+
+    def branch(self, scope, active):
+        if not self.at("{"):
+            raise UnsupportedConfigError(f"Unsupported conditional statement in {self.current_file}")
+        if active:
+            self.block(scope)
+        else:
+            self.skip_block()
+
+    def skip_conditional(self):
+        self.expect("if")
+        self.skip_parentheses()
+        self.skip_newlines()
+        self.skip_block()
+        if self.continues_with("else"):
+            self.skip_newlines()
+            if self.at("if"):
+                self.skip_conditional()
+            else:
+                self.skip_block()
+
+    def profile_definitions(self):
+        self.expect("{")
+        while True:
+            self.skip_newlines()
+            if self.at("}"):
+                self.next()
+                return
+            name = self.next()
+            if name.kind not in ["NAME", "STRING"] or not self.at("{"):
+                raise UnsupportedConfigError(f"Unsupported profile definition in {self.current_file}")
+            if name.value in self.profiles:
+                # Profile settings apply to the top level of the configuration
+                self.block([])
+            else:
+                self.skip_block()
+
+    def plugins(self):
+        self.expect("{")
+        plugins = self.config.get("plugins", [])
+        while True:
+            self.skip_newlines()
+            if self.at("}"):
+                self.next()
+                break
+            self.expect("id")
+            plugins.append(self.expression())
+        self.config["plugins"] = plugins
+
+    # Expressions
+
+    def expression(self):
+        value = self.logical_or()
+        if self.at("?:"):
+            self.next()
+            self.skip_newlines()
+            if truthy(value):
+                self.skip_expression()
+                return value
+            return self.expression()
+        if self.at("?"):
+            self.next()
+            self.skip_newlines()
+            condition = truthy(value)
+            if condition:
+                value = self.expression()
+            else:
+                self.skip_expression()
+            self.skip_newlines()
+            self.expect(":")
+            self.skip_newlines()
+            if condition:
+                self.skip_expression()
+            else:
+                value = self.expression()
+        return value
+
+    def skip_expression(self):
+        """Skip the branch of a conditional expression that is not taken, as Groovy does not evaluate it."""
+        depth = 0
+        conditionals = 0
+        while True:
+            token = self.peek()
+            if token.kind == "EOF" or (token.kind == "NEWLINE" and depth == 0):
+                return
+            if token.kind == "OP":
+                if token.value in ["(", "[", "{"]:
+                    depth += 1
+                elif token.value in [")", "]", "}"]:
+                    if depth == 0:
+                        return
+                    depth -= 1
+                elif depth == 0 and token.value in [",", ";"]:
+                    return
+                elif depth == 0 and token.value == "?":
+                    conditionals += 1
+                elif depth == 0 and token.value == ":":
+                    if conditionals == 0:
+                        return
+                    conditionals -= 1
+            self.next()
+
+    def binary(self, operand, operators):
+        value = operand()
+        while self.peek().kind == "OP" and self.peek().value in operators:
+            operator = self.next().value
+            self.skip_newlines()
+            value = apply_operator(operator, value, operand())
+        return value
+
+    def logical_or(self):
+        return self.binary(self.logical_and, ["||"])
+
+    def logical_and(self):
+        return self.binary(self.equality, ["&&"])
+
+    def equality(self):
+        return self.binary(self.comparison, ["==", "!="])
+
+    def comparison(self):
+        return self.binary(self.additive, ["<", ">", "<=", ">="])
+
+    def additive(self):
+        return self.binary(self.multiplicative, ["+", "-"])
+
+    def multiplicative(self):
+        return self.binary(self.unary, ["*", "/", "%"])
+
+    def unary(self):
+        if self.at("!"):
+            self.next()
+            return not truthy(self.unary())
+        if self.at("-"):
+            self.next()
+            value = self.unary()
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise UnsupportedConfigError(f"Cannot negate {value!r} in {self.current_file}")
+            return -value
+        return self.postfix()
+
+    def postfix(self):
+        token = self.peek()
+        value = self.primary()
+        while True:
+            if self.at(".") or self.at("?."):
+                safe = self.next().value == "?."
+                name = self.next()
+                if name.kind != "NAME":
+                    raise UnsupportedConfigError(f"Invalid property access in {self.current_file}")
+                if self.at("("):
+                    value = self.method_call(value, name.value)
+                elif isinstance(value, (int, float)) and not isinstance(value, bool) and token.kind == "NUMBER":
+                    value = unit_value(value, name.value)
+                elif value is None and safe:
+                    value = None
+                elif isinstance(value, (ConfigScope, dict)):
+                    value = self.property(value, name.value)
+                else:
+                    raise UnsupportedConfigError(f"Unsupported property '{name.value}' in {self.current_file}")
+            elif self.at("["):
+                self.next()
+                index = self.expression()
+                self.expect("]")
+                try:
+                    value = value[index]
+                except (KeyError, IndexError, TypeError):
+                    raise UnsupportedConfigError(f"Unsupported index expression in {self.current_file}")
+            else:
+                return value
+
+    def property(self, scope, name):
+        if name not in scope:
+            # Nextflow returns an empty config object for missing keys, which rarely is what was meant
+            raise UnsupportedConfigError(f"Reference to undefined config option '{name}' in {self.current_file}")
+        return scope[name]
+
+    def arguments(self):
+        self.expect("(")
+        args = []
+        while not self.at(")"):
+            args.append(self.expression())
+            if not self.at(")"):
+                self.expect(",")
+        self.expect(")")
+        return args
+
+    def method_call(self, value, name):
+        args = self.arguments()
+        if isinstance(value, datetime.datetime) and name == "format" and len(args) == 1:
+            return format_date(value, args[0])
+        if isinstance(value, str) and not args:
+            methods = {
+                "toString": str,
+                "toLowerCase": str.lower,
+                "toUpperCase": str.upper,
+                "trim": str.strip,
+                "toInteger": int,
+            }
+            if name in methods:
+                try:
+                    return methods[name](value)
+                except ValueError:
+                    raise UnsupportedConfigError(f"Cannot convert {value!r} in {self.current_file}")
+        if name == "toString" and not args:
+            return render_string(value)
+        raise UnsupportedConfigError(f"Unsupported method call '{name}' in {self.current_file}")
+
+    def primary(self):
+        token = self.next()
+        if token.kind in ["NUMBER", "STRING"]:
+            return token.value
+        if token.kind == "GSTRING":
+            return self.interpolate(token.value)
+        if token.kind == "OP" and token.value == "(":
+            self.skip_newlines()
+            value = self.expression()
+            self.skip_newlines()
+            self.expect(")")
+            return value
+        if token.kind == "OP" and token.value == "[":
+            return self.collection()
+        if token.kind == "OP" and token.value == "{":
+            self.pos -= 1
+            return Closure(self.skip_block())
+        if token.kind == "NAME":
+            if token.value in ["true", "false"]:
+                return token.value == "true"
+            if token.value == "null":
+                return None
+            if token.value == "new":
+                return self.constructor()
+            if token.value == "System" and self.at(".") and self.at("getenv", 1):
+                self.next()
+                self.next()
+                args = self.arguments()
+                if len(args) != 1:
+                    raise UnsupportedConfigError(f"Unsupported call to System.getenv in {self.current_file}")
+                return os.environ.get(args[0])
+            if token.value in self.variables:
+                return self.variables[token.value]
+            if token.value in self.config and isinstance(self.config[token.value], ConfigScope):
+                return self.config[token.value]
+            if token.value == "params":
+                return ConfigScope()
+        raise UnsupportedConfigError(f"Unsupported expression {token.value!r} in {self.current_file}")
+
+    def constructor(self):
+        name = [self.next().value]
+        while self.at("."):
+            self.next()
+            name.append(self.next().value)
+        if ".".join(name) not in ["Date", "java.util.Date"]:
+            raise UnsupportedConfigError(f"Unsupported constructor '{'.'.join(name)}' in {self.current_file}")
+        if self.arguments():
+            raise UnsupportedConfigError(f"Unsupported Date constructor in {self.current_file}")
+        return datetime.datetime.now()
+
+    def collection(self):
+        self.skip_newlines()
+        if self.at(":") and self.at("]", 1):
+            self.next()
+            self.next()
+            return {}
+        items = []
+        mapping = {}
+        while not self.at("]"):
+            if self.peek().kind in ["NAME", "STRING"] and self.at(":", 1):
+                key = self.next().value
+                self.next()
+                mapping[key] = self.expression()
+            else:
+                items.append(self.expression())
+            self.skip_newlines()
+            if not self.at("]"):
+                self.expect(",")
+                self.skip_newlines()
+        self.expect("]")
+        if items and mapping:
+            raise UnsupportedConfigError(f"Invalid list or map in {self.current_file}")
+        return mapping if mapping else items
+
+    def interpolate(self, parts):
+        result = ""
+        for part in parts:
+            if isinstance(part, str):
+                result += part
+                continue
+            state = (self.tokens, self.pos)
+            self.tokens, self.pos = part, 0
+            value = self.expression()
+            if self.peek().kind != "EOF":
+                raise UnsupportedConfigError(f"Unsupported string interpolation in {self.current_file}")
+            self.tokens, self.pos = state
+            result += render_string(value)
+        return result
+
+
+def truthy(value):
+    """Groovy truth"""
+    if isinstance(value, (Closure, MemoryUnit, Duration, datetime.datetime)):
+        return True
+    return bool(value)
+
+
+def unit_value(number, unit):
+    if unit in MEMORY_UNITS:
+        return MemoryUnit(number, unit)
+    if unit in DURATION_UNITS:
+        return Duration(number * DURATION_UNITS[unit])
+    raise UnsupportedConfigError(f"Unsupported number property '{unit}'")
+
+
+def apply_operator(operator, left, right):
+    numbers = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in [left, right])
+    if operator == "||":
+        return truthy(left) or truthy(right)
+    if operator == "&&":
+        return truthy(left) and truthy(right)
+    if operator == "==":
+        return left == right
+    if operator == "!=":
+        return left != right
+    if operator == "+" and isinstance(left, str):
+        return left + render_string(right)
+    if operator == "+" and isinstance(left, list) and isinstance(right, list):
+        return left + right
+    if numbers:
+        if operator == "/":
+            if right == 0:
+                raise UnsupportedConfigError("Division by zero")
+            result = left / right
+            return int(result) if result == int(result) and isinstance(left, int) and left % right == 0 else result
+        operations = {
+            "+": lambda a, b: a + b,
+            "-": lambda a, b: a - b,
+            "*": lambda a, b: a * b,
+            "%": lambda a, b: a % b,
+            "<": lambda a, b: a < b,
+            ">": lambda a, b: a > b,
+            "<=": lambda a, b: a <= b,
+            ">=": lambda a, b: a >= b,
+        }
+        return operations[operator](left, right)
+    raise UnsupportedConfigError(f"Unsupported operation {left!r} {operator} {right!r}")
+
+
+def format_date(date, pattern):
+    """Format a date with a Java SimpleDateFormat pattern"""
+    result = ""
+    for match in re.finditer(r"([A-Za-z])\1*|[^A-Za-z]+", pattern):
+        token = match.group(0)
+        if token[0].isalpha():
+            if token not in DATE_FORMATS:
+                raise UnsupportedConfigError(f"Unsupported date format '{pattern}'")
+            result += date.strftime(DATE_FORMATS[token])
+        else:
+            result += token
+    return result
+
+
+def render_string(value):
+    """The string representation of a value, as used in string interpolation"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "[" + ", ".join(render_string(v) for v in value) + "]"
+    if isinstance(value, dict):
+        if not value:
+            return "[:]"
+        return "[" + ", ".join(f"{k}:{render_string(v)}" for k, v in value.items()) + "]"
+    if isinstance(value, Closure):
+        raise UnsupportedConfigError("Cannot convert a closure to a string")
+    return str(value)
+
+
+def render(value):
+    """Render a value the way ``nextflow config -flat`` prints it"""
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if isinstance(value, Closure):
+        return value.source
+    if isinstance(value, list):
+        return "[" + ", ".join(render(v) for v in value) + "]"
+    if isinstance(value, dict):
+        if not value:
+            return "[:]"
+        return "[" + ", ".join(f"{k}:{render(v)}" for k, v in value.items()) + "]"
+    if isinstance(value, (MemoryUnit, Duration)):
+        return f"'{value}'"
+    return render_string(value)
+
+
+def flatten(scope, prefix=""):
+    """Flatten nested config scopes into dotted keys"""
+    flat = []
+    for key, value in scope.items():
+        if not IDENTIFIER_REGEX.match(key):
+            key = f"'{key}'"
+        if isinstance(value, ConfigScope) and value:
+            flat.extend(flatten(value, f"{prefix}{key}."))
+        else:
+            flat.append((f"{prefix}{key}", render(value)))
+    return flat
+
+
+def evaluate_config(wf_path, profiles=None):
+    """Evaluate the Nextflow configuration of a pipeline without Nextflow.
+
+    Args:
+        wf_path (str): Pipeline directory containing a ``nextflow.config``.
+        profiles (list of str): Profiles to activate.
+
+    Returns:
+        list of (str, str): Flat configuration keys and values, as printed by ``nextflow config -flat``.
+
+    Raises:
+        UnsupportedConfigError: If the configuration uses constructs that can only be evaluated by Nextflow.
+    """
+    return NextflowConfigEvaluator(wf_path, profiles).evaluate()
@@ -0,0 +1,186 @@
+"""
+A long-lived Nextflow process that answers `nextflow config -flat` requests for many pipelines,
+so that batch operations only pay for the JVM start once.
+
+The daemon is opt-in: set the environment variable ``NFCORE_CONFIG_DAEMON`` to route
+:func:`nf_core.utils.fetch_wf_config` through it, or use :class:`NextflowConfigDaemon` as a context manager.
+"""
+
+import atexit
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+# Prefix of the lines written by the daemon script, to tell them apart from other output of Nextflow
+RESPONSE_PREFIX = "NFCORE_CONFIG_DAEMON "
+
+# Nextflow script that reads JSON requests from stdin and builds the config like `nextflow config -flat`
+DAEMON_SCRIPT = """
+import groovy.json.JsonOutput
+import groovy.json.JsonSlurper
+import java.nio.file.Paths
+import nextflow.cli.CliOptions
+import nextflow.config.ConfigBuilder
+import nextflow.util.ConfigHelper
+
+def respond(Map response) {
+    System.out.println('NFCORE_CONFIG_DAEMON ' + JsonOutput.toJson(response))
+    System.out.flush()
+}
+
+def reader = new BufferedReader(new InputStreamReader(System.in))
+respond([status: 'ready'])
+String line
+while( (line = reader.readLine()) != null ) {
+    try {
+        def request = new JsonSlurper().parseText(line)
+        def builder = new ConfigBuilder()
+            .setShowClosures(true)
+            .setStripSecrets(true)
+            .showMissingVariables(true)
+            .setOptions(new CliOptions())
+            .setBaseDir(Paths.get(request.path as String))
+        if( request.profile )
+            builder.setProfile(request.profile as String)
+        respond([status: 'ok', config: ConfigHelper.toFlatString(builder.buildConfigObject(), false)])
+    }
+    catch( Throwable e ) {
+        respond([status: 'error', message: e.toString()])
+    }
+}
+"""
+
+
+class ConfigDaemonError(RuntimeError):
+    """The config daemon could not answer a request"""
+
+
+class NextflowConfigDaemon:
+    """A warm Nextflow process that flattens pipeline configs on request.
+
+    Requests are answered one at a time. The daemon can be shared between threads.
+
+    Args:
+        nextflow (str): The Nextflow executable.
+    """
+
+    def __init__(self, nextflow="nextflow"):
+        self.nextflow = nextflow
+        self.process = None
+        self.workdir = None
+        self.failed = False
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Start Nextflow and wait until the daemon script is ready."""
+        if self.process is not None:
+            return
+        # Nextflow writes its history, logs and work directory into the launch directory
+        self.workdir = tempfile.mkdtemp(prefix="nf-core-config-daemon-")
+        script = os.path.join(self.workdir, "config_daemon.nf")
+        with open(script, "w") as fh:
+            fh.write(DAEMON_SCRIPT)
+        log.debug("Starting the Nextflow config daemon")
+        try:
+            self.process = subprocess.Popen(
+                [self.nextflow, "-log", os.path.join(self.workdir, ".nextflow.log"), "run", script, "-q"],
+                cwd=self.workdir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError as e:
+            self.failed = True
+            self.stop()
+            raise ConfigDaemonError(f"Could not start Nextflow: {e}")
+        try:
+            ready = self._read_response().get("status") == "ready"
+        except (ValueError, ConfigDaemonError):
+            ready = False
+        if not ready:
+            # Don't pay for another JVM start with every request if the daemon script doesn't work
+            self.failed = True
+            self.stop()
+            raise ConfigDaemonError("The Nextflow config daemon did not start")
+
+    def stop(self):
+        """Stop Nextflow and remove the temporary launch directory."""
+        if self.process is not None:
+            log.debug("Stopping the Nextflow config daemon")
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+        if self.workdir is not None:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+    def _read_response(self):
+        for line in self.process.stdout:
+            if line.startswith(RESPONSE_PREFIX):
+                return json.loads(line[len(RESPONSE_PREFIX) :])
+        raise ConfigDaemonError(f"The Nextflow config daemon exited with code {self.process.poll()}")
+
+    def flat_config(self, wf_path, profile=None):
+        """Flatten the config of a pipeline.
+
+        Args:
+            wf_path (str): Pipeline directory.
+            profile (str): Comma-separated profiles to apply.
+
+        Returns:
+            bytes: The output of `nextflow config -flat` for the pipeline.
+        """
+        with self.lock:
+            if self.failed:
+                raise ConfigDaemonError("The Nextflow config daemon is not available")
+            self.start()
+            request = {"path": os.path.abspath(wf_path), "profile": profile}
+            try:
+                self.process.stdin.write(json.dumps(request) + "\n")
+                self.process.stdin.flush()
+                response = self._read_response()
+            except (OSError, ValueError, ConfigDaemonError) as e:
+                # Start a new daemon with the next request
+                self.stop()
+                raise ConfigDaemonError(f"The Nextflow config daemon failed: {e}")
+        if response.get("status") != "ok":
+            raise ConfigDaemonError(f"Could not build the config of '{wf_path}': {response.get('message')}")
+        return response["config"].encode("utf-8")
+
+
+_shared_daemon = None
+_shared_daemon_lock = threading.Lock()
+
+
+def get_shared_daemon():
+    """The daemon shared by all calls of :func:`nf_core.utils.fetch_wf_config`, if enabled.
+
+    Returns:
+        NextflowConfigDaemon: The daemon if ``NFCORE_CONFIG_DAEMON`` is set and Nextflow is installed, otherwise None.
+    """
+    global _shared_daemon
+    if not os.environ.get("NFCORE_CONFIG_DAEMON", False) or shutil.which("nextflow") is None:
+        return None
+    with _shared_daemon_lock:
+        if _shared_daemon is None:
+            _shared_daemon = NextflowConfigDaemon()
+            atexit.register(_shared_daemon.stop)
+    return _shared_daemon
@@ -0,0 +1,319 @@
+"""A minimal client for the OCI Distribution (Docker Registry HTTP API v2) to download container images
+into an OCI image layout, without requiring Singularity/Apptainer on the download host."""
+
+import concurrent.futures
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+
+import requests
+import requests_cache
+
+log = logging.getLogger(__name__)
+
+OCI_INDEX = "application/vnd.oci.image.index.v1+json"
+OCI_MANIFEST = "application/vnd.oci.image.manifest.v1+json"
+DOCKER_MANIFEST_LIST = "application/vnd.docker.distribution.manifest.list.v2+json"
+DOCKER_MANIFEST = "application/vnd.docker.distribution.manifest.v2+json"
+MANIFEST_MEDIA_TYPES = [OCI_INDEX, OCI_MANIFEST, DOCKER_MANIFEST_LIST, DOCKER_MANIFEST]
+INDEX_MEDIA_TYPES = [OCI_INDEX, DOCKER_MANIFEST_LIST]
+# Annotation of the image references in the index of the layout
+REF_NAME_ANNOTATION = "org.opencontainers.image.ref.name"
+
+# Key/value pairs of a WWW-Authenticate challenge, e.g. Bearer realm="https://auth.docker.io/token",service="registry.docker.io"
+AUTH_PARAM_REGEX = re.compile(r'(\w+)="([^"]*)"')
+
+
+class OCIRegistryError(RuntimeError):
+    """An image could not be retrieved from the registry"""
+
+
+def parse_image_reference(reference, default_registry="docker.io"):
+    """Split a container image reference into registry, repository and tag or digest.
+
+    Args:
+        reference (str): An image reference like ``quay.io/biocontainers/fastqc:0.11.9--0`` or ``ubuntu:20.04``.
+            A ``docker://`` prefix is ignored.
+        default_registry (str): The registry to use if the reference does not name one.
+
+    Returns:
+        (str, str, str): Registry host, repository and tag (or ``sha256:`` digest). The Docker Hub is
+        translated to its API endpoint ``registry-1.docker.io`` and official images get the ``library/`` prefix.
+    """
+    name = re.sub(r"^docker://", "", reference)
+    if "@" in name:
+        name, tag = name.split("@", 1)
+    elif ":" in name.split("/")[-1]:
+        name, tag = name.rsplit(":", 1)
+    else:
+        tag = "latest"
+
+    components = name.split("/")
+    if len(components) > 1 and ("." in components[0] or ":" in components[0] or components[0] == "localhost"):
+        registry, repository = components[0], "/".join(components[1:])
+    else:
+        registry, repository = default_registry, name
+
+    if registry in ["docker.io", "index.docker.io", "registry-1.docker.io"]:
+        registry = "registry-1.docker.io"
+        if "/" not in repository:
+            repository = f"library/{repository}"
+    return registry, repository, tag
+
+
+def image_ref_name(reference, default_registry="docker.io"):
+    """The full reference of an image, under which it is recorded in the index of an OCI image layout."""
+    registry, repository, tag = parse_image_reference(reference, default_registry)
+    return f"{registry}/{repository}@{tag}" if tag.startswith("sha256:") else f"{registry}/{repository}:{tag}"
+
+
+def layout_blob_path(layout_dir, digest):
+    """Path of a blob in an OCI image layout."""
+    algorithm, hexdigest = digest.split(":", 1)
+    return os.path.join(layout_dir, "blobs", algorithm, hexdigest)
+
+
+def prune_layout(layout_dir, ref_names):
+    """Remove the images that are not in ``ref_names`` from an OCI image layout, and the blobs that only they use.
+
+    Args:
+        layout_dir (str): Directory of the OCI image layout.
+        ref_names (set): Full references of the images to keep, see :func:`image_ref_name`.
+
+    Returns:
+        (int, int): Number of removed images and removed blobs.
+    """
+    index_path = os.path.join(layout_dir, "index.json")
+    with open(index_path) as fh:
+        index = json.load(fh)
+    kept = [m for m in index["manifests"] if m.get("annotations", {}).get(REF_NAME_ANNOTATION) in ref_names]
+    removed_images = len(index["manifests"]) - len(kept)
+    if removed_images:
+        index["manifests"] = kept
+        with open(index_path, "w") as fh:
+            json.dump(index, fh, indent=2)
+
+    referenced = set()
+    for descriptor in kept:
+        referenced.add(descriptor["digest"])
+        try:
+            with open(layout_blob_path(layout_dir, descriptor["digest"])) as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError) as e:
+            # Without the manifest we don't know which blobs the image needs, so keep all of them
+            log.warning(f"Could not read the manifest of {descriptor['digest']}, not pruning blobs: {e}")
+            return removed_images, 0
+        referenced.update(blob["digest"] for blob in [manifest["config"]] + manifest.get("layers", []))
+
+    removed_blobs = 0
+    blobs_dir = os.path.join(layout_dir, "blobs")
+    for algorithm in os.listdir(blobs_dir):
+        for hexdigest in os.listdir(os.path.join(blobs_dir, algorithm)):
+            if f"{algorithm}:{hexdigest}" not in referenced:
+                log.debug(f"Deleting unreferenced blob: '{algorithm}:{hexdigest}'")
+                os.remove(os.path.join(blobs_dir, algorithm, hexdigest))
+                removed_blobs += 1
+    return removed_images, removed_blobs
+
+
+class OCIRegistryClient:
+    """Downloads container images from OCI registries into a shared OCI image layout.
+
+    Manifests and blobs are fetched concurrently. All images share the ``blobs/`` directory of the layout,
+    so layers that are used by several images are only downloaded once. Every image is recorded in the
+    ``index.json`` of the layout with its full reference as ``org.opencontainers.image.ref.name``, which
+    allows to build a SIF file later, e.g. ``singularity build image.sif oci:<layout_dir>:<reference>``.
+
+    Args:
+        layout_dir (str): Directory of the OCI image layout. Created if it does not exist.
+        max_workers (int): Number of concurrent blob downloads. Defaults to 4.
+        platform (tuple of str): Operating system and architecture to select from multi-platform images.
+    """
+
+    def __init__(self, layout_dir, max_workers=4, platform=("linux", "amd64")):
+        self.layout_dir = layout_dir
+        self.max_workers = max_workers
+        self.platform = platform
+        self.tokens = {}
+        self.lock = threading.Lock()
+        self.blob_futures = {}
+        # Streamed downloads must not go through the requests cache
+        with requests_cache.disabled():
+            self.session = requests.Session()
+        self.blob_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+        os.makedirs(os.path.join(self.layout_dir, "blobs", "sha256"), exist_ok=True)
+        with open(os.path.join(self.layout_dir, "oci-layout"), "w") as fh:
+            json.dump({"imageLayoutVersion": "1.0.0"}, fh)
+        self.index = {"schemaVersion": 2, "manifests": []}
+        index_path = os.path.join(self.layout_dir, "index.json")
+        if os.path.exists(index_path):
+            with open(index_path) as fh:
+                self.index = json.load(fh)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.blob_pool.shutdown()
+        self.session.close()
+
+    def _url(self, registry, repository, path):
+        # Registries on the local machine, like a test registry, are usually served without TLS
+        scheme = "http" if registry.split(":")[0] in ["localhost", "127.0.0.1"] else "https"
+        return f"{scheme}://{registry}/v2/{repository}/{path}"
+
+    def _authenticate(self, registry, repository, challenge):
+        """Request an anonymous bearer token as described by the WWW-Authenticate challenge of the registry."""
+        if not challenge.lower().startswith("bearer"):
+            raise OCIRegistryError(f"Unsupported authentication scheme of registry '{registry}': {challenge}")
+        params = dict(AUTH_PARAM_REGEX.findall(challenge))
+        realm = params.pop("realm", None)
+        if realm is None:
+            raise OCIRegistryError(f"Registry '{registry}' did not provide a token realm.")
+        params.setdefault("scope", f"repository:{repository}:pull")
+        response = self.session.get(realm, params=params, timeout=60)
+        if response.status_code != 200:
+            raise OCIRegistryError(
+                f"Could not obtain a token for '{repository}' from '{realm}': {response.status_code}"
+            )
+        token_data = response.json()
+        token = token_data.get("token") or token_data.get("access_token")
+        self.tokens[(registry, repository)] = token
+        return token
+
+    def _get(self, registry, repository, path, headers=None, stream=False):
+        """GET an API endpoint of the registry, authenticating if the registry asks for it."""
+        url = self._url(registry, repository, path)
+        headers = dict(headers or {})
+        for attempt in range(2):
+            token = self.tokens.get((registry, repository))
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+            try:
+                response = self.session.get(url, headers=headers, stream=stream, timeout=60 * 5)
+            except requests.exceptions.ConnectionError as e:
+                raise OCIRegistryError(f"Registry '{registry}' is unreachable: {e}") from e
+            if response.status_code == 401 and attempt == 0:
+                self._authenticate(registry, repository, response.headers.get("WWW-Authenticate", ""))
+                continue
+            if response.status_code != 200:
+                raise OCIRegistryError(f"Request to '{url}' failed with status code {response.status_code}")
+            return response
+
+    def _blob_path(self, digest):
+        return layout_blob_path(self.layout_dir, digest)
+
+    def _write_blob(self, digest, content):
+        """Store content that is already in memory (manifests) as blob."""
+        blob_path = self._blob_path(digest)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        with open(blob_path, "wb") as fh:
+            fh.write(content)
+
+    def _download_blob(self, registry, repository, descriptor):
+        """Stream a blob into the layout and verify its digest."""
+        digest = descriptor["digest"]
+        blob_path = self._blob_path(digest)
+        if os.path.exists(blob_path) and os.path.getsize(blob_path) == descriptor.get("size", -1):
+            log.debug(f"Blob {digest} is already present")
+            return blob_path
+
+        algorithm, expected_digest = digest.split(":", 1)
+        hash_digest = hashlib.new(algorithm)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        partial_path = f"{blob_path}.partial"
+        response = self._get(registry, repository, f"blobs/{digest}", stream=True)
+        try:
+            with open(partial_path, "wb") as fh:
+                for chunk in response.iter_content(chunk_size=io.DEFAULT_BUFFER_SIZE * 16):
+                    hash_digest.update(chunk)
+                    fh.write(chunk)
+            if hash_digest.hexdigest() != expected_digest:
+                raise OCIRegistryError(f"Digest mismatch for blob {digest} of '{repository}'")
+            os.rename(partial_path, blob_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        return blob_path
+
+    def fetch_blob(self, registry, repository, descriptor):
+        """Schedule the download of a blob. Blobs shared by several images are only downloaded once.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the path of the blob in the layout.
+        """
+        with self.lock:
+            future = self.blob_futures.get(descriptor["digest"])
+            if future is None or (future.done() and future.exception() is not None):
+                future = self.blob_pool.submit(self._download_blob, registry, repository, descriptor)
+                self.blob_futures[descriptor["digest"]] = future
+        return future
+
+    def get_manifest(self, registry, repository, reference):
+        """Fetch the image manifest, resolving multi-platform indices to :attr:`self.platform`.
+
+        Returns:
+            (dict, bytes, str): The parsed manifest, its raw content and its media type.
+        """
+        response = self._get(
+            registry, repository, f"manifests/{reference}", headers={"Accept": ", ".join(MANIFEST_MEDIA_TYPES)}
+        )
+        content = response.content
+        manifest = json.loads(content)
+        media_type = manifest.get("mediaType") or response.headers.get("Content-Type", "").split(";")[0]
+        if media_type in INDEX_MEDIA_TYPES:
+            for candidate in manifest.get("manifests", []):
+                platform = candidate.get("platform", {})
+                if (platform.get("os"), platform.get("architecture")) == self.platform:
+                    return self.get_manifest(registry, repository, candidate["digest"])
+            raise OCIRegistryError(f"No image for platform {'/'.join(self.platform)} in '{repository}:{reference}'")
+        return manifest, content, media_type or OCI_MANIFEST
+
+    def pull(self, reference, default_registry="docker.io"):
+        """Download an image with all its blobs into the layout.
+
+        Args:
+            reference (str): The image reference, e.g. ``biocontainers/fastqc:0.11.9--0``.
+            default_registry (str): Registry used if the reference does not specify one.
+
+        Returns:
+            dict: The descriptor of the image manifest in the layout index, including its digest and size.
+        """
+        registry, repository, tag = parse_image_reference(reference, default_registry)
+        manifest, content, media_type = self.get_manifest(registry, repository, tag)
+        blobs = [manifest["config"]] + manifest.get("layers", [])
+        futures = [self.fetch_blob(registry, repository, blob) for blob in blobs]
+        for future in futures:
+            future.result()
+
+        manifest_digest = f"sha256:{hashlib.sha256(content).hexdigest()}"
+        self._write_blob(manifest_digest, content)
+        ref_name = image_ref_name(reference, default_registry)
+        descriptor = {
+            "mediaType": media_type,
+            "digest": manifest_digest,
+            "size": len(content),
+            "annotations": {REF_NAME_ANNOTATION: ref_name},
+        }
+        with self.lock:
+            self.index["manifests"] = [
+                m for m in self.index["manifests"] if m.get("annotations", {}).get(REF_NAME_ANNOTATION) != ref_name
+            ] + [descriptor]
+            with open(os.path.join(self.layout_dir, "index.json"), "w") as fh:
+                json.dump(self.index, fh, indent=2)
+        log.debug(f"Pulled '{ref_name}' ({manifest_digest})")
+        return descriptor
+
+    def image_size(self, descriptor):
+        """Total size in bytes of the manifest, config and layers of a pulled image."""
+        with open(self._blob_path(descriptor["digest"])) as fh:
+            manifest = json.load(fh)
+        return descriptor["size"] + sum(blob["size"] for blob in [manifest["config"]] + manifest.get("layers", []))
@@ -6,6 +6,7 @@
 
 import argparse
 import csv
+import hashlib
 import logging
 import sys
 from collections import Counter
@@ -18,9 +19,9 @@ class RowChecker:
     """
     Define a service that can validate and transform each given row.
 
-    Attributes:
-        modified (list): A list of dicts, where each dict corresponds to a previously
-            validated and transformed row. The order of rows is maintained.
+    Rows are checked one at a time, so that they can be written out straight away. Only a
+    compact hash of each pair of sample name and FASTQ file, and the number of runs of each
+    sample, are kept in memory.
 
     """
 
@@ -58,7 +59,7 @@ class RowChecker:
         self._second_col = second_col
         self._single_col = single_col
         self._seen = set()
-        self.modified = []
+        self._runs = Counter()
 
     def validate_and_transform(self, row):
         """
@@ -68,13 +69,16 @@ class RowChecker:
             row (dict): A mapping from column headers (keys) to elements of that row
                 (values).
 
+        Returns:
+            dict: The transformed row.
+
         """
         self._validate_sample(row)
         self._validate_first(row)
         self._validate_second(row)
         self._validate_pair(row)
-        self._seen.add((row[self._sample_col], row[self._first_col]))
-        self.modified.append(row)
+        self._validate_unique(row)
+        return row
 
     def _validate_sample(self, row):
         """Assert that the sample name exists and convert spaces to underscores."""
@@ -107,27 +111,27 @@ class RowChecker:
 
     def _validate_fastq_format(self, filename):
         """Assert that a given filename has one of the expected FASTQ extensions."""
-        if not any(filename.endswith(extension) for extension in self.VALID_FORMATS):
+        if not filename.endswith(self.VALID_FORMATS):
             raise AssertionError(
                 f"The FASTQ file has an unrecognized extension: {filename}\n"
                 f"It should be one of: {', '.join(self.VALID_FORMATS)}"
             )
 
-    def validate_unique_samples(self):
+    def _validate_unique(self, row):
         """
         Assert that the combination of sample name and FASTQ filename is unique.
 
-        In addition to the validation, also rename all samples to have a suffix of _T{n}, where n is the
-        number of times the same sample exist, but with different FASTQ files, e.g., multiple runs per experiment.
+        In addition to the validation, also rename the sample to have a suffix of _T{n}, where n is the
+        number of times the same sample has been seen, but with different FASTQ files, e.g., multiple runs per experiment.
 
         """
-        if len(self._seen) != len(self.modified):
+        sample = row[self._sample_col]
+        key = hashlib.blake2b(f"{sample}\0{row[self._first_col]}".encode(), digest_size=16).digest()
+        if key in self._seen:
             raise AssertionError("The pair of sample name and FASTQ must be unique.")
-        seen = Counter()
-        for row in self.modified:
-            sample = row[self._sample_col]
-            seen[sample] += 1
-            row[self._sample_col] = f"{sample}_T{seen[sample]}"
+        self._seen.add(key)
+        self._runs[sample] += 1
+        row[self._sample_col] = f"{sample}_T{self._runs[sample]}"
 
 
 def read_head(handle, num_lines=10):
@@ -169,6 +173,9 @@ def check_samplesheet(file_in, file_out):
     Validate the general shape of the table, expected columns, and each row. Also add
     an additional column which records whether one or two FASTQ reads were found.
 
+    Rows are written to the output as soon as they are validated, so that large
+    samplesheets are checked in constant memory. The output is removed if a row is invalid.
+
     Args:
         file_in (pathlib.Path): The given tabular samplesheet. The format can be either
             CSV, TSV, or any other format automatically recognized by ``csv.Sniffer``.
@@ -190,30 +197,29 @@ def check_samplesheet(file_in, file_out):
     """
     required_columns = {"sample", "fastq_1", "fastq_2"}
     # See https://docs.python.org/3.9/library/csv.html#id3 to read up on `newline=""`.
-    with file_in.open(newline="") as in_handle:
+    with file_in.open(newline="") as in_handle, file_out.open(mode="w", newline="") as out_handle:
         reader = csv.DictReader(in_handle, dialect=sniff_format(in_handle))
         # Validate the existence of the expected header columns.
         if not required_columns.issubset(reader.fieldnames):
             req_cols = ", ".join(required_columns)
             logger.critical(f"The sample sheet **must** contain these column headers: {req_cols}.")
+            out_handle.close()
+            file_out.unlink()
             sys.exit(1)
-        # Validate each row.
+        header = list(reader.fieldnames)
+        header.insert(1, "single_end")
+        writer = csv.DictWriter(out_handle, header, delimiter=",")
+        writer.writeheader()
+        # Validate and write each row.
         checker = RowChecker()
         for i, row in enumerate(reader):
             try:
-                checker.validate_and_transform(row)
+                writer.writerow(checker.validate_and_transform(row))
             except AssertionError as error:
                 logger.critical(f"{str(error)} On line {i + 2}.")
+                out_handle.close()
+                file_out.unlink()
                 sys.exit(1)
-        checker.validate_unique_samples()
-    header = list(reader.fieldnames)
-    header.insert(1, "single_end")
-    # See https://docs.python.org/3.9/library/csv.html#id3 to read up on `newline=""`.
-    with file_out.open(mode="w", newline="") as out_handle:
-        writer = csv.DictWriter(out_handle, header, delimiter=",")
-        writer.writeheader()
-        for row in checker.modified:
-            writer.writerow(row)
 
 
 def parse_args(argv=None):
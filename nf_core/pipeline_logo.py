@@ -0,0 +1,115 @@
+"""
+Fetches the logos of nf-core pipelines from the nf-core website, and caches them on disk.
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+import filetype
+import requests
+import requests_cache
+
+import nf_core
+from nf_core.utils import NFCORE_CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+# Bump this when the logo artwork or font on the website changes, so that cached logos are fetched again
+LOGO_VERSION = "1"
+LOGO_CACHE_DIR = os.path.join(NFCORE_CACHE_DIR, "logos", f"v{LOGO_VERSION}-{nf_core.__version__}")
+LOGO_URL = "https://nf-co.re/logo/{name}?theme=light?w=600&theme={theme}"
+LOGO_THEMES = ["dark", "light"]
+
+MAX_ATTEMPTS = 3
+TIMEOUT = 60
+
+# Set when the website could not be reached, so that the other logos don't wait for retries again
+_website_unreachable = False
+
+
+def fetch_logo(name, theme="light"):
+    """Fetch the logo of a pipeline from the nf-core website. Retry if it fails.
+
+    Args:
+        name (str): Short name of the pipeline, without the prefix.
+        theme (str): ``light`` or ``dark``.
+
+    Returns:
+        bytes: The PNG image, or None if no image could be fetched.
+    """
+    global _website_unreachable
+    if _website_unreachable:
+        return None
+    url = LOGO_URL.format(name=name, theme=theme)
+    connection_failed = False
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        # If retrying, wait a while
+        if attempt > 1:
+            retry_delay = 2 ** (attempt - 1)
+            log.info(f"Waiting {retry_delay} seconds before next logo fetch attempt")
+            time.sleep(retry_delay)
+
+        log.debug(f"Fetching logo '{url}' (attempt {attempt})")
+        try:
+            # Logos have their own cache, so don't keep failed responses in the requests cache
+            with requests_cache.disabled():
+                r = requests.get(url, timeout=TIMEOUT)
+            connection_failed = False
+            if r.status_code != 200:
+                raise UserWarning(f"Got status code {r.status_code}")
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # Something went wrong - try again
+            log.debug(f"Could not connect to '{url}': {e}")
+            connection_failed = True
+            continue
+        except (requests.exceptions.RequestException, UserWarning) as e:
+            # Something went wrong - try again
+            log.debug(f"Could not fetch logo '{url}': {e}")
+            continue
+
+        # Check that the image looks valid
+        image_type = getattr(filetype.guess(r.content), "extension", None)
+        if image_type != "png":
+            log.error(f"Logo from the website didn't look like an image: '{image_type}'")
+            continue
+
+        return r.content
+    _website_unreachable = connection_failed
+    return None
+
+
+def get_logo(name, theme="light"):
+    """Get the logo of a pipeline from the logo cache, fetching it from the nf-core website if needed.
+
+    Args:
+        name (str): Short name of the pipeline, without the prefix.
+        theme (str): ``light`` or ``dark``.
+
+    Returns:
+        bytes: The PNG image, or None if the logo is not cached and could not be fetched.
+    """
+    if theme not in LOGO_THEMES:
+        raise ValueError(f"Unknown logo theme '{theme}', must be one of {', '.join(LOGO_THEMES)}")
+    cache_path = os.path.join(LOGO_CACHE_DIR, f"{name.replace(os.sep, '-')}_{theme}.png")
+    try:
+        with open(cache_path, "rb") as fh:
+            log.debug(f"Using cached logo '{cache_path}'")
+            return fh.read()
+    except OSError:
+        pass
+
+    logo = fetch_logo(name, theme)
+    if logo is None:
+        log.warning(f"Could not fetch the {theme} logo for '{name}' from the nf-core website, skipping it")
+        return None
+    try:
+        os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first, so that other processes never read half a logo
+        with tempfile.NamedTemporaryFile("wb", dir=LOGO_CACHE_DIR, delete=False) as fh:
+            fh.write(logo)
+        os.replace(fh.name, cache_path)
+    except OSError as e:
+        log.debug(f"Could not cache logo '{cache_path}': {e}")
+    return logo
@@ -3,10 +3,12 @@
 from __future__ import print_function
 
 import copy
+import hashlib
 import json
 import logging
 import os
 import tempfile
+import threading
 import webbrowser
 
 import jinja2
@@ -23,6 +25,52 @@ from nf_core.lint_utils import dump_json_with_prettier, run_prettier_on_file
 
 log = logging.getLogger(__name__)
 
+# Compiled validators, by schema hash and whether required params are checked
+_validator_cache = {}
+_validator_cache_lock = threading.Lock()
+
+
+def compile_validator(schema, required=True):
+    """Get a compiled JSON schema validator, shared by all schemas with the same content.
+
+    The schema itself is only checked against the JSON schema meta-schema when it is first compiled.
+
+    Args:
+        schema (dict): The JSON schema.
+        required (bool): If False, the `required` lists of the schema and its definitions are ignored.
+
+    Returns:
+        jsonschema.protocols.Validator: Validator for the schema, Draft 7 unless the schema says otherwise.
+
+    Raises:
+        jsonschema.exceptions.SchemaError: If the schema is not a valid JSON schema.
+    """
+    schema_json = json.dumps(schema, sort_keys=True)
+    key = (hashlib.sha256(schema_json.encode("utf-8")).hexdigest(), required)
+    with _validator_cache_lock:
+        validator = _validator_cache.get(key)
+    if validator is None:
+        # Work on a copy, so that later changes to the schema don't affect the cached validator
+        schema = json.loads(schema_json)
+        if not required:
+            schema.pop("required", None)
+            for group in schema.get("definitions", {}).values():
+                group.pop("required", None)
+        validator_class = jsonschema.validators.validator_for(schema, default=jsonschema.Draft7Validator)
+        validator_class.check_schema(schema)
+        validator = validator_class(schema)
+        with _validator_cache_lock:
+            _validator_cache[key] = validator
+    return validator
+
+
+def format_validation_errors(errors):
+    """Describe JSON schema validation errors, one per line if there are several"""
+    messages = [f"{'.'.join(str(p) for p in e.path)}: {e.message}" if e.path else e.message for e in errors]
+    if len(messages) == 1:
+        return messages[0]
+    return "\n" + "\n".join(f" - {message}" for message in messages)
+
 
 class PipelineSchema:
     """Class to generate a schema object with
@@ -204,15 +252,27 @@ class PipelineSchema:
                 log.error(error_msg)
                 raise AssertionError(error_msg)
 
+    def get_validation_errors(self, params, required=True):
+        """Validate parameters against the schema, collecting all errors.
+
+        Args:
+            params (dict): The parameters to validate.
+            required (bool): If False, missing required parameters are not errors.
+
+        Returns:
+            list: The :class:`jsonschema.exceptions.ValidationError` objects, sorted by parameter.
+        """
+        validator = compile_validator(self.schema, required)
+        return sorted(validator.iter_errors(params), key=lambda e: [str(p) for p in e.path])
+
     def validate_params(self):
         """Check given parameters against a schema and validate"""
         if self.schema is None:
             log.error("[red][✗] Pipeline schema not found")
             return False
-        try:
-            jsonschema.validate(self.input_params, self.schema)
-        except jsonschema.exceptions.ValidationError as e:
-            log.error(f"[red][✗] Input parameters are invalid: {e.message}")
+        errors = self.get_validation_errors(self.input_params)
+        if errors:
+            log.error(f"[red][✗] Input parameters are invalid: {format_validation_errors(errors)}")
             return False
         log.info("[green][✓] Input parameters look valid")
         return True
@@ -227,17 +287,10 @@ class PipelineSchema:
         """
         if self.schema is None:
             log.error("[red][✗] Pipeline schema not found")
-        try:
-            # Make copy of schema and remove required flags
-            schema_no_required = copy.deepcopy(self.schema)
-            if "required" in schema_no_required:
-                schema_no_required.pop("required")
-            for group_key, group in schema_no_required.get("definitions", {}).items():
-                if "required" in group:
-                    schema_no_required["definitions"][group_key].pop("required")
-            jsonschema.validate(self.schema_defaults, schema_no_required)
-        except jsonschema.exceptions.ValidationError as e:
-            raise AssertionError(f"Default parameters are invalid: {e.message}")
+        # Required params might have no defaults, so ignore the required flags
+        errors = self.get_validation_errors(self.schema_defaults, required=False)
+        if errors:
+            raise AssertionError(f"Default parameters are invalid: {format_validation_errors(errors)}")
         for param, default in self.schema_defaults.items():
             if default in ("null", "", None, "None"):
                 log.warning(
@@ -256,7 +309,7 @@ class PipelineSchema:
             params_ignore = []
 
         # Go over group keys
-        for group_key, group in schema_no_required.get("definitions", {}).items():
+        for group_key, group in self.schema.get("definitions", {}).items():
             group_properties = group.get("properties")
             for param in group_properties:
                 if param in params_ignore:
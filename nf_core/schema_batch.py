@@ -0,0 +1,168 @@
+""" Validate many parameter files against one pipeline schema """
+
+import concurrent.futures
+import json
+import logging
+import os
+
+import yaml
+
+from nf_core.schema import PipelineSchema
+
+log = logging.getLogger(__name__)
+
+# Schema of the worker processes, set when the process starts
+_worker_schema = None
+
+
+def _init_worker(schema):
+    global _worker_schema
+    _worker_schema = PipelineSchema()
+    _worker_schema.schema = schema
+
+
+def _validate_file_worker(params_path):
+    return validate_params_file(_worker_schema, params_path)
+
+
+def load_params_file(params_path):
+    """Load a parameters file for the Nextflow -params-file option (JSON or YAML).
+
+    Returns:
+        dict: The parameters.
+
+    Raises:
+        AssertionError: If the file can't be read or doesn't contain a set of parameters.
+    """
+    try:
+        with open(params_path, "r") as fh:
+            content = fh.read()
+    except OSError as e:
+        raise AssertionError(f"Could not read params file: {e}")
+    try:
+        params = json.loads(content)
+    except json.JSONDecodeError as json_e:
+        try:
+            params = yaml.safe_load(content)
+        except yaml.YAMLError as yaml_e:
+            raise AssertionError(
+                f"Could not load params file as either JSON or YAML:\n JSON: {json_e}\n YAML: {yaml_e}"
+            )
+    if not isinstance(params, dict):
+        raise AssertionError("Params file does not contain a mapping of parameter names to values")
+    return params
+
+
+def validate_params(schema_obj, params):
+    """Validate a set of parameters, collecting all errors.
+
+    Args:
+        schema_obj (PipelineSchema): The loaded pipeline schema.
+        params (dict): The parameters.
+
+    Returns:
+        dict: Whether the parameters are ``valid``, and the ``errors`` with the ``param`` and ``message`` of each.
+    """
+    errors = [
+        {"param": ".".join(str(p) for p in e.path) or None, "message": e.message}
+        for e in schema_obj.get_validation_errors(params)
+    ]
+    return {"valid": not errors, "errors": errors}
+
+
+def validate_params_file(schema_obj, params_path):
+    """Load and validate a parameters file.
+
+    Returns:
+        dict: The ``file`` and the result of :func:`validate_params`.
+    """
+    try:
+        params = load_params_file(params_path)
+    except AssertionError as e:
+        return {"file": params_path, "valid": False, "errors": [{"param": None, "message": str(e)}]}
+    return {"file": params_path, **validate_params(schema_obj, params)}
+
+
+class SchemaBatchValidator:
+    """Validate many parameter files against one pipeline schema.
+
+    The schema is loaded and compiled once. Files are validated in a pool of processes,
+    each of which compiles the schema once when it starts.
+
+    Args:
+        schema_obj (PipelineSchema): The loaded pipeline schema.
+        processes (int): Number of processes to validate files in. Default: the number of CPUs.
+    """
+
+    def __init__(self, schema_obj, processes=None):
+        self.schema_obj = schema_obj
+        self.processes = processes or os.cpu_count() or 1
+
+    def validate_files(self, params_paths, chunksize=16):
+        """Validate parameter files.
+
+        Args:
+            params_paths (iterable): Paths to the parameter files.
+            chunksize (int): Number of files sent to a worker process at a time.
+
+        Yields:
+            dict: The result of :func:`validate_params_file` for each file, in the order of the paths.
+        """
+        params_paths = list(params_paths)
+        if self.processes == 1 or len(params_paths) <= 1:
+            for params_path in params_paths:
+                yield validate_params_file(self.schema_obj, params_path)
+            return
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.processes, initializer=_init_worker, initargs=(self.schema_obj.schema,)
+        ) as pool:
+            yield from pool.map(_validate_file_worker, params_paths, chunksize=chunksize)
+
+    def write_report(self, params_paths, out_fh):
+        """Validate parameter files and write one JSON line per file as soon as it is validated.
+
+        Returns:
+            tuple: Number of valid and invalid files.
+        """
+        num_valid = num_invalid = 0
+        for result in self.validate_files(params_paths):
+            out_fh.write(json.dumps(result) + "\n")
+            out_fh.flush()
+            if result["valid"]:
+                num_valid += 1
+            else:
+                num_invalid += 1
+        return num_valid, num_invalid
+
+    def serve(self, in_fh, out_fh):
+        """Answer validation requests until the input ends.
+
+        Each input line is either the path of a parameter file, or a JSON object with the
+        ``params`` to validate and an optional ``id`` that is copied to the result. One JSON
+        line is written for each request, in the order of the requests.
+
+        Args:
+            in_fh (file): Requests, e.g. stdin.
+            out_fh (file): Results, e.g. stdout.
+        """
+        for line in in_fh:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    result = {"valid": False, "errors": [{"param": None, "message": f"Could not parse request: {e}"}]}
+                else:
+                    if isinstance(request.get("params"), dict):
+                        result = validate_params(self.schema_obj, request["params"])
+                    else:
+                        message = "Request must have a 'params' object"
+                        result = {"valid": False, "errors": [{"param": None, "message": message}]}
+                    if "id" in request:
+                        result = {"id": request["id"], **result}
+            else:
+                result = validate_params_file(self.schema_obj, line)
+            out_fh.write(json.dumps(result) + "\n")
+            out_fh.flush()
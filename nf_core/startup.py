@@ -0,0 +1,146 @@
+"""
+Utility functions needed when the nf-core command starts.
+
+This module must stay free of heavy imports, as it is loaded before any command is parsed.
+It is also imported by :mod:`nf_core.utils`, so everything here is available there as well.
+"""
+import concurrent.futures
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from packaging.version import Version
+
+import nf_core
+
+log = logging.getLogger(__name__)
+
+NFCORE_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.getenv("HOME"), ".cache")),
+    "nfcore",
+)
+NFCORE_DIR = os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.join(os.getenv("HOME"), ".config")), "nfcore")
+
+
+# The latest version of nf-core/tools is only fetched once a day
+VERSION_CACHE_FILE = os.path.join(NFCORE_CACHE_DIR, "tools_version.json")
+VERSION_CACHE_MAX_AGE = 24 * 60 * 60
+
+# Running or finished background requests for the latest version, by URL
+_remote_version_checks = {}
+_remote_version_checks_lock = threading.Lock()
+
+
+def fetch_remote_version(source_url):
+    import requests
+
+    response = requests.get(source_url, timeout=3)
+    remote_version = re.sub(r"[^0-9\.]", "", response.text)
+    return remote_version
+
+
+def read_cached_remote_version(source_url):
+    """Return the latest version fetched from ``source_url`` during the last day, if any"""
+    try:
+        with open(VERSION_CACHE_FILE, "r") as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if cache.get("source_url") != source_url or time.time() - cache.get("timestamp", 0) > VERSION_CACHE_MAX_AGE:
+        return None
+    return cache.get("remote_version")
+
+
+def write_cached_remote_version(source_url, remote_version):
+    try:
+        os.makedirs(os.path.dirname(VERSION_CACHE_FILE), exist_ok=True)
+        tmp_cache_file = f"{VERSION_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_cache_file, "w") as fh:
+            json.dump({"source_url": source_url, "remote_version": remote_version, "timestamp": time.time()}, fh)
+        os.replace(tmp_cache_file, VERSION_CACHE_FILE)
+    except OSError as e:
+        log.debug(f"Could not cache the latest nf-core version: {e}")
+
+
+def fetch_remote_version_background(source_url):
+    """Fetch the latest version in a daemon thread, which never delays the exit of the program.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the latest version. Repeated calls share the same request.
+    """
+    with _remote_version_checks_lock:
+        future = _remote_version_checks.get(source_url)
+        if future is not None:
+            return future
+        future = concurrent.futures.Future()
+        _remote_version_checks[source_url] = future
+
+    def fetch():
+        try:
+            remote_version = fetch_remote_version(source_url)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            write_cached_remote_version(source_url, remote_version)
+            future.set_result(remote_version)
+
+    threading.Thread(target=fetch, name="nf-core-version-check", daemon=True).start()
+    return future
+
+
+def check_if_outdated(
+    current_version=None, remote_version=None, source_url="https://nf-co.re/tools_version", timeout=None
+):
+    """
+    Check if the current version of nf-core is outdated
+
+    The latest version is cached for a day. Otherwise it is fetched in a background thread,
+    waiting for it at most ``timeout`` seconds (until the request finishes if None).
+    If it is not available in time, the returned remote version is None.
+    """
+    # Exit immediately if disabled via ENV var
+    if os.environ.get("NFCORE_NO_VERSION_CHECK", False):
+        return (True, "", "")
+    # Set and clean up the current version string
+    if current_version is None:
+        current_version = nf_core.__version__
+    current_version = re.sub(r"[^0-9\.]", "", current_version)
+    # Build the URL to check against
+    source_url = os.environ.get("NFCORE_VERSION_URL", source_url)
+    source_url = f"{source_url}?v={current_version}"
+    # check if we have a newer version without blocking the rest of the script
+    is_outdated = False
+    if remote_version is None:  # we set it manually for tests
+        remote_version = read_cached_remote_version(source_url)
+    if remote_version is None:
+        try:
+            remote_version = fetch_remote_version_background(source_url).result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            log.debug("The check for nf-core updates has not finished yet")
+        except Exception as e:
+            log.debug(f"Could not check for nf-core updates: {e}")
+    if remote_version:
+        if Version(remote_version) > Version(current_version):
+            is_outdated = True
+    return (is_outdated, current_version, remote_version)
+
+
+def rich_force_colors():
+    """
+    Check if any environment variables are set to force Rich to use coloured output
+    """
+    if os.getenv("GITHUB_ACTIONS") or os.getenv("FORCE_COLOR") or os.getenv("PY_COLORS"):
+        return True
+    return None
+
+
+def setup_nfcore_dir():
+    """Creates a directory for files that need to be kept between sessions
+
+    Currently only used for keeping local copies of modules repos
+    """
+    if not os.path.exists(NFCORE_DIR):
+        os.makedirs(NFCORE_DIR)
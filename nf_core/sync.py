@@ -1,16 +1,20 @@
 """Synchronise a pipeline TEMPLATE branch with the template.
 """
 
+import concurrent.futures
+import hashlib
 import json
 import logging
 import os
 import re
 import shutil
+import stat
+import tempfile
+import threading
 
 import git
 import questionary
 import requests
-import requests_cache
 import rich
 import yaml
 from git import GitCommandError, InvalidGitRepositoryError
@@ -22,6 +26,9 @@ import nf_core.utils
 
 log = logging.getLogger(__name__)
 
+# Default upper limit of pipelines synced at the same time, each runs git, prettier and GitHub API calls
+SYNC_MAX_WORKERS = 8
+
 
 class SyncException(Exception):
     """Exception raised when there was an error with TEMPLATE branch synchronisation"""
@@ -45,6 +52,8 @@ class PipelineSync:
         gh_username (str): GitHub username
         gh_repo (str): GitHub repository name
         template_yaml_path (str): Path to template.yml file for pipeline creation settings. DEPRECATED
+        template_cache (TemplateCache): Share rendered templates with other pipelines synced in the same run
+        delta (bool): Only write and commit the template files that changed, instead of recreating all files
 
     Attributes:
         pipeline_dir (str): Path to target pipeline directory
@@ -65,6 +74,8 @@ class PipelineSync:
         gh_repo=None,
         gh_username=None,
         template_yaml_path=None,
+        template_cache=None,
+        delta=False,
     ):
         """Initialise syncing object"""
 
@@ -81,6 +92,8 @@ class PipelineSync:
         self.gh_username = gh_username
         self.gh_repo = gh_repo
         self.pr_url = ""
+        self.template_cache = template_cache
+        self.delta = delta
 
         self.config_yml_path, self.config_yml = nf_core.utils.load_tools_config(self.pipeline_dir)
 
@@ -117,9 +130,6 @@ class PipelineSync:
     def sync(self):
         """Find workflow attributes, create a new template pipeline on TEMPLATE"""
 
-        # Clear requests_cache so that we don't get stale API responses
-        requests_cache.clear()
-
         log.info(f"Pipeline directory: {self.pipeline_dir}")
         if self.from_branch:
             log.info(f"Using branch '{self.from_branch}' to fetch workflow variables")
@@ -127,11 +137,16 @@ class PipelineSync:
             log.info("Will attempt to automatically create a pull request")
 
         self.inspect_sync_dir()
+        if self.gh_repo is None:
+            self.gh_repo = self.get_gh_repo_from_remote()
         self.get_wf_config()
         self.checkout_template_branch()
-        self.delete_template_branch_files()
-        self.make_template_pipeline()
-        self.commit_template_changes()
+        if self.delta:
+            self.update_template_branch_files()
+        else:
+            self.delete_template_branch_files()
+            self.make_template_pipeline()
+            self.commit_template_changes()
 
         # Push and make a pull request if we've been asked to
         if self.made_changes and self.make_pr:
@@ -141,7 +156,7 @@ class PipelineSync:
                     raise PullRequestException("GITHUB_AUTH_TOKEN not set!")
 
                 # Check that we know the github username and repo name
-                if self.gh_username is None and self.gh_repo is None:
+                if self.gh_repo is None:
                     raise PullRequestException("Could not find GitHub username and repo name")
 
                 self.push_template_branch()
@@ -253,27 +268,121 @@ class PipelineSync:
         # Only show error messages from pipeline creation
         logging.getLogger("nf_core.create").setLevel(logging.ERROR)
 
-        # Re-write the template yaml info from .nf-core.yml config
-        if "template" in self.config_yml:
-            with open(self.config_yml_path, "w") as config_path:
-                yaml.safe_dump(self.config_yml, config_path)
-
         try:
-            nf_core.create.PipelineCreate(
-                name=self.wf_config["manifest.name"].strip('"').strip("'"),
-                description=self.wf_config["manifest.description"].strip('"').strip("'"),
-                version=self.wf_config["manifest.version"].strip('"').strip("'"),
-                no_git=True,
-                force=True,
-                outdir=self.pipeline_dir,
-                author=self.wf_config["manifest.author"].strip('"').strip("'"),
-                plain=True,
-            ).init_pipeline()
+            nf_core.create.write_template_files(self.pipeline_dir, self.get_template_files())
         except Exception as err:
             # Reset to where you were to prevent git getting messed up.
             self.repo.git.reset("--hard")
             raise SyncException(f"Failed to rebuild pipeline from template with error:\n{err}")
 
+    def get_template_params(self):
+        """Get the template parameters from the workflow config, and the settings from .nf-core.yml
+
+        The settings include the template customisation and lint settings that affect pipeline creation.
+        """
+        template_params = {
+            "name": self.wf_config["manifest.name"].strip('"').strip("'"),
+            "description": self.wf_config["manifest.description"].strip('"').strip("'"),
+            "version": self.wf_config["manifest.version"].strip('"').strip("'"),
+            "author": self.wf_config["manifest.author"].strip('"').strip("'"),
+        }
+        template_config = self.config_yml or None
+        return template_params, template_config
+
+    def get_template_files(self):
+        """Render the template in memory, or get it from the template cache
+
+        Returns:
+            dict: The rendered template, see :meth:`nf_core.create.PipelineCreate.render_files`.
+        """
+        template_params, template_config = self.get_template_params()
+        if self.template_cache is None:
+            return self.render_template(template_params, template_config)
+        # The template only depends on these parameters and the settings in .nf-core.yml
+        key = json.dumps([template_params, template_config], sort_keys=True, default=str)
+        return self.template_cache.get(key, lambda: self.render_template(template_params, template_config))
+
+    def render_template(self, template_params, template_config):
+        """Render the template in memory, with the template settings of the pipeline"""
+        with tempfile.TemporaryDirectory(prefix="nf-core-sync-") as tmp_dir:
+            # PipelineCreate reads the settings from the .nf-core.yml in the output directory
+            if template_config is not None:
+                with open(os.path.join(tmp_dir, os.path.basename(self.config_yml_path)), "w") as fh:
+                    yaml.safe_dump(template_config, fh)
+            return nf_core.create.PipelineCreate(
+                **template_params, no_git=True, force=True, outdir=tmp_dir, plain=True
+            ).render_files()
+
+    def update_template_branch_files(self):
+        """
+        Render the template and only write the files that differ from the TEMPLATE branch, then commit them.
+
+        Files are compared by their git blob hashes and file modes, so that unchanged files are
+        neither rewritten nor hashed by git again.
+
+        Returns:
+            bool: True if a commit was made.
+        """
+        log.info("Making a new template pipeline using pipeline variables, only writing files that changed")
+
+        # Only show error messages from pipeline creation
+        logging.getLogger("nf_core.create").setLevel(logging.ERROR)
+
+        try:
+            rendered_files = {
+                path: ("100755" if mode & stat.S_IXUSR else "100644", content)
+                for path, (content, mode) in self.get_template_files().items()
+            }
+        except Exception as err:
+            raise SyncException(f"Failed to rebuild pipeline from template with error:\n{err}")
+
+        # Blob hashes and modes of the files on the TEMPLATE branch
+        template_blobs = {}
+        for entry in self.repo.git.ls_tree("-r", "-z", "HEAD").split("\0"):
+            if entry:
+                meta, path = entry.split("\t", 1)
+                mode, _, sha = meta.split()
+                template_blobs[path] = (mode, sha)
+
+        changed = [
+            path
+            for path, (mode, content) in rendered_files.items()
+            if template_blobs.get(path) != (mode, git_blob_hash(content))
+        ]
+        deleted = [path for path in template_blobs if path not in rendered_files]
+        if not changed and not deleted:
+            log.info("Template contains no changes - no new commit created")
+            return False
+
+        try:
+            for path in changed:
+                mode, content = rendered_files[path]
+                file_path = os.path.join(self.pipeline_dir, path)
+                log.debug(f"Writing {file_path}")
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "wb") as fh:
+                    fh.write(content)
+                os.chmod(file_path, 0o755 if mode == "100755" else 0o644)
+            for path in deleted:
+                file_path = os.path.join(self.pipeline_dir, path)
+                log.debug(f"Deleting {file_path}")
+                if os.path.isfile(file_path) or os.path.islink(file_path):
+                    os.unlink(file_path)
+
+            # Build the commit from the index, only updating the entries of the files that changed
+            index = self.repo.index
+            if changed:
+                index.add(changed)
+            if deleted:
+                index.remove(deleted)
+            index.commit(f"Template update for nf-core/tools version {nf_core.__version__}")
+        except Exception as e:
+            self.repo.git.reset("--hard")
+            raise SyncException(f"Could not commit changes to TEMPLATE:\n{e}")
+        self.made_changes = True
+        log.info(f"Committed changes to 'TEMPLATE' branch: {len(changed)} files written, {len(deleted)} deleted")
+        return True
+
     def commit_template_changes(self):
         """If we have any changes with the new template files, make a git commit"""
         # Check that we have something to commit
@@ -290,6 +399,15 @@ class PipelineSync:
             raise SyncException(f"Could not commit changes to TEMPLATE:\n{e}")
         return True
 
+    def get_gh_repo_from_remote(self):
+        """Get the GitHub repository name (`owner/repo`) from the URL of the `origin` remote"""
+        try:
+            remote_url = self.repo.remotes.origin.url
+        except (AttributeError, IndexError):
+            return None
+        match = re.search(r"github\.com[:/]([^/]+/[^/]+?)(?:\.git)?/?$", remote_url)
+        return match.group(1) if match else None
+
     def push_template_branch(self):
         """If we made any changes, push the TEMPLATE branch to the default remote
         and try to make a PR. If we don't have the auth token, try to figure out a URL
@@ -360,26 +478,25 @@ class PipelineSync:
 
         # Make new pull-request
         stderr = rich.console.Console(stderr=True, force_terminal=nf_core.utils.rich_force_colors())
-        with self.gh_api.cache_disabled():
-            try:
-                r = self.gh_api.request_retry(
-                    f"https://api.github.com/repos/{self.gh_repo}/pulls",
-                    post_data={
-                        "title": pr_title,
-                        "body": pr_body_text,
-                        "maintainer_can_modify": True,
-                        "head": self.merge_branch,
-                        "base": self.from_branch,
-                    },
-                )
-            except Exception as e:
-                stderr.print_exception()
-                raise PullRequestException(f"Something went badly wrong - {e}")
-            else:
-                self.gh_pr_returned_data = r.json()
-                self.pr_url = self.gh_pr_returned_data["html_url"]
-                log.debug(f"GitHub API PR worked, return code {r.status_code}")
-                log.info(f"GitHub PR created: {self.gh_pr_returned_data['html_url']}")
+        try:
+            r = self.gh_api.request_retry(
+                f"https://api.github.com/repos/{self.gh_repo}/pulls",
+                post_data={
+                    "title": pr_title,
+                    "body": pr_body_text,
+                    "maintainer_can_modify": True,
+                    "head": self.merge_branch,
+                    "base": self.from_branch,
+                },
+            )
+        except Exception as e:
+            stderr.print_exception()
+            raise PullRequestException(f"Something went badly wrong - {e}")
+        else:
+            self.gh_pr_returned_data = r.json()
+            self.pr_url = self.gh_pr_returned_data["html_url"]
+            log.debug(f"GitHub API PR worked, return code {r.status_code}")
+            log.info(f"GitHub PR created: {self.gh_pr_returned_data['html_url']}")
 
     def close_open_template_merge_prs(self):
         """Get all template merging branches (starting with 'nf-core-template-merge-')
@@ -390,8 +507,8 @@ class PipelineSync:
 
         # Look for existing pull-requests
         list_prs_url = f"https://api.github.com/repos/{self.gh_repo}/pulls"
-        with self.gh_api.cache_disabled():
-            list_prs_request = self.gh_api.get(list_prs_url)
+        # Revalidate any cached response, so that we see PRs that were opened since
+        list_prs_request = self.gh_api.get(list_prs_url, refresh=True)
         try:
             list_prs_json = json.loads(list_prs_request.content)
             list_prs_pp = json.dumps(list_prs_json, indent=4)
@@ -429,12 +546,10 @@ class PipelineSync:
             f"This pull-request is now outdated and has been closed in favour of {self.pr_url}\n\n"
             f"Please use {self.pr_url} to merge in the new changes from the nf-core template as soon as possible."
         )
-        with self.gh_api.cache_disabled():
-            self.gh_api.post(url=pr["comments_url"], data=json.dumps({"body": comment_text}))
+        self.gh_api.post(url=pr["comments_url"], data=json.dumps({"body": comment_text}))
 
         # Update the PR status to be closed
-        with self.gh_api.cache_disabled():
-            pr_request = self.gh_api.patch(url=pr["url"], data=json.dumps({"state": "closed"}))
+        pr_request = self.gh_api.patch(url=pr["url"], data=json.dumps({"state": "closed"}))
         try:
             pr_request_json = json.loads(pr_request.content)
             pr_request_pp = json.dumps(pr_request_json, indent=4)
@@ -463,3 +578,108 @@ class PipelineSync:
             self.repo.git.checkout(self.original_branch)
         except GitCommandError as e:
             raise SyncException(f"Could not reset to original branch `{self.original_branch}`:\n{e}")
+
+
+def git_blob_hash(content):
+    """Hash file content the same way as `git hash-object`"""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class TemplateCache:
+    """Templates rendered during a batch sync, so that pipelines with the same template parameters share one render.
+
+    The rendered templates are kept in memory.
+    """
+
+    def __init__(self):
+        self.rendered = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def get(self, key, render):
+        """Get the rendered template for a key.
+
+        Args:
+            key (str): The parameters of the template.
+            render (function): Renders the template, called the first time the key is used.
+
+        Returns:
+            dict: The rendered template, see :meth:`nf_core.create.PipelineCreate.render_files`.
+        """
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self.rendered:
+                self.rendered[key] = render()
+            return self.rendered[key]
+
+
+class PipelineSyncBatch:
+    """Synchronise the TEMPLATE branches of many pipelines in one run.
+
+    The pipelines are synced in parallel. Templates are rendered once for each distinct set of
+    template parameters, and pull-requests are made through the shared GitHub API session.
+
+    Args:
+        pipeline_dirs (list): Paths to the Nextflow pipeline root directories
+        from_branch (str): The branch to use to fetch config vars. If not set, will use current active branch
+        make_pr (bool): Set this to `True` to create GitHub pull-requests with the changes
+        gh_username (str): GitHub username
+        max_workers (int): Number of pipelines to sync at the same time. Default: the number of pipelines,
+            but at most the number of CPUs and :data:`SYNC_MAX_WORKERS`.
+        delta (bool): Only write and commit the template files that changed, instead of recreating all files
+
+    Attributes:
+        syncs (list): The :class:`PipelineSync` objects of the pipelines
+        failed (dict): Errors of pipelines that could not be synced, by pipeline directory
+    """
+
+    def __init__(self, pipeline_dirs, from_branch=None, make_pr=False, gh_username=None, max_workers=None, delta=False):
+        self.pipeline_dirs = pipeline_dirs
+        self.from_branch = from_branch
+        self.make_pr = make_pr
+        self.gh_username = gh_username
+        self.max_workers = max_workers
+        self.delta = delta
+        self.syncs = []
+        self.failed = {}
+
+    def sync(self):
+        """Sync all pipelines, then log a summary.
+
+        Returns:
+            bool: True if all pipelines were synced.
+        """
+        template_cache = TemplateCache()
+        self.syncs = [
+            PipelineSync(
+                pipeline_dir,
+                self.from_branch,
+                self.make_pr,
+                gh_username=self.gh_username,
+                template_cache=template_cache,
+                delta=self.delta,
+            )
+            for pipeline_dir in self.pipeline_dirs
+        ]
+        max_workers = self.max_workers or max(min(len(self.syncs), os.cpu_count() or 1, SYNC_MAX_WORKERS), 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(pipeline_sync.sync): pipeline_sync for pipeline_sync in self.syncs}
+            for future in concurrent.futures.as_completed(futures):
+                pipeline_dir = futures[future].pipeline_dir
+                try:
+                    future.result()
+                except Exception as e:
+                    # Record the error and carry on with the other pipelines
+                    log.error(f"Could not sync '{pipeline_dir}': {e}")
+                    self.failed[pipeline_dir] = e
+
+        changed = [pipeline_sync for pipeline_sync in self.syncs if pipeline_sync.made_changes]
+        log.info(
+            f"Synced {len(self.syncs) - len(self.failed)} of {len(self.syncs)} pipelines, "
+            f"{len(changed)} with template changes"
+        )
+        for pipeline_sync in changed:
+            if pipeline_sync.pr_url:
+                log.info(f"{pipeline_sync.pipeline_dir}: {pipeline_sync.pr_url}")
+        return not self.failed
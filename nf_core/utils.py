@@ -15,6 +15,7 @@ import re
 import shlex
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -25,11 +26,20 @@ import requests
 import requests_cache
 import rich
 import yaml
-from packaging.version import Version
 from rich.live import Live
 from rich.spinner import Spinner
 
 import nf_core
+import nf_core.nextflow_config
+import nf_core.nextflow_daemon
+from nf_core.startup import (  # noqa: F401
+    NFCORE_CACHE_DIR,
+    NFCORE_DIR,
+    check_if_outdated,
+    fetch_remote_version,
+    rich_force_colors,
+    setup_nfcore_dir,
+)
 
 log = logging.getLogger(__name__)
 
@@ -52,56 +62,6 @@ nfcore_question_style = prompt_toolkit.styles.Style(
     ]
 )
 
-NFCORE_CACHE_DIR = os.path.join(
-    os.environ.get("XDG_CACHE_HOME", os.path.join(os.getenv("HOME"), ".cache")),
-    "nfcore",
-)
-NFCORE_DIR = os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.join(os.getenv("HOME"), ".config")), "nfcore")
-
-
-def fetch_remote_version(source_url):
-    response = requests.get(source_url, timeout=3)
-    remote_version = re.sub(r"[^0-9\.]", "", response.text)
-    return remote_version
-
-
-def check_if_outdated(current_version=None, remote_version=None, source_url="https://nf-co.re/tools_version"):
-    """
-    Check if the current version of nf-core is outdated
-    """
-    # Exit immediately if disabled via ENV var
-    if os.environ.get("NFCORE_NO_VERSION_CHECK", False):
-        return (True, "", "")
-    # Set and clean up the current version string
-    if current_version is None:
-        current_version = nf_core.__version__
-    current_version = re.sub(r"[^0-9\.]", "", current_version)
-    # Build the URL to check against
-    source_url = os.environ.get("NFCORE_VERSION_URL", source_url)
-    source_url = f"{source_url}?v={current_version}"
-    # check if we have a newer version without blocking the rest of the script
-    is_outdated = False
-    if remote_version is None:  # we set it manually for tests
-        try:
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(fetch_remote_version, source_url)
-                remote_version = future.result()
-        except Exception as e:
-            log.debug(f"Could not check for nf-core updates: {e}")
-    if remote_version is not None:
-        if Version(remote_version) > Version(current_version):
-            is_outdated = True
-    return (is_outdated, current_version, remote_version)
-
-
-def rich_force_colors():
-    """
-    Check if any environment variables are set to force Rich to use coloured output
-    """
-    if os.getenv("GITHUB_ACTIONS") or os.getenv("FORCE_COLOR") or os.getenv("PY_COLORS"):
-        return True
-    return None
-
 
 class Pipeline:
     """Object to hold information about a local pipeline.
@@ -213,13 +173,101 @@ def is_pipeline_directory(wf_path):
             raise UserWarning(f"'{wf_path}' is not a pipeline - '{fn}' is missing")
 
 
-def fetch_wf_config(wf_path, cache_config=True):
+# Number of `nextflow config` results kept in $NXF_HOME/nf-core, the least recently used ones are removed
+WF_CONFIG_CACHE_SIZE = 100
+
+INCLUDE_CONFIG_REGEX = re.compile(r"""\bincludeConfig\s*\(?\s*(['"])(.+?)\1""")
+GETENV_REGEX = re.compile(r"""\bgetenv\s*\(\s*['"]([^'"]+)['"]""")
+
+
+def wf_config_cache_key(wf_path, profile=None):
+    """Hash of everything that `nextflow config` depends on for a pipeline.
+
+    This covers ``main.nf``, ``nextflow.config`` and the local config files it includes (recursively),
+    the Nextflow user config ``$NXF_HOME/config``, a ``nextflow.config`` in the working directory,
+    the ``NXF_*`` environment variables, environment variables read by ``System.getenv()`` in the
+    config files and the selected profiles.
+
+    Args:
+        wf_path (str): Nextflow workflow file system path.
+        profile (str): Comma-separated profiles passed to Nextflow.
+
+    Returns:
+        str: Hex digest of the inputs, or None if the pipeline has neither ``nextflow.config`` nor ``main.nf``.
+    """
+    wf_path = os.path.abspath(wf_path)
+    nxf_home = os.environ.get("NXF_HOME", os.path.join(os.getenv("HOME"), ".nextflow"))
+    config_files = set()
+    env_names = set()
+    includes_unresolved = False
+    to_visit = [os.path.join(wf_path, "nextflow.config")]
+    while to_visit:
+        config_path = to_visit.pop()
+        if config_path in config_files or not os.path.isfile(config_path):
+            continue
+        config_files.add(config_path)
+        with open(config_path, "r", errors="replace") as fh:
+            config_text = fh.read()
+        env_names.update(GETENV_REGEX.findall(config_text))
+        for _, include in INCLUDE_CONFIG_REGEX.findall(config_text):
+            include = re.sub(r"\$\{?(projectDir|baseDir)\}?", lambda _: wf_path, include)
+            # Remote includes are represented by their URL, which is part of the including file
+            if re.match(r"^\w+://", include):
+                continue
+            if "$" in include:
+                includes_unresolved = True
+                continue
+            to_visit.append(os.path.normpath(os.path.join(os.path.dirname(config_path), include)))
+    if not config_files and not os.path.isfile(os.path.join(wf_path, "main.nf")):
+        return None
+    # Fall back to all config files of the pipeline if includes are built from variables
+    if includes_unresolved:
+        config_files.update(str(path) for path in Path(wf_path).glob("*.config"))
+        config_files.update(str(path) for path in Path(wf_path, "conf").glob("**/*.config"))
+
+    dependencies = [os.path.join(wf_path, "main.nf"), os.path.join(nxf_home, "config")] + sorted(config_files)
+    if os.path.abspath(os.getcwd()) != wf_path:
+        dependencies.append(os.path.join(os.getcwd(), "nextflow.config"))
+    inputs = [f"nf-core/tools {nf_core.__version__}", f"path {wf_path}", f"profile {profile}"]
+    for dependency in dependencies:
+        try:
+            with open(dependency, "rb") as fh:
+                inputs.append(f"file {dependency} {hashlib.sha256(fh.read()).hexdigest()}")
+        except OSError:
+            inputs.append(f"file {dependency} missing")
+    for name in sorted(env_names.union(k for k in os.environ if k.startswith("NXF_"))):
+        inputs.append(f"env {name}={os.environ.get(name)}")
+    return hashlib.sha256("\n".join(inputs).encode("utf-8")).hexdigest()
+
+
+def prune_wf_config_cache(cache_basedir, max_entries=WF_CONFIG_CACHE_SIZE):
+    """Remove the least recently used config caches, keeping at most ``max_entries``."""
+    cache_files = []
+    for cache_path in Path(cache_basedir).glob("wf-config-cache-*.json"):
+        try:
+            cache_files.append((cache_path.stat().st_mtime, cache_path))
+        except OSError:
+            continue
+    for _, cache_path in sorted(cache_files, reverse=True)[max_entries:]:
+        log.debug(f"Removing old config cache: {cache_path}")
+        try:
+            cache_path.unlink()
+        except OSError:
+            pass
+
+
+def fetch_wf_config(wf_path, cache_config=True, profile=None):
     """Uses Nextflow to retrieve the the configuration variables
     from a Nextflow workflow.
 
+    If the environment variable ``NFCORE_NATIVE_CONFIG`` is set, the config is evaluated
+    in Python instead, falling back to Nextflow for constructs that are not supported.
+    If ``NFCORE_CONFIG_DAEMON`` is set, Nextflow is started once and kept running for all calls.
+
     Args:
         wf_path (str): Nextflow workflow file system path.
         cache_config (bool): cache configuration or not (def. True)
+        profile (str): Comma-separated Nextflow profiles to apply (def. None)
 
     Returns:
         dict: Workflow configuration settings.
@@ -228,7 +276,6 @@ def fetch_wf_config(wf_path, cache_config=True):
     log.debug(f"Got '{wf_path}' as path")
 
     config = {}
-    cache_fn = None
     cache_basedir = None
     cache_path = None
 
@@ -238,26 +285,13 @@ def fetch_wf_config(wf_path, cache_config=True):
     # Build a cache directory if we can
     if os.path.isdir(nxf_home):
         cache_basedir = os.path.join(nxf_home, "nf-core")
-        if not os.path.isdir(cache_basedir):
-            os.mkdir(cache_basedir)
-
-    # If we're given a workflow object with a commit, see if we have a cached copy
-    cache_fn = None
-    # Make a filename based on file contents
-    concat_hash = ""
-    for fn in ["nextflow.config", "main.nf"]:
-        try:
-            with open(os.path.join(wf_path, fn), "rb") as fh:
-                concat_hash += hashlib.sha256(fh.read()).hexdigest()
-        except FileNotFoundError:
-            pass
-    # Hash the hash
-    if len(concat_hash) > 0:
-        bighash = hashlib.sha256(concat_hash.encode("utf-8")).hexdigest()
-        cache_fn = f"wf-config-cache-{bighash[:25]}.json"
+        os.makedirs(cache_basedir, exist_ok=True)
 
-    if cache_basedir and cache_fn:
-        cache_path = os.path.join(cache_basedir, cache_fn)
+    # Make a filename based on the contents of all files and variables the config depends on
+    cache_key = wf_config_cache_key(wf_path, profile)
+
+    if cache_basedir and cache_key:
+        cache_path = os.path.join(cache_basedir, f"wf-config-cache-{cache_key[:25]}.json")
         if os.path.isfile(cache_path) and cache_config is True:
             log.debug(f"Found a config cache, loading: {cache_path}")
             with open(cache_path, "r") as fh:
@@ -265,18 +299,43 @@ def fetch_wf_config(wf_path, cache_config=True):
                     config = json.load(fh)
                 except json.JSONDecodeError as e:
                     raise UserWarning(f"Unable to load JSON file '{cache_path}' due to error {e}")
+            # Mark the cache as recently used
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
             return config
     log.debug("No config cache found")
 
-    # Call `nextflow config`
-    nfconfig_raw = nextflow_cmd(f"nextflow config -flat {wf_path}")
-    for l in nfconfig_raw.splitlines():
-        ul = l.decode("utf-8")
+    # Evaluate the config without starting Nextflow if enabled. Fall back to Nextflow for unsupported constructs.
+    native_config = None
+    if os.environ.get("NFCORE_NATIVE_CONFIG", False):
         try:
-            k, v = ul.split(" = ", 1)
+            native_config = nf_core.nextflow_config.evaluate_config(wf_path, profile.split(",") if profile else None)
+        except nf_core.nextflow_config.UnsupportedConfigError as e:
+            log.debug(f"Could not evaluate the config of '{wf_path}' natively, falling back to Nextflow: {e}")
+    if native_config is not None:
+        for k, v in native_config:
             config[k] = v.strip("'\"")
-        except ValueError:
-            log.debug(f"Couldn't find key=value config pair:\n  {ul}")
+    else:
+        # Call `nextflow config`, through the warm config daemon if it is enabled
+        nfconfig_raw = None
+        daemon = nf_core.nextflow_daemon.get_shared_daemon()
+        if daemon is not None:
+            try:
+                nfconfig_raw = daemon.flat_config(wf_path, profile)
+            except nf_core.nextflow_daemon.ConfigDaemonError as e:
+                log.debug(f"{e} - calling Nextflow directly")
+        if nfconfig_raw is None:
+            profile_arg = f" -profile {profile}" if profile else ""
+            nfconfig_raw = nextflow_cmd(f"nextflow config -flat{profile_arg} {wf_path}")
+        for l in nfconfig_raw.splitlines():
+            ul = l.decode("utf-8")
+            try:
+                k, v = ul.split(" = ", 1)
+                config[k] = v.strip("'\"")
+            except ValueError:
+                log.debug(f"Couldn't find key=value config pair:\n  {ul}")
 
     # Scrape main.nf for additional parameter declarations
     # Values in this file are likely to be complex, so don't both trying to capture them. Just get the param name.
@@ -297,8 +356,12 @@ def fetch_wf_config(wf_path, cache_config=True):
     # in others folders than tmp when doing tests in general
     if cache_path and cache_config:
         log.debug(f"Saving config cache: {cache_path}")
-        with open(cache_path, "w") as fh:
+        # Write to a temporary file first, as several processes may fetch the same config at once
+        tmp_cache_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_cache_path, "w") as fh:
             json.dump(config, fh, indent=4)
+        os.replace(tmp_cache_path, cache_path)
+        prune_wf_config_cache(cache_basedir)
 
     return config
 
@@ -317,15 +380,6 @@ def nextflow_cmd(cmd):
         )
 
 
-def setup_nfcore_dir():
-    """Creates a directory for files that need to be kept between sessions
-
-    Currently only used for keeping local copies of modules repos
-    """
-    if not os.path.exists(NFCORE_DIR):
-        os.makedirs(NFCORE_DIR)
-
-
 def setup_requests_cachedir():
     """Sets up local caching for faster remote HTTP requests.
 
@@ -418,18 +472,107 @@ def poll_nfcore_web_api(api_url, post_data=None):
                 return web_response
 
 
+class GitHubAPIAdapter(requests.adapters.HTTPAdapter):
+    """
+    Transport adapter for the GitHub API that keeps track of the rate limit.
+
+    Only requests that actually go out to GitHub pass through the adapter, not responses
+    served from the requests cache. When few requests are left before the rate limit resets,
+    requests are spread out over the remaining time instead of running into the limit.
+    Responses that hit the rate limit are retried a limited number of times.
+    """
+
+    # How often to retry a request that hit the rate limit
+    rate_limit_retries = 3
+    # Start slowing down when this few requests are left
+    rate_limit_threshold = 10
+    # Longest time in seconds to wait for the rate limit, give up instead of waiting longer
+    max_wait = 300
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limit_remaining = None
+        self.rate_limit_reset = None
+        self.rate_limit_lock = threading.Lock()
+
+    def update_rate_limit(self, response):
+        """Remember the rate limit reported by the headers of a response."""
+        try:
+            remaining = int(response.headers["X-RateLimit-Remaining"])
+            reset = float(response.headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return
+        with self.rate_limit_lock:
+            self.rate_limit_remaining = remaining
+            self.rate_limit_reset = reset
+
+    def wait_for_rate_limit(self):
+        """Slow down if the rate limit is nearly used up."""
+        with self.rate_limit_lock:
+            remaining, reset = self.rate_limit_remaining, self.rate_limit_reset
+        if remaining is None or remaining > self.rate_limit_threshold:
+            return
+        wait_time = max(reset - time.time(), 0)
+        if remaining > 0:
+            # Spread the requests that are left over the time until the limit resets
+            wait_time = wait_time / (remaining + 1)
+        if wait_time > self.max_wait:
+            log.debug(f"GitHub API rate limit resets in {wait_time:.0f} seconds, not waiting for it")
+        elif wait_time > 0:
+            log.debug(f"{remaining} GitHub API requests left, waiting {wait_time:.1f} seconds")
+            time.sleep(wait_time)
+
+    def retry_wait_time(self, response):
+        """
+        Get how long to wait before retrying a response that hit the rate limit.
+
+        Returns:
+            float: Seconds to wait, or None if the request should not be retried.
+        """
+        if response.status_code not in [403, 429]:
+            return None
+        if response.headers.get("Retry-After") is not None:
+            wait_time = float(re.sub("[^0-9.]", "", response.headers["Retry-After"]) or 0)
+        elif response.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in response.headers:
+            wait_time = float(response.headers["X-RateLimit-Reset"]) - time.time()
+        else:
+            # Not a rate limit, eg. missing permissions
+            return None
+        if wait_time > self.max_wait:
+            return None
+        return max(wait_time, 1)
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.rate_limit_retries + 1):
+            self.wait_for_rate_limit()
+            response = super().send(request, **kwargs)
+            self.update_rate_limit(response)
+            wait_time = self.retry_wait_time(response)
+            if wait_time is None or attempt == self.rate_limit_retries:
+                return response
+            log.warning(f"Hit the GitHub API rate limit. Trying again after {wait_time:.0f} seconds..")
+            response.close()
+            time.sleep(wait_time)
+
+
 class GitHub_API_Session(requests_cache.CachedSession):
     """
     Class to provide a single session for interacting with the GitHub API for a run.
     Inherits the requests_cache.CachedSession and adds additional functionality,
     such as automatically setting up GitHub authentication if we can.
+
+    Expired responses in the cache are revalidated with conditional requests (If-None-Match),
+    which don't count against the GitHub API rate limit. The rate limit itself is handled
+    by the :class:`GitHubAPIAdapter`.
     """
 
     def __init__(self):  # pylint: disable=super-init-not-called
         self.auth_mode = None
         self.return_ok = [200, 201]
         self.return_retry = [403]
+        self.retry_limit = 5
         self.has_init = False
+        self.init_lock = threading.Lock()
 
     def lazy_init(self):
         """
@@ -437,11 +580,16 @@ class GitHub_API_Session(requests_cache.CachedSession):
 
         Only do this when it's actually being used (due to global import)
         """
-        log.debug("Initialising GitHub API requests session")
-        cache_config = setup_requests_cachedir()
-        super().__init__(**cache_config)
-        self.setup_github_auth()
-        self.has_init = True
+        with self.init_lock:
+            if self.has_init:
+                return
+            log.debug("Initialising GitHub API requests session")
+            cache_config = setup_requests_cachedir()
+            super().__init__(**cache_config)
+            self.adapter = GitHubAPIAdapter()
+            self.mount("https://api.github.com", self.adapter)
+            self.setup_github_auth()
+            self.has_init = True
 
     def setup_github_auth(self, auth=None):
         """
@@ -503,56 +651,71 @@ class GitHub_API_Session(requests_cache.CachedSession):
             log.debug(request.content)
             log.debug(post_data)
 
-    def safe_get(self, url):
+    def safe_get(self, url, **kwargs):
         """
         Run a GET request, raise a nice exception with lots of logging if it fails.
         """
-        if not self.has_init:
-            self.lazy_init()
-        request = self.get(url)
+        request = self.get(url, **kwargs)
         if request.status_code not in self.return_ok:
             self.log_content_headers(request)
             raise AssertionError(f"GitHub API PR failed - got return code {request.status_code} from {url}")
         return request
 
-    def get(self, url, **kwargs):
+    def get_paginated(self, url, per_page=100):
+        """
+        Fetch all pages of a list from the GitHub API, following the `Link` response headers.
+
+        Raises:
+            LookupError, if the URL can not be found.
+        """
+        results = []
+        params = {"per_page": per_page}
+        while url is not None:
+            request = self.get(url, params=params)
+            if request.status_code == 404:
+                raise LookupError(f"GitHub API could not find {url}")
+            if request.status_code not in self.return_ok:
+                self.log_content_headers(request)
+                raise AssertionError(f"GitHub API PR failed - got return code {request.status_code} from {url}")
+            results.extend(request.json())
+            # The URL of the next page already has the query parameters
+            url = request.links.get("next", {}).get("url")
+            params = None
+        return results
+
+    def request(self, method, url, *args, **kwargs):
         """
-        Initialise the session if we haven't already, then call the superclass get method.
+        Initialise the session if we haven't already, then send the request.
         """
         if not self.has_init:
             self.lazy_init()
-        return super().get(url, **kwargs)
+        return super().request(method, url, *args, **kwargs)
 
     def request_retry(self, url, post_data=None):
         """
-        Try to fetch a URL, keep retrying if we get a certain return code.
+        Try to fetch a URL, retry a limited number of times if we get a certain return code.
 
         Used in nf-core sync code because we get 403 errors: too many simultaneous requests
         See https://github.com/nf-core/tools/issues/911
+        Responses with rate limit headers are already retried by the :class:`GitHubAPIAdapter`,
+        this backs off exponentially for the ones without.
         """
-        if not self.has_init:
-            self.lazy_init()
-
-        # Start the loop for a retry mechanism
-        while True:
+        for attempt in range(self.retry_limit + 1):
             # GET request
             if post_data is None:
-                log.debug(f"Seding GET request to {url}")
+                log.debug(f"Sending GET request to {url}")
                 r = self.get(url=url)
             # POST request
             else:
-                log.debug(f"Seding POST request to {url}")
+                log.debug(f"Sending POST request to {url}")
                 r = self.post(url=url, json=post_data)
 
             # Failed but expected - try again
-            if r.status_code in self.return_retry:
+            if r.status_code in self.return_retry and attempt < self.retry_limit:
                 self.log_content_headers(r, post_data)
                 log.debug(f"GitHub API PR failed - got return code {r.status_code}")
-                wait_time = float(re.sub("[^0-9]", "", str(r.headers.get("Retry-After", 0))))
-                if wait_time == 0:
-                    log.debug("Couldn't find 'Retry-After' header, guessing a length of time to wait")
-                    wait_time = random.randrange(10, 60)
-                log.warning(f"Got API return code {r.status_code}. Trying again after {wait_time} seconds..")
+                wait_time = min(10 * 2**attempt, 120) + random.uniform(0, 5)
+                log.warning(f"Got API return code {r.status_code}. Trying again after {wait_time:.0f} seconds..")
                 time.sleep(wait_time)
 
             # Unexpected error - raise
@@ -819,9 +982,8 @@ def prompt_remote_pipeline_name(wfs):
     ).unsafe_ask()
 
     # Check nf-core repos
-    for wf in wfs.remote_workflows:
-        if wf.full_name == pipeline or wf.name == pipeline:
-            return wf.full_name
+    if pipeline in wfs.remote_workflows_by_name:
+        return wfs.remote_workflows_by_name[pipeline].full_name
 
     # Non nf-core repo on GitHub
     if pipeline.count("/") == 1:
@@ -916,50 +1078,45 @@ def get_repo_releases_branches(pipeline, wfs):
     wf_branches = {}
 
     # Repo is a nf-core pipeline
-    for wf in wfs.remote_workflows:
-        if wf.full_name == pipeline or wf.name == pipeline:
-            # Set to full name just in case it didn't have the nf-core/ prefix
-            pipeline = wf.full_name
-
-            # Store releases and stop loop
-            wf_releases = list(sorted(wf.releases, key=lambda k: k.get("published_at_timestamp", 0), reverse=True))
-            break
+    if pipeline in wfs.remote_workflows_by_name:
+        wf = wfs.remote_workflows_by_name[pipeline]
+        # Set to full name just in case it didn't have the nf-core/ prefix
+        pipeline = wf.full_name
+        wf_releases = list(sorted(wf.releases, key=lambda k: k.get("published_at_timestamp", 0), reverse=True))
+        is_nf_core = True
 
     # Arbitrary GitHub repo
-    else:
-        if pipeline.count("/") == 1:
-            # Looks like a GitHub address - try working with this repo
-            log.debug(
-                f"Pipeline '{pipeline}' not in nf-core, but looks like a GitHub address - fetching releases from API"
-            )
-
-            # Get releases from GitHub API
-            rel_r = gh_api.safe_get(f"https://api.github.com/repos/{pipeline}/releases")
-
-            # Check that this repo existed
-            try:
-                if rel_r.json().get("message") == "Not Found":
-                    raise AssertionError(f"Not able to find pipeline '{pipeline}'")
-            except AttributeError:
-                # Success! We have a list, which doesn't work with .get() which is looking for a dict key
-                wf_releases = list(sorted(rel_r.json(), key=lambda k: k.get("published_at_timestamp", 0), reverse=True))
+    elif pipeline.count("/") == 1:
+        # Looks like a GitHub address - try working with this repo
+        log.debug(f"Pipeline '{pipeline}' not in nf-core, but looks like a GitHub address - fetching releases from API")
+        is_nf_core = False
 
+    else:
+        log.info("Available nf-core pipelines: '{}'".format("', '".join([w.name for w in wfs.remote_workflows])))
+        raise AssertionError(f"Not able to find pipeline '{pipeline}'")
+
+    # Fetch branches, and releases and tags for non-nf-core repos, from the GitHub API at the same time
+    api_url = f"https://api.github.com/repos/{pipeline}"
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        branches_future = pool.submit(gh_api.get_paginated, f"{api_url}/branches")
+        if not is_nf_core:
+            releases_future = pool.submit(gh_api.get_paginated, f"{api_url}/releases")
+            tags_future = pool.submit(gh_api.get_paginated, f"{api_url}/tags")
+        try:
+            if not is_nf_core:
+                wf_releases = list(
+                    sorted(releases_future.result(), key=lambda k: k.get("published_at_timestamp", 0), reverse=True)
+                )
                 # Get release tag commit hashes
-                if len(wf_releases) > 0:
-                    # Get commit hash information for each release
-                    tags_r = gh_api.safe_get(f"https://api.github.com/repos/{pipeline}/tags")
-                    for tag in tags_r.json():
-                        for release in wf_releases:
-                            if tag["name"] == release["tag_name"]:
-                                release["tag_sha"] = tag["commit"]["sha"]
-
-        else:
-            log.info("Available nf-core pipelines: '{}'".format("', '".join([w.name for w in wfs.remote_workflows])))
+                for tag in tags_future.result():
+                    for release in wf_releases:
+                        if tag["name"] == release["tag_name"]:
+                            release["tag_sha"] = tag["commit"]["sha"]
+            branches = branches_future.result()
+        except LookupError:
             raise AssertionError(f"Not able to find pipeline '{pipeline}'")
 
-    # Get branch information from github api - should be no need to check if the repo exists again
-    branch_response = gh_api.safe_get(f"https://api.github.com/repos/{pipeline}/branches")
-    for branch in branch_response.json():
+    for branch in branches:
         if (
             branch["name"] != "TEMPLATE"
             and branch["name"] != "initial_commit"
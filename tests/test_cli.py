@@ -4,8 +4,12 @@ Most tests check the cli arguments are passed along and that some action is
 taken.
 """
 
+import os
+import subprocess
+import sys
 import tempfile
 import unittest
+from pathlib import Path
 from unittest import mock
 
 from click.testing import CliRunner
@@ -29,6 +33,28 @@ def test_header_outdated(mock_check_outdated, mock_nf_core_cli, capsys):
     assert "There is a new version of nf-core/tools available! (dummy_version)" in captured.err
 
 
+def test_cli_import_time():
+    """Check that the cli entry point doesn't import the heavy dependencies of the commands
+
+    Uses `python -X importtime`, which reports every module that is imported.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import nf_core.__main__"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    import_times = {}
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                import_times[module.strip()] = int(cumulative)
+    assert "nf_core.__main__" in import_times
+    for module in ["git", "requests", "requests_cache", "questionary", "jinja2", "jsonschema", "nf_core.utils"]:
+        assert module not in import_times, f"'{module}' is imported on startup"
+
+
 class TestCli(unittest.TestCase):
     """Class for testing the commandline interface"""
 
@@ -85,12 +111,13 @@ class TestCli(unittest.TestCase):
             "sort": "name",
             "json": None,
             "show-archived": None,
+            "offline": None,
         }
         cmd = ["list"] + self.assemble_params(params) + ["kw1", "kw2"]
         result = self.invoke_cli(cmd)
 
         mock_list_workflows.assert_called_once_with(
-            tuple(cmd[-2:]), params["sort"], "json" in params, "show-archived" in params
+            tuple(cmd[-2:]), params["sort"], "json" in params, "show-archived" in params, "offline" in params
         )
         assert result.exit_code == 0
         assert "pipeline test list" in result.output
@@ -110,6 +137,8 @@ class TestCli(unittest.TestCase):
             "save-all": None,
             "show-hidden": None,
             "url": "builder_url",
+            "no-prompts": None,
+            "dry-run": None,
         }
         cmd = ["launch"] + self.assemble_params(params) + ["pipeline_name"]
         result = self.invoke_cli(cmd)
@@ -126,6 +155,8 @@ class TestCli(unittest.TestCase):
             "show-hidden" in params,
             params["url"],
             params["id"],
+            "no-prompts" in params,
+            "dry-run" in params,
         )
 
         mock_launcher.return_value.launch_pipeline.assert_called_once()
@@ -172,6 +203,8 @@ class TestCli(unittest.TestCase):
             "container-cache-utilisation": "copy",
             "container-cache-index": "/path/index.txt",
             "parallel-downloads": 2,
+            "container-pull-method": "oci",
+            "update": None,
         }
 
         cmd = ["download"] + self.assemble_params(params) + ["pipeline_name"]
@@ -192,10 +225,46 @@ class TestCli(unittest.TestCase):
             params["container-cache-utilisation"],
             params["container-cache-index"],
             params["parallel-downloads"],
+            params["container-pull-method"],
+            "update" in params,
         )
 
         mock_dl.return_value.download_workflow.assert_called_once()
 
+    @mock.patch("nf_core.download.DownloadWorkflowBatch")
+    def test_cli_download_batch(self, mock_dl):
+        """Test that several pipelines are downloaded with a list file and cli parameters are passed on."""
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as pipelines_file:
+            params = {
+                "pipelines-file": pipelines_file.name,
+                "outdir": "/path/outdir",
+                "container-system": "singularity",
+                "parallel-downloads": 8,
+            }
+            cmd = ["download"] + self.assemble_params(params)
+            result = self.invoke_cli(cmd)
+
+            assert result.exit_code == 0
+            mock_dl.assert_called_once_with(
+                params["pipelines-file"],
+                False,
+                params["outdir"],
+                None,
+                False,
+                False,
+                params["container-system"],
+                (),
+                None,
+                None,
+                params["parallel-downloads"],
+                "singularity",
+            )
+            mock_dl.return_value.download_workflows.assert_called_once()
+
+            # A single pipeline can not be combined with a batch download
+            result = self.invoke_cli(cmd + ["pipeline_name"])
+            assert result.exit_code == 2
+
     @mock.patch("nf_core.licences.WorkflowLicences")
     def test_licences(self, mock_lic):
         """Test nf-core pipeline licence is printed out and cli parameters are passed on."""
@@ -373,3 +442,22 @@ class TestCli(unittest.TestCase):
         assert mock_get_schema_path.called_with("some_other_filename")
         assert "some_other_filename" in result.output
         assert "nextflow_schema.json" not in result.output
+
+    @mock.patch("nf_core.schema_batch.SchemaBatchValidator")
+    @mock.patch("nf_core.schema.PipelineSchema.load_lint_schema")
+    @mock.patch("nf_core.schema.PipelineSchema.get_schema_path")
+    def test_schema_validate_batch(self, mock_get_schema_path, mock_load_lint_schema, mock_validator):
+        """Test nf-core schema validate-batch loads the schema once and validates all files"""
+        mock_validator.return_value.write_report.return_value = (1, 1)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            params_files = [os.path.join(tmp_dir, f"params_{i}.json") for i in range(2)]
+            for params_file in params_files:
+                Path(params_file).write_text("{}")
+            cmd = ["schema", "validate-batch", "--jobs", "2", "nf-core/testpipeline", *params_files]
+            result = self.invoke_cli(cmd)
+
+        assert result.exit_code == 1
+        mock_get_schema_path.assert_called_once_with("nf-core/testpipeline")
+        mock_load_lint_schema.assert_called_once()
+        assert mock_validator.call_args[0][1] == 2
+        assert list(mock_validator.return_value.write_report.call_args[0][0]) == params_files
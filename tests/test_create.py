@@ -1,6 +1,9 @@
 """Some tests covering the pipeline creation sub command.
 """
+import json
 import os
+import subprocess
+import sys
 import unittest
 from pathlib import Path
 from unittest import mock
@@ -145,3 +148,76 @@ class NfcoreCreateTest(unittest.TestCase):
         assert not os.path.exists(os.path.join(pipeline.outdir, "CODE_OF_CONDUCT.md"))
         assert not os.path.exists(os.path.join(pipeline.outdir, ".github"))
         assert not os.path.exists(os.path.join(pipeline.outdir, "conf", "igenomes.config"))
+
+    @with_temporary_folder
+    def test_pipeline_render_files(self, tmp_path):
+        """The template is rendered in memory, and only written by init_pipeline"""
+        outdir = Path(tmp_path, "pipeline")
+        pipeline = nf_core.create.PipelineCreate(
+            name=self.pipeline_name,
+            description=self.pipeline_description,
+            author=self.pipeline_author,
+            version=self.pipeline_version,
+            no_git=True,
+            outdir=outdir,
+            template_yaml_path=PIPELINE_TEMPLATE_YML_SKIP,
+            plain=True,
+        )
+        files = pipeline.render_files()
+        assert not outdir.exists()
+
+        # Skipped and renamed files
+        assert "CODE_OF_CONDUCT.md" not in files
+        assert not any(fn.startswith(".github/") for fn in files)
+        assert "workflows/nf-core-test.nf" in files
+        assert "workflows/pipeline.nf" not in files
+        assert files["bin/check_samplesheet.py"][1] & 0o100
+
+        # Fix-ups for the skipped areas are applied in memory
+        schema = json.loads(files["nextflow_schema.json"][0])
+        assert "genome" not in schema["definitions"]["reference_genome_options"]["properties"]
+        nfcore_yml = yaml.safe_load(files[".nf-core.yml"][0])
+        assert "conf/igenomes.config" in nfcore_yml["lint"]["files_exist"]
+        assert nfcore_yml["template"] == yaml.safe_load(PIPELINE_TEMPLATE_YML_SKIP.read_text())
+
+        # The templates are compiled once per process
+        assert nf_core.create.template_environment() is nf_core.create.template_environment()
+        assert pipeline.render_files() == files
+
+        pipeline.init_pipeline()
+        for fn, (content, mode) in files.items():
+            assert (outdir / fn).read_bytes() == content
+            assert os.stat(outdir / fn).st_mode & 0o777 == mode
+
+    @with_temporary_folder
+    def test_check_samplesheet_streaming(self, tmp_path):
+        """The samplesheet checker writes valid rows as it reads them, and no output for invalid sheets"""
+        pipeline = nf_core.create.PipelineCreate(
+            name=self.pipeline_name,
+            description=self.pipeline_description,
+            author=self.pipeline_author,
+            version=self.pipeline_version,
+            no_git=True,
+            outdir=Path(tmp_path, "pipeline"),
+            plain=True,
+        )
+        pipeline.init_pipeline()
+        script = Path(pipeline.outdir, "bin", "check_samplesheet.py")
+        samplesheet = Path(tmp_path, "samplesheet.csv")
+        output = Path(tmp_path, "samplesheet.valid.csv")
+
+        samplesheet.write_text("sample,fastq_1,fastq_2\nA,a_1.fq.gz,a_2.fq.gz\nA,b_1.fq.gz,\nB,c.fastq.gz,\n")
+        subprocess.run([sys.executable, script, samplesheet, output], check=True)
+        assert output.read_text().splitlines() == [
+            "sample,single_end,fastq_1,fastq_2",
+            "A_T1,False,a_1.fq.gz,a_2.fq.gz",
+            "A_T2,True,b_1.fq.gz,",
+            "B_T1,True,c.fastq.gz,",
+        ]
+
+        samplesheet.write_text("sample,fastq_1,fastq_2\nA,a_1.fq.gz,a_2.fq.gz\nA,a_1.fq.gz,\n")
+        output.unlink()
+        proc = subprocess.run([sys.executable, script, samplesheet, output], capture_output=True, text=True)
+        assert proc.returncode == 1
+        assert "must be unique. On line 3." in proc.stderr
+        assert not output.exists()
@@ -1,24 +1,44 @@
 """Tests for the download subcommand of nf-core tools
 """
 
+import gzip
 import hashlib
+import io
+import json
 import os
 import re
 import shutil
+import tarfile
 import tempfile
+import textwrap
 import unittest
+import zipfile
 from pathlib import Path
 from unittest import mock
 
+import git
 import pytest
+import responses
 
 import nf_core.create
 import nf_core.utils
-from nf_core.download import ContainerError, DownloadWorkflow, WorkflowRepo
+from nf_core.download import (
+    ContainerError,
+    DownloadArchive,
+    DownloadWorkflow,
+    DownloadWorkflowBatch,
+    ParallelGzipWriter,
+    WorkflowRepo,
+)
 from nf_core.synced_repo import SyncedRepo
 from nf_core.utils import NFCORE_CACHE_DIR, NFCORE_DIR, nextflow_cmd
 
-from .utils import with_temporary_file, with_temporary_folder
+from .utils import (
+    mock_oci_registry_calls,
+    set_wd,
+    with_temporary_file,
+    with_temporary_folder,
+)
 
 
 class DownloadTest(unittest.TestCase):
@@ -237,6 +257,45 @@ class DownloadTest(unittest.TestCase):
             not in download_obj.containers
         )
 
+    def test_find_container_directives(self):
+        search_space = textwrap.dedent(
+            """
+            process FOO {
+                container "${ workflow.containerEngine == 'singularity' ?
+                    'https://depot.galaxyproject.org/singularity/foo:1.0--0' :
+                    'biocontainers/foo:1.0--0' }"
+                container_id = 'bar:1.0--0'
+                container ""
+                container 'unterminated
+            }
+            """
+        )
+        assert DownloadWorkflow.find_container_directives(search_space) == [
+            (
+                '"',
+                "${ workflow.containerEngine == 'singularity' ?\n"
+                "        'https://depot.galaxyproject.org/singularity/foo:1.0--0' :\n"
+                "        'biocontainers/foo:1.0--0' }",
+            )
+        ]
+
+    @with_temporary_folder
+    @mock.patch("nf_core.utils.fetch_wf_config")
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_find_container_images_modules_cached(self, tmp_path, _, mock_fetch_wf_config):
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_path)
+        mock_fetch_wf_config.return_value = {}
+        download_obj.find_container_images(Path(__file__).resolve().parent / "data/mock_module_containers")
+        containers = download_obj.containers
+        assert len(download_obj.module_findings_cache) == 7
+
+        # A second revision with identical modules is served from the cache
+        with mock.patch.object(download_obj, "rectify_raw_container_matches") as mock_rectify:
+            mock_rectify.return_value = []
+            download_obj.find_container_images(Path(__file__).resolve().parent / "data/mock_module_containers")
+            assert mock_rectify.call_count == 1  # only for the config findings
+        assert download_obj.containers == containers
+
     #
     # Tests for 'singularity_pull_image'
     #
@@ -370,13 +429,444 @@ class DownloadTest(unittest.TestCase):
 
         # test if the settings are changed to mandatory defaults, if an external cache index is used.
         assert download_obj.container_cache_utilisation == "remote" and download_obj.container_system == "singularity"
-        assert isinstance(download_obj.containers_remote, list) and len(download_obj.containers_remote) == 0
+        assert isinstance(download_obj.containers_remote, set) and len(download_obj.containers_remote) == 0
         # read in the file
         download_obj.read_remote_containers()
         assert len(download_obj.containers_remote) == 33
         assert "depot.galaxyproject.org-singularity-salmon-1.5.2--h84f40af_0.img" in download_obj.containers_remote
         assert "MV Rena" not in download_obj.containers_remote  # decoy in test file
 
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_remote_container_index_json(self, tmp_dir, _):
+        cachedir = os.path.join(tmp_dir, "cache")
+        os.makedirs(cachedir)
+        for image in ["same.img", "other-size.img", "other-digest.img", "bad-size.img"]:
+            with open(os.path.join(cachedir, image), "wb") as fh:
+                fh.write(b"image")
+        index = {
+            "containers": [
+                {
+                    "file": "/remote/cache/same.img",
+                    "size": 5,
+                    "digest": f"sha256:{hashlib.sha256(b'image').hexdigest()}",
+                },
+                {"file": "/remote/cache/other-size.img", "size": 1024},
+                {"file": "/remote/cache/other-digest.img", "digest": f"md5:{hashlib.md5(b'other').hexdigest()}"},
+                "/remote/cache/plain.img",
+                # Invalid sizes are ignored
+                {"file": "/remote/cache/bad-size.img", "size": "5 bytes"},
+            ]
+        }
+        index_path = os.path.join(tmp_dir, "index.json")
+        with open(index_path, "w") as fh:
+            json.dump(index, fh)
+
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=tmp_dir, container_cache_index=index_path)
+        download_obj.read_remote_containers()
+        assert download_obj.containers_remote == {
+            "same.img",
+            "other-size.img",
+            "other-digest.img",
+            "plain.img",
+            "bad-size.img",
+        }
+
+        def in_remote_cache(image):
+            return download_obj.singularity_image_in_remote_cache(
+                os.path.join(tmp_dir, "singularity-images", image), os.path.join(cachedir, image)
+            )
+
+        assert in_remote_cache("same.img")
+        assert not in_remote_cache("other-size.img")
+        assert not in_remote_cache("other-digest.img")
+        assert in_remote_cache("plain.img")
+        assert in_remote_cache("bad-size.img")
+        assert not in_remote_cache("missing.img")
+
+    #
+    # Tests for 'oci_pull_images'
+    #
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_get_singularity_images_oci(self, tmp_dir, _):
+        download_obj = DownloadWorkflow(
+            pipeline="dummy",
+            outdir=tmp_dir,
+            container_library=("localhost:5000", "quay.io"),
+            container_pull_method="oci",
+        )
+        download_obj.containers = ["biocontainers/fastqc:1.0", "quay.io/biocontainers/multiqc:1.0"]
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            mock_oci_registry_calls(rsps, "localhost:5000", "biocontainers/fastqc", "1.0", [b"base", b"fastqc"])
+            mock_oci_registry_calls(rsps, "quay.io", "biocontainers/multiqc", "1.0", [b"base", b"multiqc"])
+            with mock.patch("shutil.which", return_value=None):
+                download_obj.get_singularity_images()
+
+        with open(os.path.join(tmp_dir, "oci-images", "index.json")) as fh:
+            index = json.load(fh)
+        assert sorted(m["annotations"]["org.opencontainers.image.ref.name"] for m in index["manifests"]) == [
+            "localhost:5000/biocontainers/fastqc:1.0",
+            "quay.io/biocontainers/multiqc:1.0",
+        ]
+
+        # Pruning keeps the images still required and the blobs they use, e.g. the shared base layer
+        blobs_dir = os.path.join(tmp_dir, "oci-images", "blobs", "sha256")
+        assert len(os.listdir(blobs_dir)) == 6
+        download_obj.containers = ["biocontainers/fastqc:1.0"]
+        download_obj.prune_oci_images()
+        with open(os.path.join(tmp_dir, "oci-images", "index.json")) as fh:
+            index = json.load(fh)
+        assert [m["annotations"]["org.opencontainers.image.ref.name"] for m in index["manifests"]] == [
+            "localhost:5000/biocontainers/fastqc:1.0"
+        ]
+        config = json.dumps({"architecture": "amd64", "os": "linux"}).encode()
+        assert sorted(os.listdir(blobs_dir)) == sorted(
+            [hashlib.sha256(content).hexdigest() for content in [b"base", b"fastqc", config]]
+            + [index["manifests"][0]["digest"].split(":")[1]]
+        )
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_download_manifest_shared_oci_layout(self, tmp_dir, _):
+        """The manifest of a pipeline in a batch download points to the OCI image layout shared by all pipelines"""
+        download_obj = DownloadWorkflow(pipeline="nf-core/dummy", outdir=os.path.join(tmp_dir, "nf-core-dummy"))
+        download_obj.oci_layout_dir = os.path.join(tmp_dir, "oci-images")
+        download_obj.include_configs = False
+        download_obj.containers = ["biocontainers/fastqc:1.0"]
+        download_obj.oci_images = {
+            "biocontainers/fastqc:1.0": {
+                "digest": f"sha256:{'a' * 64}",
+                "annotations": {"org.opencontainers.image.ref.name": "quay.io/biocontainers/fastqc:1.0"},
+            }
+        }
+        os.makedirs(download_obj.outdir)
+        download_obj.write_download_manifest({})
+        with open(os.path.join(download_obj.outdir, "nf-core-download.json")) as fh:
+            manifest = json.load(fh)
+        assert manifest["containers"][0]["file"] == os.path.join("..", "oci-images", "index.json")
+
+    #
+    # Tests for 'compress_download'
+    #
+    def test_parallel_gzip_writer(self):
+        data = os.urandom(100000) + b"nf-core" * 50000
+        compressed = io.BytesIO()
+        writer = ParallelGzipWriter(compressed, threads=4, block_size=16384)
+        writer.write(data[:200000])
+        writer.set_level(0)  # store the remainder
+        writer.write(data[200000:])
+        writer.close()
+        assert gzip.decompress(compressed.getvalue()) == data
+
+    @with_temporary_folder
+    def test_download_archive(self, tmp_dir):
+        outdir = os.path.join(tmp_dir, "nf-core-dummy")
+        os.makedirs(os.path.join(outdir, "workflow"))
+        os.makedirs(os.path.join(outdir, "singularity-images"))
+        with open(os.path.join(outdir, "workflow", "main.nf"), "w") as fh:
+            fh.write("nextflow.enable.dsl = 2\n" * 100)
+        with open(os.path.join(outdir, "singularity-images", "dummy.img"), "wb") as fh:
+            fh.write(os.urandom(10000))
+
+        for compress_type in ["tar.gz", "tar.bz2", "zip"]:
+            archive_path = os.path.join(tmp_dir, f"nf-core-dummy.{compress_type}")
+            with DownloadArchive(archive_path, compress_type) as archive:
+                archive.add(outdir, arcname="nf-core-dummy")
+            # checksum is calculated while writing
+            assert archive.md5 == nf_core.utils.file_md5(archive_path)
+            if compress_type == "zip":
+                with zipfile.ZipFile(archive_path) as zip_file:
+                    assert zip_file.testzip() is None
+                    assert (
+                        zip_file.getinfo("nf-core-dummy/singularity-images/dummy.img").compress_type
+                        == zipfile.ZIP_STORED
+                    )
+                    assert zip_file.getinfo("nf-core-dummy/workflow/main.nf").compress_type == zipfile.ZIP_DEFLATED
+            else:
+                with tarfile.open(archive_path) as tar:
+                    assert "nf-core-dummy/workflow/main.nf" in tar.getnames()
+                    assert "nf-core-dummy/singularity-images/dummy.img" in tar.getnames()
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    def test_compress_download(self, tmp_dir, _):
+        outdir = os.path.join(tmp_dir, "nf-core-dummy")
+        os.makedirs(os.path.join(outdir, "workflow"))
+        with open(os.path.join(outdir, "workflow", "main.nf"), "w") as fh:
+            fh.write("nextflow.enable.dsl = 2\n")
+        download_obj = DownloadWorkflow(pipeline="dummy", outdir=outdir, compress_type="tar.gz")
+        download_obj.output_filename = f"{outdir}.tar.gz"
+        download_obj.compress_download()
+        assert not os.path.exists(outdir)
+        with tarfile.open(download_obj.output_filename) as tar:
+            assert tar.getnames() == ["nf-core-dummy", "nf-core-dummy/workflow", "nf-core-dummy/workflow/main.nf"]
+
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("nf_core.utils.fetch_wf_config")
+    @mock.patch("nf_core.download.DownloadWorkflow.download_wf_files")
+    def test_download_workflow_static_streams_into_archive(
+        self, tmp_dir, mock_download_wf_files, mock_fetch_wf_config, _
+    ):
+        outdir = os.path.join(tmp_dir, "nf-core-dummy")
+        cachedir = os.path.join(tmp_dir, "cache")
+        os.makedirs(cachedir)
+        with open(os.path.join(cachedir, "depot.galaxyproject.org-singularity-dummy-1.0.img"), "wb") as fh:
+            fh.write(os.urandom(1000))
+
+        def download_wf_files(revision, wf_sha, download_url):
+            os.makedirs(os.path.join(outdir, revision))
+            with open(os.path.join(outdir, revision, "main.nf"), "w") as fh:
+                fh.write("nextflow.enable.dsl = 2\n")
+            return revision
+
+        mock_download_wf_files.side_effect = download_wf_files
+        mock_fetch_wf_config.return_value = {
+            "process.container": "https://depot.galaxyproject.org/singularity/dummy:1.0",
+        }
+
+        with mock.patch.dict(os.environ, {"NXF_SINGULARITY_CACHEDIR": cachedir}):
+            download_obj = DownloadWorkflow(
+                pipeline="dummy",
+                revision=("1_0", "1_1"),
+                outdir=outdir,
+                compress_type="tar.gz",
+                container_system="singularity",
+                container_cache_utilisation="copy",
+            )
+            download_obj.include_configs = False
+            download_obj.output_filename = f"{outdir}.tar.gz"
+            download_obj.wf_sha = {"1_0": "abc", "1_1": "def"}
+            download_obj.wf_download_url = {"1_0": "https://dummy/abc.zip", "1_1": "https://dummy/def.zip"}
+            with mock.patch.object(
+                download_obj, "get_singularity_images", wraps=download_obj.get_singularity_images
+            ) as mock_get_singularity_images:
+                download_obj.download_workflow_static()
+
+        # the configs of both revisions are evaluated, but the images of all revisions are fetched in one pass
+        assert mock_fetch_wf_config.call_count == 2
+        mock_get_singularity_images.assert_called_once_with(current_revision="1_0, 1_1")
+        assert download_obj.containers == ["https://depot.galaxyproject.org/singularity/dummy:1.0"]
+
+        assert not os.path.exists(outdir)
+        # the image is read from the cache and not deleted there
+        assert os.path.exists(os.path.join(cachedir, "depot.galaxyproject.org-singularity-dummy-1.0.img"))
+        with tarfile.open(download_obj.output_filename) as tar:
+            names = tar.getnames()
+        assert names.count("nf-core-dummy") == 1
+        assert "nf-core-dummy/1_0/main.nf" in names and "nf-core-dummy/1_1/main.nf" in names
+        # the image is archived only once, although both revisions require it
+        assert names.count("nf-core-dummy/singularity-images/depot.galaxyproject.org-singularity-dummy-1.0.img") == 1
+
+    #
+    # Tests for the download manifest and '--update'
+    #
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("nf_core.utils.fetch_wf_config")
+    @mock.patch("nf_core.download.DownloadWorkflow.download_wf_files")
+    def test_download_workflow_static_update(self, tmp_dir, mock_download_wf_files, mock_fetch_wf_config, _):
+        outdir = os.path.join(tmp_dir, "nf-core-dummy")
+        cachedir = os.path.join(tmp_dir, "cache")
+        os.makedirs(cachedir)
+        for tool in ["old", "new"]:
+            with open(os.path.join(cachedir, f"depot.galaxyproject.org-singularity-{tool}-1.0.img"), "wb") as fh:
+                fh.write(tool.encode())
+
+        def download_wf_files(revision, wf_sha, download_url):
+            os.makedirs(os.path.join(outdir, revision))
+            return revision
+
+        mock_download_wf_files.side_effect = download_wf_files
+        mock_fetch_wf_config.side_effect = lambda wf_path: {
+            "process.container": f"https://depot.galaxyproject.org/singularity/{'old' if wf_path.endswith('1_0') else 'new'}:1.0"
+        }
+
+        def download(revisions, update=False):
+            download_obj = DownloadWorkflow(
+                pipeline="nf-core/dummy",
+                revision=revisions,
+                outdir=outdir,
+                container_system="singularity",
+                container_cache_utilisation="copy",
+                update=update,
+            )
+            download_obj.include_configs = False
+            download_obj.wf_sha = {revision: {"1_0": "abc", "1_1": "def"}[revision] for revision in revisions}
+            download_obj.wf_download_url = {revision: "https://dummy.zip" for revision in download_obj.revision}
+            if update:
+                download_obj.read_download_manifest()
+            download_obj.download_workflow_static()
+            with open(os.path.join(outdir, "nf-core-download.json")) as fh:
+                return json.load(fh)
+
+        with mock.patch.dict(os.environ, {"NXF_SINGULARITY_CACHEDIR": cachedir}):
+            manifest = download(("1_0",))
+            assert manifest["revisions"] == {
+                "1_0": {
+                    "sha": "abc",
+                    "directory": "1_0",
+                    "containers": ["https://depot.galaxyproject.org/singularity/old:1.0"],
+                }
+            }
+            assert manifest["containers"] == [
+                {
+                    "container": "https://depot.galaxyproject.org/singularity/old:1.0",
+                    "file": os.path.join("singularity-images", "depot.galaxyproject.org-singularity-old-1.0.img"),
+                    "size": 3,
+                    "digest": f"sha256:{hashlib.sha256(b'old').hexdigest()}",
+                }
+            ]
+
+            # Only the new revision is downloaded and scanned, the image of the deleted revision is pruned
+            mock_download_wf_files.reset_mock()
+            mock_fetch_wf_config.reset_mock()
+            manifest = download(("1_1",), update=True)
+            assert [call.kwargs["revision"] for call in mock_download_wf_files.call_args_list] == ["1_1"]
+            assert list(manifest["revisions"]) == ["1_0", "1_1"]
+            assert len(manifest["containers"]) == 2
+
+            shutil.rmtree(os.path.join(outdir, "1_0"))
+            manifest = download(("1_1",), update=True)
+            assert mock_fetch_wf_config.call_count == 1
+            assert list(manifest["revisions"]) == ["1_1"]
+            assert os.listdir(os.path.join(outdir, "singularity-images")) == [
+                "depot.galaxyproject.org-singularity-new-1.0.img"
+            ]
+
+            # The manifest can be used as index of a remote cache
+            download_obj = DownloadWorkflow(
+                pipeline="nf-core/dummy",
+                outdir=tmp_dir,
+                container_cache_index=os.path.join(outdir, "nf-core-download.json"),
+            )
+            download_obj.read_remote_containers()
+            assert download_obj.containers_remote == {"depot.galaxyproject.org-singularity-new-1.0.img"}
+
+    #
+    # Tests for 'DownloadWorkflowBatch'
+    #
+    @with_temporary_folder
+    @mock.patch("nf_core.list.Workflows.get_remote_workflows")
+    @mock.patch("nf_core.utils.get_repo_releases_branches")
+    @mock.patch("nf_core.utils.fetch_wf_config")
+    def test_download_workflow_batch(
+        self, tmp_dir, mock_fetch_wf_config, mock_releases_branches, mock_remote_workflows
+    ):
+        outdir = os.path.join(tmp_dir, "mirror")
+        cachedir = os.path.join(tmp_dir, "cache")
+        os.makedirs(cachedir)
+        for tool in ["shared", "rnaseq", "sarek"]:
+            with open(os.path.join(cachedir, f"depot.galaxyproject.org-singularity-{tool}-1.0.img"), "wb") as fh:
+                fh.write(tool.encode())
+        pipelines_file = os.path.join(tmp_dir, "pipelines.txt")
+        with open(pipelines_file, "w") as fh:
+            fh.write("# pipelines mirrored for the cluster\nrnaseq 3.12.0 3.13.0\n\nnf-core/sarek\n")
+
+        def download_wf_files(self, revision, wf_sha, download_url):
+            os.makedirs(os.path.join(self.outdir, revision))
+            return revision
+
+        mock_releases_branches.side_effect = lambda pipeline, wfs: (
+            f"nf-core/{pipeline.split('/')[-1]}",
+            [{"tag_name": "3.13.0", "tag_sha": "def"}, {"tag_name": "3.12.0", "tag_sha": "abc"}],
+            {},
+        )
+        mock_fetch_wf_config.side_effect = lambda wf_path: {
+            "process.container": "https://depot.galaxyproject.org/singularity/shared:1.0",
+            "process.tool.container": f"https://depot.galaxyproject.org/singularity/{wf_path.split(os.sep)[-2].split('-')[-1]}:1.0",
+        }
+
+        with mock.patch.dict(os.environ, {"NXF_SINGULARITY_CACHEDIR": cachedir}):
+            with mock.patch.object(DownloadWorkflow, "download_wf_files", autospec=True) as mock_download_wf_files:
+                mock_download_wf_files.side_effect = download_wf_files
+                batch = DownloadWorkflowBatch(
+                    pipelines_file=pipelines_file,
+                    outdir=outdir,
+                    container_system="singularity",
+                    container_cache_utilisation="copy",
+                )
+                with mock.patch.object(
+                    batch.shared, "get_singularity_images", wraps=batch.shared.get_singularity_images
+                ) as mock_get_singularity_images:
+                    batch.download_workflows()
+
+        # The remote workflows are fetched once, the union of all containers is retrieved in a single pass
+        assert mock_remote_workflows.call_count == 1
+        mock_get_singularity_images.assert_called_once()
+        assert len(batch.shared.containers) == 3
+
+        # Every pipeline is self-contained, sarek defaults to its latest release
+        assert sorted(os.listdir(outdir)) == ["nf-core-rnaseq", "nf-core-sarek"]
+        assert sorted(os.listdir(os.path.join(outdir, "nf-core-sarek"))) == [
+            "3.13.0",
+            "nf-core-download.json",
+            "singularity-images",
+        ]
+        assert sorted(os.listdir(os.path.join(outdir, "nf-core-rnaseq", "singularity-images"))) == [
+            "depot.galaxyproject.org-singularity-rnaseq-1.0.img",
+            "depot.galaxyproject.org-singularity-shared-1.0.img",
+        ]
+        with open(os.path.join(outdir, "nf-core-rnaseq", "nf-core-download.json")) as fh:
+            manifest = json.load(fh)
+        assert list(manifest["revisions"]) == ["3.12.0", "3.13.0"]
+        assert {entry["digest"] for entry in manifest["containers"]} == {
+            f"sha256:{hashlib.sha256(tool).hexdigest()}" for tool in [b"shared", b"rnaseq"]
+        }
+
+    #
+    # Tests for 'WorkflowRepo'
+    #
+    @with_temporary_folder
+    def test_workflow_repo_bare_clone(self, tmp_dir):
+        # A pipeline repository with many releases, of which only two are selected
+        remote_dir = os.path.join(tmp_dir, "remote", "nf-core", "dummy")
+        remote = git.Repo.init(remote_dir)
+        with remote.config_writer() as config:
+            config.set_value("user", "name", "nf-core")
+            config.set_value("user", "email", "core@nf-co.re")
+        for version in range(1, 21):
+            with open(os.path.join(remote_dir, "main.nf"), "w") as fh:
+                fh.write(f"// version 1.{version}\n")
+            remote.index.add(["main.nf"])
+            commit = remote.index.commit(f"Release 1.{version}")
+            remote.create_tag(f"1.{version}", message=f"Release 1.{version}")
+            if version == 5:
+                remote.create_head("dev", commit)
+        remote.create_head("unrelated", remote.heads[0].commit)
+
+        with set_wd(tmp_dir):
+            workflow_repo = WorkflowRepo(
+                remote_url=os.path.join("remote", "nf-core", "dummy"),
+                revision=["1.3", "1.10"],
+                commit=None,
+                location=os.path.join(tmp_dir, "cache"),
+                in_cache=False,
+            )
+        workflow_repo.tidy_tags_and_branches()
+        workflow_repo.bare_clone(os.path.join(tmp_dir, "nf-core-dummy.git"))
+
+        # the cached repository is left intact
+        assert len(workflow_repo.repo.tags) == 20
+        assert {tag.name for tag in workflow_repo.tags} == {"1.3", "1.10"}
+        assert {head.name for head in workflow_repo.heads} == {"latest"}
+
+        bare_repo = git.Repo(os.path.join(tmp_dir, "nf-core-dummy.git"))
+        assert bare_repo.bare
+        assert bare_repo.head.reference.name == "latest"
+        # the latest version is determined semantically
+        assert bare_repo.heads.latest.commit == bare_repo.tags["1.10"].commit
+        # history beyond the selected revisions is not included
+        assert "Release 1.11" not in bare_repo.git.log("--all", "--format=%s")
+
+        # with a branch among the selected revisions, no "latest" branch is created
+        workflow_repo.revision = ["1.3", "dev"]
+        workflow_repo.tidy_tags_and_branches()
+        workflow_repo.bare_clone(os.path.join(tmp_dir, "nf-core-dummy.git"))
+        assert {tag.name for tag in workflow_repo.tags} == {"1.3"}
+        assert {head.name for head in workflow_repo.heads} == {"dev"}
+
     #
     # Tests for the main entry method 'download_workflow'
     #
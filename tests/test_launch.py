@@ -7,6 +7,7 @@ import tempfile
 import unittest
 from unittest import mock
 
+import git
 import pytest
 
 import nf_core.create
@@ -341,3 +342,91 @@ class TestLaunch(unittest.TestCase):
         self.launcher.schema_obj.input_params.update({"input": "custom_input"})
         self.launcher.build_command()
         assert self.launcher.nextflow_cmd == f'nextflow run {self.template_dir} --input "custom_input"'
+
+    @with_temporary_folder
+    @mock.patch("subprocess.call")
+    def test_launch_no_prompts_dry_run(self, tmp_path, mock_call):
+        """Test building the command from a params file, without prompts or running Nextflow"""
+        test_pipeline_dir = os.path.join(tmp_path, "wf")
+        nf_core.create.PipelineCreate(
+            "testpipeline", "", "", outdir=test_pipeline_dir, no_git=True, plain=True
+        ).init_pipeline()
+        params_in = os.path.join(tmp_path, "params.json")
+        with open(params_in, "w") as fh:
+            json.dump({"input": "samplesheet.csv", "outdir": "results"}, fh)
+        launcher = nf_core.launch.Launch(
+            test_pipeline_dir, params_in=params_in, params_out=self.nf_params_fn, no_prompts=True, dry_run=True
+        )
+        assert launcher.launch_pipeline() is True
+        assert (
+            launcher.nextflow_cmd
+            == f'nextflow run {test_pipeline_dir} -params-file "{os.path.relpath(self.nf_params_fn)}"'
+        )
+        with open(self.nf_params_fn) as fh:
+            assert json.load(fh) == {"input": "samplesheet.csv", "outdir": "results"}
+        mock_call.assert_not_called()
+
+    @with_temporary_folder
+    def test_launch_no_prompts_remote_cached(self, tmp_path):
+        """Test that the schema of a remote pipeline release is only resolved once"""
+        test_pipeline_dir = os.path.join(tmp_path, "wf")
+        nf_core.create.PipelineCreate("testpipeline", "", "", outdir=test_pipeline_dir, plain=True).init_pipeline()
+        repo = git.Repo(test_pipeline_dir)
+        repo.create_tag("1.0.0")
+        cache_dir = os.path.join(tmp_path, "cache")
+        with mock.patch("nf_core.launch.LAUNCH_SCHEMA_CACHE_DIR", cache_dir), mock.patch.dict(
+            nf_core.launch._launch_schema_cache, clear=True
+        ):
+            with mock.patch("nf_core.list.get_local_wf", return_value=test_pipeline_dir) as mock_get_local_wf:
+                schema_obj = nf_core.launch.get_launch_schema("nf-core/testpipeline", "1.0.0")
+                mock_get_local_wf.assert_called_once_with("nf-core/testpipeline", revision="1.0.0")
+            assert schema_obj.schema_defaults["validate_params"] is True
+
+            # Later launches of the release use the cached schema, also from a new process
+            nf_core.launch._launch_schema_cache.clear()
+            with mock.patch("nf_core.list.get_local_wf", side_effect=AssertionError) as mock_get_local_wf:
+                launcher = nf_core.launch.Launch(
+                    "testpipeline", "1.0.0", command_only=True, no_prompts=True, dry_run=True
+                )
+                # input and outdir are required
+                assert launcher.build_launch() is False
+                assert launcher.nextflow_cmd == "nextflow run nf-core/testpipeline -r 1.0.0"
+                mock_get_local_wf.assert_not_called()
+            assert launcher.schema_obj.schema == schema_obj.schema
+
+            # A revision is needed for remote pipelines
+            assert nf_core.launch.Launch("testpipeline", no_prompts=True).build_launch() is False
+
+    @with_temporary_folder
+    def test_launch_no_prompts_remote_branch(self, tmp_path):
+        """Test that the schema of a remote pipeline branch follows the commit of the branch"""
+        test_pipeline_dir = os.path.join(tmp_path, "wf")
+        nf_core.create.PipelineCreate("testpipeline", "", "", outdir=test_pipeline_dir, plain=True).init_pipeline()
+        cache_dir = os.path.join(tmp_path, "cache")
+        with mock.patch("nf_core.launch.LAUNCH_SCHEMA_CACHE_DIR", cache_dir), mock.patch.dict(
+            nf_core.launch._launch_schema_cache, clear=True
+        ), mock.patch("nf_core.list.get_local_wf", return_value=test_pipeline_dir) as mock_get_local_wf:
+            schema_obj = nf_core.launch.get_launch_schema("nf-core/testpipeline", "dev")
+            assert schema_obj.schema_defaults["max_cpus"] == 16
+
+            # The schema is cached for the commit of the branch
+            with mock.patch.object(nf_core.launch, "read_launch_schema") as mock_read_launch_schema:
+                assert nf_core.launch.get_launch_schema("nf-core/testpipeline", "dev").schema == schema_obj.schema
+                mock_read_launch_schema.assert_not_called()
+            assert mock_get_local_wf.call_count == 2
+
+            # A new commit on the branch gives a new schema
+            schema_fn = os.path.join(test_pipeline_dir, "nextflow_schema.json")
+            with open(schema_fn) as fh:
+                schema = json.load(fh)
+            schema["definitions"]["max_job_request_options"]["properties"]["max_cpus"]["default"] = 4
+            with open(schema_fn, "w") as fh:
+                json.dump(schema, fh, indent=4)
+            with open(os.path.join(test_pipeline_dir, "nextflow.config")) as fh:
+                config = fh.read()
+            with open(os.path.join(test_pipeline_dir, "nextflow.config"), "w") as fh:
+                fh.write(config.replace("max_cpus                   = 16", "max_cpus                   = 4"))
+            repo = git.Repo(test_pipeline_dir)
+            repo.index.add(["nextflow_schema.json", "nextflow.config"])
+            repo.index.commit("Change max_cpus")
+            assert nf_core.launch.get_launch_schema("nf-core/testpipeline", "dev").schema_defaults["max_cpus"] == 4
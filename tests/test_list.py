@@ -10,7 +10,9 @@ from datetime import datetime
 from pathlib import Path
 from unittest import mock
 
+import git
 import pytest
+import responses
 from rich.console import Console
 
 import nf_core.list
@@ -141,6 +143,111 @@ class TestList(unittest.TestCase):
         mock_stat.st_mode = 1
         local_wf.get_local_nf_workflow_details()
 
+    def test_local_workflow_details_cache(self):
+        """Inspect a pulled workflow, then reuse the details while its git repository doesn't change"""
+        with tempfile.TemporaryDirectory() as assets_dir:
+            repo = git.Repo.init(os.path.join(assets_dir, "nf-core", "dummy"))
+            with repo.config_writer() as config:
+                config.set_value("user", "name", "nf-core")
+                config.set_value("user", "email", "core@nf-co.re")
+            repo.index.commit("Initial commit")
+            repo.create_remote("origin", "https://github.com/nf-core/dummy.git")
+            repo.create_tag("1.0")
+            repo.index.commit("Release 1.1")
+            repo.create_tag("1.1", message="Annotated release tag")
+            Path(repo.git_dir, "FETCH_HEAD").touch()
+
+            details_cache = {}
+            with mock.patch.dict(os.environ, {"NXF_ASSETS": assets_dir}):
+                local_wf = nf_core.list.LocalWorkflow("nf-core/dummy")
+                local_wf.get_local_nf_workflow_details(details_cache)
+                assert local_wf.commit_sha == repo.head.commit.hexsha
+                assert local_wf.active_tag == "1.1"
+                assert local_wf.remote_url == "https://github.com/nf-core/dummy.git"
+
+                with mock.patch("git.Repo") as mock_repo:
+                    cached_wf = nf_core.list.LocalWorkflow("nf-core/dummy")
+                    cached_wf.get_local_nf_workflow_details(details_cache)
+                    mock_repo.assert_not_called()
+                assert cached_wf.commit_sha == local_wf.commit_sha
+                assert cached_wf.active_tag == "1.1"
+
+                # A checkout changes HEAD, so the repository is inspected again
+                repo.git.checkout("1.0")
+                changed_wf = nf_core.list.LocalWorkflow("nf-core/dummy")
+                changed_wf.get_local_nf_workflow_details(details_cache)
+                assert changed_wf.active_tag == "1.0"
+                assert details_cache["nf-core/dummy"]["active_tag"] == "1.0"
+
+    @responses.activate
+    def test_pipeline_catalogue_refresh(self):
+        """Download the pipelines catalogue, then only revalidate it"""
+        remote_workflows = [
+            {"name": "rnaseq", "full_name": "nf-core/rnaseq", "description": "RNA sequencing", "topics": ["rna-seq"]}
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            catalogue_path = os.path.join(tmp_dir, "pipelines.json")
+            responses.get(
+                nf_core.list.PIPELINES_CATALOGUE_URL,
+                json={"remote_workflows": remote_workflows},
+                headers={"ETag": '"abc"'},
+            )
+            catalogue = nf_core.list.PipelineCatalogue(catalogue_path)
+            catalogue.refresh()
+            assert catalogue.remote_workflows == remote_workflows
+            assert catalogue.keyword_index["sequencing"] == ["nf-core/rnaseq"]
+
+            # A recent local copy is used without checking nf-co.re
+            catalogue = nf_core.list.PipelineCatalogue(catalogue_path)
+            catalogue.refresh()
+            assert len(responses.calls) == 1
+
+            # An older local copy is revalidated
+            responses.replace(
+                responses.GET,
+                nf_core.list.PIPELINES_CATALOGUE_URL,
+                status=304,
+                match=[responses.matchers.header_matcher({"If-None-Match": '"abc"'})],
+            )
+            catalogue.fetched_at = 0
+            catalogue.save()
+            catalogue = nf_core.list.PipelineCatalogue(catalogue_path)
+            catalogue.refresh()
+            assert len(responses.calls) == 2
+            assert catalogue.remote_workflows == remote_workflows
+
+            # Offline, nf-co.re is not checked at all
+            catalogue.fetched_at = 0
+            catalogue.save()
+            catalogue = nf_core.list.PipelineCatalogue(catalogue_path)
+            catalogue.refresh(offline=True)
+            assert len(responses.calls) == 2
+            assert catalogue.remote_workflows == remote_workflows
+
+    def test_pipeline_catalogue_offline_missing(self):
+        """Using the catalogue offline needs a local copy"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            catalogue = nf_core.list.PipelineCatalogue(os.path.join(tmp_dir, "pipelines.json"))
+            with pytest.raises(AssertionError, match="No local copy"):
+                catalogue.refresh(offline=True)
+
+    def test_worflow_filter_keyword_index(self):
+        """Filtering with the keyword index finds the same pipelines as searching the texts"""
+        remote_workflows = [
+            {"name": "rnaseq", "full_name": "nf-core/rnaseq", "description": "RNA-seq analysis", "topics": ["rna"]},
+            {"name": "sarek", "full_name": "nf-core/sarek", "description": "Variant calling", "topics": ["variants"]},
+            {"name": "scrnaseq", "full_name": "nf-core/scrnaseq", "description": "Single cell RNA", "topics": []},
+        ]
+        for keywords in [["rna"], ["rna", "seq"], ["calling"], ["RNA", "cell"], ["RNA-seq"], ["missing"]]:
+            indexed = nf_core.list.Workflows(keywords)
+            unindexed = nf_core.list.Workflows(keywords)
+            for wfs in [indexed, unindexed]:
+                wfs.remote_workflows = [nf_core.list.RemoteWorkflow(wf) for wf in remote_workflows]
+            indexed.keyword_index = nf_core.list.PipelineCatalogue.build_keyword_index(remote_workflows)
+            assert [wf.full_name for wf in indexed.filtered_workflows()] == [
+                wf.full_name for wf in unindexed.filtered_workflows()
+            ]
+
     def test_worflow_filter(self):
         workflows_obj = nf_core.list.Workflows(["rna", "myWF"])
 
@@ -0,0 +1,157 @@
+"""Tests for the native evaluation of Nextflow configuration files."""
+
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import nf_core.nextflow_config
+import nf_core.utils
+
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+NEXTFLOW_CONFIG = """
+params {
+    outdir = null
+    multiqc_title = null
+    publish_dir_mode = 'copy'
+    max_memory = '128.GB'
+    igenomes_ignore = false
+    custom_config_base = "https://raw.githubusercontent.com/nf-core/configs/master"
+}
+
+includeConfig 'conf/base.config'
+
+try {
+    includeConfig "${params.custom_config_base}/nfcore_custom.config"
+} catch (Exception e) {
+    System.err.println("WARNING: Could not load nf-core/config profiles")
+}
+
+profiles {
+    standard { docker.enabled = false }
+    docker {
+        docker.enabled = true
+        docker.userEmulation = true
+    }
+}
+
+if (!params.igenomes_ignore) {
+    params.genomes = [ GRCh38: [ fasta: "${projectDir}/genome.fa" ] ]
+} else {
+    params.genomes = [:]
+}
+
+process.shell = ['/bin/bash', '-euo', 'pipefail']
+
+def trace_timestamp = new java.util.Date().format( 'yyyy-MM-dd_HH-mm-ss')
+timeline {
+    enabled = true
+    file    = "${params.outdir}/pipeline_info/execution_timeline_${trace_timestamp}.html"
+}
+
+manifest {
+    name            = 'nf-core/testpipeline'
+    description     = \"\"\"A test pipeline\"\"\"
+    version         = '1.0dev'
+}
+
+def check_max(obj, type) {
+    if (type == 'memory') {
+        return obj
+    }
+}
+"""
+
+BASE_CONFIG = """
+process {
+    cpus   = { check_max( 1    * task.attempt, 'cpus'   ) }
+    memory = 6.GB
+    time   = 4.h
+    withLabel:process_low {
+        cpus = 2
+    }
+    withName: 'MULTIQC' {
+        ext.args   = params.multiqc_title ? "--title \\"$params.multiqc_title\\"" : ''
+        ext.prefix = params.publish_dir_mode == 'copy' ? 'copied' : params.undefined
+        publishDir = [ path: { "${params.outdir}/multiqc" }, mode: params.publish_dir_mode ]
+    }
+}
+"""
+
+
+@pytest.fixture
+def pipeline_dir(tmp_path):
+    (tmp_path / "conf").mkdir()
+    (tmp_path / "nextflow.config").write_text(NEXTFLOW_CONFIG)
+    (tmp_path / "conf" / "base.config").write_text(BASE_CONFIG)
+    (tmp_path / "main.nf").write_text("params.input = null\n")
+    return tmp_path
+
+
+def test_evaluate_config(pipeline_dir):
+    config = dict(nf_core.nextflow_config.evaluate_config(pipeline_dir))
+    assert config["params.outdir"] == "null"
+    assert config["params.publish_dir_mode"] == "'copy'"
+    assert config["params.genomes"] == f"[GRCh38:[fasta:'{pipeline_dir}/genome.fa']]"
+    assert config["process.cpus"] == "{ check_max( 1    * task.attempt, 'cpus'   ) }"
+    assert config["process.memory"] == "'6 GB'"
+    assert config["process.time"] == "'4h'"
+    assert config["process.'withLabel:process_low'.cpus"] == "2"
+    assert config["process.'withName:MULTIQC'.ext.args"] == "''"
+    assert config["process.'withName:MULTIQC'.ext.prefix"] == "'copied'"
+    assert config["process.'withName:MULTIQC'.publishDir"] == "[path:{ \"${params.outdir}/multiqc\" }, mode:'copy']"
+    assert config["process.shell"] == "['/bin/bash', '-euo', 'pipefail']"
+    assert config["timeline.file"].startswith("'null/pipeline_info/execution_timeline_20")
+    assert config["manifest.description"] == "'A test pipeline'"
+    # Only the standard profile is applied
+    assert config["docker.enabled"] == "false"
+    assert "docker.userEmulation" not in config
+
+
+def test_evaluate_config_profiles(pipeline_dir):
+    config = dict(nf_core.nextflow_config.evaluate_config(pipeline_dir, profiles=["docker"]))
+    assert config["docker.enabled"] == "true"
+    assert config["docker.userEmulation"] == "true"
+
+
+def test_evaluate_config_mock_containers():
+    config = dict(nf_core.nextflow_config.evaluate_config(TEST_DATA_DIR / "mock_config_containers"))
+    assert config["params.container"] == "'nfcore/methylseq:1.0'"
+    assert config["process.container"] == "'nfcore/methylseq:1.4'"
+    assert config["process.'withName:RMARKDOWNNOTEBOOK'.container"].startswith('{ "${ workflow.containerEngine')
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        "includeConfig 'https://example.com/custom.config'",
+        "params.foo = params.undefined",
+        "params.foo = file('samplesheet.csv')",
+        "process { executor = 'slurm' ; queue = { task.time <= 1.h ? 'short' : 'long' } }\nfoo.bar 'baz'",
+    ],
+)
+def test_evaluate_config_unsupported(tmp_path, config):
+    (tmp_path / "nextflow.config").write_text(config)
+    with pytest.raises(nf_core.nextflow_config.UnsupportedConfigError):
+        nf_core.nextflow_config.evaluate_config(tmp_path)
+
+
+@mock.patch("nf_core.utils.nextflow_cmd")
+def test_fetch_wf_config_native(mock_nextflow_cmd, pipeline_dir, monkeypatch):
+    monkeypatch.setenv("NFCORE_NATIVE_CONFIG", "1")
+    config = nf_core.utils.fetch_wf_config(pipeline_dir, cache_config=False)
+    mock_nextflow_cmd.assert_not_called()
+    assert config["params.publish_dir_mode"] == "copy"
+    assert config["manifest.name"] == "nf-core/testpipeline"
+    assert config["params.input"] == "null"
+
+
+@mock.patch("nf_core.utils.nextflow_cmd")
+def test_fetch_wf_config_native_fallback(mock_nextflow_cmd, tmp_path, monkeypatch):
+    monkeypatch.setenv("NFCORE_NATIVE_CONFIG", "1")
+    (tmp_path / "nextflow.config").write_text("params.input = file('samplesheet.csv')\n")
+    mock_nextflow_cmd.return_value = b"params.input = '/data/samplesheet.csv'\n"
+    config = nf_core.utils.fetch_wf_config(tmp_path, cache_config=False)
+    mock_nextflow_cmd.assert_called_once_with(f"nextflow config -flat {tmp_path}")
+    assert config == {"params.input": "/data/samplesheet.csv"}
@@ -0,0 +1,69 @@
+"""Tests for the long-lived Nextflow config daemon."""
+
+import stat
+import sys
+from unittest import mock
+
+import pytest
+
+import nf_core.nextflow_daemon
+import nf_core.utils
+
+# Stands in for `nextflow run config_daemon.nf`, answering with the configured base directory
+FAKE_NEXTFLOW = f"""#!{sys.executable}
+import json
+import sys
+
+print("N E X T F L O W  ~  version 23.04.0", flush=True)
+print("NFCORE_CONFIG_DAEMON " + json.dumps({{"status": "ready"}}), flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    if request["path"].endswith("broken"):
+        response = {{"status": "error", "message": "Unknown config attribute"}}
+    else:
+        config = f"params.outdir = '{{request['path']}}/results'\\nparams.profile = '{{request['profile']}}'\\n"
+        response = {{"status": "ok", "config": config}}
+    print("NFCORE_CONFIG_DAEMON " + json.dumps(response), flush=True)
+"""
+
+
+@pytest.fixture
+def fake_nextflow(tmp_path):
+    executable = tmp_path / "nextflow"
+    executable.write_text(FAKE_NEXTFLOW)
+    executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+    return str(executable)
+
+
+def test_flat_config(fake_nextflow, tmp_path):
+    with nf_core.nextflow_daemon.NextflowConfigDaemon(nextflow=fake_nextflow) as daemon:
+        process = daemon.process
+        assert daemon.flat_config(tmp_path / "pipeline_1") == (
+            f"params.outdir = '{tmp_path}/pipeline_1/results'\nparams.profile = 'None'\n".encode()
+        )
+        assert b"params.profile = 'test'" in daemon.flat_config(tmp_path / "pipeline_2", profile="test")
+        # All requests are answered by the same process
+        assert daemon.process is process
+        with pytest.raises(nf_core.nextflow_daemon.ConfigDaemonError, match="Unknown config attribute"):
+            daemon.flat_config(tmp_path / "broken")
+        assert daemon.process is process
+    assert daemon.process is None
+
+
+def test_start_failure(tmp_path):
+    daemon = nf_core.nextflow_daemon.NextflowConfigDaemon(nextflow=str(tmp_path / "missing"))
+    with pytest.raises(nf_core.nextflow_daemon.ConfigDaemonError):
+        daemon.flat_config(tmp_path)
+    assert daemon.failed
+    with pytest.raises(nf_core.nextflow_daemon.ConfigDaemonError, match="not available"):
+        daemon.flat_config(tmp_path)
+
+
+@mock.patch("nf_core.utils.nextflow_cmd")
+def test_fetch_wf_config_daemon(mock_nextflow_cmd, fake_nextflow, tmp_path):
+    (tmp_path / "nextflow.config").write_text("params.outdir = 'results'\n")
+    daemon = nf_core.nextflow_daemon.NextflowConfigDaemon(nextflow=fake_nextflow)
+    with mock.patch("nf_core.nextflow_daemon.get_shared_daemon", return_value=daemon), daemon:
+        config = nf_core.utils.fetch_wf_config(tmp_path, cache_config=False)
+    mock_nextflow_cmd.assert_not_called()
+    assert config["params.outdir"] == f"{tmp_path}/results"
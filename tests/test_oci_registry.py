@@ -0,0 +1,114 @@
+"""Tests for the native OCI registry client used by nf-core download
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import responses
+
+from nf_core.oci_registry import (
+    OCIRegistryClient,
+    OCIRegistryError,
+    parse_image_reference,
+    prune_layout,
+)
+
+from .utils import mock_oci_registry_calls, with_temporary_folder
+
+
+class OCIRegistryTest(unittest.TestCase):
+    def test_parse_image_reference(self):
+        assert parse_image_reference("quay.io/biocontainers/fastqc:0.11.9--0") == (
+            "quay.io",
+            "biocontainers/fastqc",
+            "0.11.9--0",
+        )
+        assert parse_image_reference("docker://ubuntu:20.04") == ("registry-1.docker.io", "library/ubuntu", "20.04")
+        assert parse_image_reference("nfcore/gatk", default_registry="quay.io") == ("quay.io", "nfcore/gatk", "latest")
+        assert parse_image_reference("localhost:5000/tools/samtools@sha256:abc") == (
+            "localhost:5000",
+            "tools/samtools",
+            "sha256:abc",
+        )
+
+    @with_temporary_folder
+    def test_pull_shared_layers(self, tmp_dir):
+        layout_dir = os.path.join(tmp_dir, "oci-images")
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            shared_digest = mock_oci_registry_calls(
+                rsps, "localhost:5000", "tools/fastqc", "1.0", [b"base", b"fastqc"]
+            )[0]
+            mock_oci_registry_calls(rsps, "localhost:5000", "tools/multiqc", "1.0", [b"base", b"multiqc"])
+
+            with OCIRegistryClient(layout_dir, max_workers=2) as client:
+                fastqc = client.pull("localhost:5000/tools/fastqc:1.0")
+                multiqc = client.pull("tools/multiqc:1.0", default_registry="localhost:5000")
+
+            # The shared base layer is only fetched once
+            blob_calls = [call.request.url for call in rsps.calls if call.request.url.endswith(shared_digest)]
+            assert len(blob_calls) == 1
+
+        with open(os.path.join(layout_dir, "oci-layout")) as fh:
+            assert json.load(fh) == {"imageLayoutVersion": "1.0.0"}
+        with open(os.path.join(layout_dir, "index.json")) as fh:
+            index = json.load(fh)
+        assert [m["annotations"]["org.opencontainers.image.ref.name"] for m in index["manifests"]] == [
+            "localhost:5000/tools/fastqc:1.0",
+            "localhost:5000/tools/multiqc:1.0",
+        ]
+        assert index["manifests"][0]["digest"] == fastqc["digest"]
+        # two manifests, the identical config and three distinct layers
+        assert len(os.listdir(os.path.join(layout_dir, "blobs", "sha256"))) == 2 + 1 + 3
+        assert OCIRegistryClient(layout_dir).image_size(multiqc) > len(b"basemultiqc")
+
+    @with_temporary_folder
+    def test_pull_digests(self, tmp_dir):
+        """Images pinned to different digests of one repository are kept apart"""
+        old_digest, new_digest = f"sha256:{'a' * 64}", f"sha256:{'b' * 64}"
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            mock_oci_registry_calls(rsps, "localhost:5000", "tools/fastqc", old_digest, [b"base", b"old"])
+            mock_oci_registry_calls(rsps, "localhost:5000", "tools/fastqc", new_digest, [b"base", b"new"])
+            with OCIRegistryClient(tmp_dir) as client:
+                client.pull(f"localhost:5000/tools/fastqc@{old_digest}")
+                client.pull(f"localhost:5000/tools/fastqc@{new_digest}")
+
+        with open(os.path.join(tmp_dir, "index.json")) as fh:
+            index = json.load(fh)
+        ref_names = [m["annotations"]["org.opencontainers.image.ref.name"] for m in index["manifests"]]
+        assert ref_names == [f"localhost:5000/tools/fastqc@{old_digest}", f"localhost:5000/tools/fastqc@{new_digest}"]
+        assert prune_layout(tmp_dir, set(ref_names)) == (0, 0)
+        # the manifest and the layer that only the old image uses are pruned
+        assert prune_layout(tmp_dir, {ref_names[1]}) == (1, 2)
+
+    @with_temporary_folder
+    def test_pull_token_authentication(self, tmp_dir):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            rsps.get(
+                "https://quay.io/v2/biocontainers/fastqc/manifests/0.11.9--0",
+                status=401,
+                headers={"WWW-Authenticate": 'Bearer realm="https://quay.io/v2/auth",service="quay.io"'},
+            )
+            rsps.get("https://quay.io/v2/auth", json={"token": "secret"}, status=200)
+            mock_oci_registry_calls(rsps, "quay.io", "biocontainers/fastqc", "0.11.9--0", [b"fastqc"])
+
+            with OCIRegistryClient(tmp_dir) as client:
+                client.pull("biocontainers/fastqc:0.11.9--0", default_registry="quay.io")
+
+            assert rsps.calls[1].request.params == {
+                "service": "quay.io",
+                "scope": "repository:biocontainers/fastqc:pull",
+            }
+            assert rsps.calls[2].request.headers["Authorization"] == "Bearer secret"
+
+    @with_temporary_folder
+    def test_pull_digest_mismatch(self, tmp_dir):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            digest = mock_oci_registry_calls(rsps, "localhost:5000", "tools/fastqc", "1.0", [b"fastqc"])[0]
+            rsps.replace(responses.GET, f"http://localhost:5000/v2/tools/fastqc/blobs/{digest}", body=b"corrupted")
+
+            with OCIRegistryClient(tmp_dir) as client:
+                with self.assertRaises(OCIRegistryError):
+                    client.pull("localhost:5000/tools/fastqc:1.0")
+            assert not os.path.exists(os.path.join(tmp_dir, "blobs", *digest.split(":")))
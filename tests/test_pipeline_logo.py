@@ -0,0 +1,66 @@
+"""Tests for fetching and caching pipeline logos."""
+
+from unittest import mock
+
+import pytest
+import responses
+
+import nf_core.pipeline_logo
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+@pytest.fixture
+def logo_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(nf_core.pipeline_logo, "LOGO_CACHE_DIR", str(tmp_path / "logos"))
+    monkeypatch.setattr(nf_core.pipeline_logo, "_website_unreachable", False)
+    return tmp_path / "logos"
+
+
+def logo_url(name, theme):
+    return nf_core.pipeline_logo.LOGO_URL.format(name=name, theme=theme)
+
+
+def test_logo_cache_dir_version():
+    """The cache is keyed by the logo version as well as the nf-core/tools version"""
+    cache_dir = nf_core.pipeline_logo.LOGO_CACHE_DIR
+    assert cache_dir.endswith(f"v{nf_core.pipeline_logo.LOGO_VERSION}-{nf_core.__version__}")
+
+
+@responses.activate
+def test_get_logo_cached(logo_cache):
+    """Logos are fetched once and then read from the cache"""
+    responses.get(logo_url("testpipeline", "dark"), body=PNG, status=200)
+    assert nf_core.pipeline_logo.get_logo("testpipeline", "dark") == PNG
+    assert (logo_cache / "testpipeline_dark.png").read_bytes() == PNG
+
+    assert nf_core.pipeline_logo.get_logo("testpipeline", "dark") == PNG
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+@mock.patch("time.sleep")
+def test_get_logo_retry(mock_sleep, logo_cache):
+    """Failed fetches and responses that are not images are retried"""
+    url = logo_url("testpipeline", "light")
+    responses.get(url, status=500)
+    responses.get(url, body=b"<html></html>", status=200)
+    responses.get(url, body=PNG, status=200)
+    assert nf_core.pipeline_logo.get_logo("testpipeline", "light") == PNG
+    assert mock_sleep.call_count == 2
+
+
+@responses.activate
+@mock.patch("time.sleep")
+def test_get_logo_offline(mock_sleep, logo_cache):
+    """Logos are skipped without waiting again once the website can't be reached"""
+    assert nf_core.pipeline_logo.get_logo("testpipeline", "light") is None
+    assert len(responses.calls) == nf_core.pipeline_logo.MAX_ATTEMPTS
+    assert nf_core.pipeline_logo.get_logo("testpipeline", "dark") is None
+    assert len(responses.calls) == nf_core.pipeline_logo.MAX_ATTEMPTS
+    assert not logo_cache.exists()
+
+
+def test_get_logo_unknown_theme():
+    with pytest.raises(ValueError):
+        nf_core.pipeline_logo.get_logo("testpipeline", "sepia")
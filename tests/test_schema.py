@@ -157,6 +157,42 @@ class TestSchema(unittest.TestCase):
         self.schema_obj.input_params = {"fubar": "input"}
         assert not self.schema_obj.validate_params()
 
+    def test_validate_params_all_errors(self):
+        """Check that all invalid parameters are reported, not just the first"""
+        self.schema_obj.schema_filename = self.template_schema
+        self.schema_obj.load_schema()
+        errors = self.schema_obj.get_validation_errors({"input": 1, "max_cpus": "many"})
+        messages = [error.message for error in errors]
+        assert "'outdir' is a required property" in messages
+        assert "1 is not of type 'string'" in messages
+        assert "'many' is not of type 'integer'" in messages
+        # Required params can be ignored
+        assert "'outdir' is a required property" not in [
+            error.message for error in self.schema_obj.get_validation_errors({}, required=False)
+        ]
+
+    def test_validate_default_params_invalid(self):
+        """Check that invalid defaults in the schema are reported"""
+        self.schema_obj.schema_filename = self.template_schema
+        self.schema_obj.load_schema()
+        self.schema_obj.schema_defaults = {"max_cpus": "many", "help": "yes"}
+        with pytest.raises(AssertionError) as exc_info:
+            self.schema_obj.validate_default_params()
+        assert "max_cpus: 'many' is not of type 'integer'" in exc_info.value.args[0]
+        assert "help: 'yes' is not of type 'boolean'" in exc_info.value.args[0]
+
+    def test_compile_validator_cached(self):
+        """Check that validators are compiled once per schema content"""
+        self.schema_obj.schema_filename = self.template_schema
+        self.schema_obj.load_schema()
+        validator = nf_core.schema.compile_validator(self.schema_obj.schema)
+        assert nf_core.schema.compile_validator(json.loads(json.dumps(self.schema_obj.schema))) is validator
+        assert nf_core.schema.compile_validator(self.schema_obj.schema, required=False) is not validator
+        # A changed schema gets a new validator
+        self.schema_obj.schema["required"] = ["fubar"]
+        assert nf_core.schema.compile_validator(self.schema_obj.schema) is not validator
+        assert "required" not in validator.schema or validator.schema["required"] != ["fubar"]
+
     def test_validate_schema_pass(self):
         """Check that the schema validation passes"""
         # Load the template schema
@@ -0,0 +1,100 @@
+"""Tests for validating many params files against one pipeline schema."""
+
+import io
+import json
+
+import pytest
+import yaml
+
+import nf_core.schema
+import nf_core.schema_batch
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema",
+    "type": "object",
+    "definitions": {
+        "input_output_options": {
+            "type": "object",
+            "required": ["input", "outdir"],
+            "properties": {
+                "input": {"type": "string", "pattern": "^\\S+\\.csv$"},
+                "outdir": {"type": "string"},
+                "max_cpus": {"type": "integer"},
+            },
+        }
+    },
+    "allOf": [{"$ref": "#/definitions/input_output_options"}],
+}
+
+
+@pytest.fixture
+def schema_obj():
+    schema_obj = nf_core.schema.PipelineSchema()
+    schema_obj.schema = SCHEMA
+    return schema_obj
+
+
+@pytest.fixture
+def params_files(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"params_{i}.{'json' if i % 2 else 'yaml'}"
+        params = {"input": f"samples_{i}.csv", "outdir": "results"}
+        if i == 3:
+            params = {"input": "samples.tsv", "max_cpus": "many"}
+        path.write_text(json.dumps(params) if i % 2 else yaml.dump(params))
+        paths.append(str(path))
+    broken = tmp_path / "broken.json"
+    broken.write_text("input: [")
+    paths.append(str(broken))
+    return paths
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_validate_files(schema_obj, params_files, processes):
+    """All files are validated, in order, with all errors of invalid files"""
+    results = list(nf_core.schema_batch.SchemaBatchValidator(schema_obj, processes).validate_files(params_files))
+    assert [result["file"] for result in results] == params_files
+    assert [result["valid"] for result in results] == [True, True, True, False, True, True, False]
+    assert results[3]["errors"] == [
+        {"param": None, "message": "'outdir' is a required property"},
+        {"param": "input", "message": "'samples.tsv' does not match '^\\\\S+\\\\.csv$'"},
+        {"param": "max_cpus", "message": "'many' is not of type 'integer'"},
+    ]
+    assert results[6]["errors"][0]["message"].startswith("Could not load params file")
+
+
+def test_write_report(schema_obj, params_files):
+    report = io.StringIO()
+    validator = nf_core.schema_batch.SchemaBatchValidator(schema_obj, 1)
+    assert validator.write_report(params_files, report) == (5, 2)
+    lines = report.getvalue().splitlines()
+    assert len(lines) == 7
+    assert json.loads(lines[0]) == {"file": params_files[0], "valid": True, "errors": []}
+
+
+def test_serve(schema_obj, params_files):
+    """Requests are answered line by line"""
+    requests = io.StringIO(
+        "\n".join(
+            [
+                params_files[0],
+                json.dumps({"id": 42, "params": {"input": "samples.csv"}}),
+                "",
+                "{not json",
+                json.dumps({"id": "no-params"}),
+            ]
+        )
+    )
+    responses = io.StringIO()
+    nf_core.schema_batch.SchemaBatchValidator(schema_obj).serve(requests, responses)
+    results = [json.loads(line) for line in responses.getvalue().splitlines()]
+    assert len(results) == 4
+    assert results[0]["file"] == params_files[0] and results[0]["valid"]
+    assert results[1] == {
+        "id": 42,
+        "valid": False,
+        "errors": [{"param": None, "message": "'outdir' is a required property"}],
+    }
+    assert results[2]["errors"][0]["message"].startswith("Could not parse request")
+    assert results[3]["id"] == "no-params" and not results[3]["valid"]
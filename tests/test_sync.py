@@ -423,3 +423,158 @@ class TestModules(unittest.TestCase):
         with pytest.raises(nf_core.sync.SyncException) as exc_info:
             psync.reset_target_dir()
         assert exc_info.value.args[0].startswith("Could not reset to original branch `fake_branch`")
+
+
+def test_get_gh_repo_from_remote(tmp_path):
+    """Get the GitHub repository name from the origin remote"""
+    repo = git.Repo.init(tmp_path)
+    psync = nf_core.sync.PipelineSync(tmp_path)
+    psync.repo = repo
+    assert psync.get_gh_repo_from_remote() is None
+    repo.create_remote("origin", "git@github.com:nf-core/testpipeline.git")
+    assert psync.get_gh_repo_from_remote() == "nf-core/testpipeline"
+    repo.remotes.origin.set_url("https://github.com/nf-core/testpipeline")
+    assert psync.get_gh_repo_from_remote() == "nf-core/testpipeline"
+
+
+def test_make_template_pipeline_cached(tmp_path):
+    """Pipelines with the same template parameters share one render of the template"""
+    template_cache = nf_core.sync.TemplateCache()
+    wf_config = {
+        "manifest.name": "'nf-core/testpipeline'",
+        "manifest.description": "'A test pipeline'",
+        "manifest.version": "'1.0dev'",
+        "manifest.author": "'tester'",
+    }
+
+    def render(outdir, **kwargs):
+        create_obj = mock.Mock()
+        create_obj.render_files.return_value = {"main.nf": (f"// {kwargs['name']}\n".encode(), 0o644)}
+        return create_obj
+
+    syncs = []
+    for name in ["first", "second"]:
+        (tmp_path / name).mkdir()
+        psync = nf_core.sync.PipelineSync(tmp_path / name, template_cache=template_cache)
+        psync.wf_config = wf_config
+        syncs.append(psync)
+    with mock.patch("nf_core.create.PipelineCreate", side_effect=render) as mock_create:
+        for psync in syncs:
+            psync.make_template_pipeline()
+    mock_create.assert_called_once()
+    for name in ["first", "second"]:
+        assert (tmp_path / name / "main.nf").read_text() == "// nf-core/testpipeline\n"
+
+
+@mock.patch("nf_core.sync.PipelineSync.sync", autospec=True)
+def test_sync_batch(mock_sync, tmp_path):
+    """Sync several pipelines, collecting the ones that failed"""
+    pipeline_dirs = []
+    for name in ["first", "second", "third"]:
+        (tmp_path / name).mkdir()
+        pipeline_dirs.append(str(tmp_path / name))
+
+    def sync(psync):
+        if psync.pipeline_dir == pipeline_dirs[1]:
+            raise nf_core.sync.SyncException("Broken pipeline")
+        psync.made_changes = True
+
+    mock_sync.side_effect = sync
+    batch = nf_core.sync.PipelineSyncBatch(pipeline_dirs, max_workers=2)
+    assert not batch.sync()
+    assert mock_sync.call_count == 3
+    assert list(batch.failed) == [pipeline_dirs[1]]
+    assert [psync.made_changes for psync in batch.syncs] == [True, False, True]
+    # All pipelines used the same template cache
+    assert len({id(psync.template_cache) for psync in batch.syncs}) == 1
+
+
+@mock.patch.dict(os.environ, {"GITHUB_AUTH_TOKEN": "token"})
+@mock.patch("nf_core.utils.gh_api.request_retry")
+def test_sync_batch_pull_requests(mock_request_retry, tmp_path):
+    """Pull-requests of a batch sync are made to the GitHub repository of the origin remote of each pipeline"""
+    pipeline_dirs = []
+    for name in ["first", "second", "detached"]:
+        repo = git.Repo.init(tmp_path / name)
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "nf-core")
+            config.set_value("user", "email", "core@nf-co.re")
+        repo.index.commit("Initial commit")
+        repo.create_remote("origin", f"git@github.com:nf-core/{name}.git")
+        pipeline_dirs.append(str(tmp_path / name))
+    # Other errors than sync errors are recorded too, here from the detached HEAD
+    repo.git.checkout("--detach")
+    mock_request_retry.return_value.json.return_value = {"html_url": "https://github.com/nf-core/pull/1"}
+
+    skipped_steps = [
+        "get_wf_config",
+        "checkout_template_branch",
+        "delete_template_branch_files",
+        "make_template_pipeline",
+        "push_template_branch",
+        "create_merge_base_branch",
+        "push_merge_branch",
+        "close_open_template_merge_prs",
+        "reset_target_dir",
+    ]
+    with mock.patch.multiple(nf_core.sync.PipelineSync, **{step: mock.DEFAULT for step in skipped_steps}):
+        with mock.patch.object(
+            nf_core.sync.PipelineSync,
+            "commit_template_changes",
+            autospec=True,
+            side_effect=lambda psync: setattr(psync, "made_changes", True),
+        ):
+            batch = nf_core.sync.PipelineSyncBatch(pipeline_dirs, make_pr=True, max_workers=1)
+            assert not batch.sync()
+
+    assert list(batch.failed) == [pipeline_dirs[2]]
+    assert isinstance(batch.failed[pipeline_dirs[2]], TypeError)
+    assert sorted(call.args[0] for call in mock_request_retry.call_args_list) == [
+        "https://api.github.com/repos/nf-core/first/pulls",
+        "https://api.github.com/repos/nf-core/second/pulls",
+    ]
+
+
+def test_update_template_branch_files(tmp_path):
+    """Only the template files that changed are written and committed"""
+    repo = git.Repo.init(tmp_path / "pipeline")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "nf-core")
+        config.set_value("user", "email", "core@nf-co.re")
+    pipeline_dir = Path(repo.working_tree_dir)
+    (pipeline_dir / "bin").mkdir()
+    (pipeline_dir / "main.nf").write_text("// unchanged\n")
+    (pipeline_dir / "bin" / "script.py").write_text("print('old')\n")
+    (pipeline_dir / "old.config").write_text("// removed from the template\n")
+    repo.index.add(["main.nf", "bin/script.py", "old.config"])
+    repo.index.commit("Template")
+    unchanged_mtime = os.stat(pipeline_dir / "main.nf").st_mtime_ns
+
+    def render(template_params, template_config):
+        return {
+            "main.nf": (b"// unchanged\n", 0o644),
+            "bin/script.py": (b"print('old')\n", 0o755),
+            "new.config": (b"// added to the template\n", 0o644),
+        }
+
+    psync = nf_core.sync.PipelineSync(pipeline_dir, delta=True)
+    psync.repo = repo
+    psync.wf_config = {
+        "manifest.name": "'nf-core/testpipeline'",
+        "manifest.description": "'A test pipeline'",
+        "manifest.version": "'1.0dev'",
+        "manifest.author": "'tester'",
+    }
+    with mock.patch.object(psync, "render_template", side_effect=render):
+        assert psync.update_template_branch_files()
+    assert psync.made_changes
+    assert os.stat(pipeline_dir / "main.nf").st_mtime_ns == unchanged_mtime
+    assert not (pipeline_dir / "old.config").exists()
+    assert not repo.is_dirty(untracked_files=True)
+    changes = {diff.b_path or diff.a_path: diff.change_type for diff in repo.commit("HEAD~1").diff("HEAD")}
+    assert changes == {"bin/script.py": "M", "new.config": "A", "old.config": "D"}
+    assert repo.head.commit.tree["bin/script.py"].mode == 0o100755
+
+    # Nothing changed the second time
+    with mock.patch.object(psync, "render_template", side_effect=render):
+        assert not psync.update_template_branch_files()
@@ -1,18 +1,23 @@
 """ Tests covering for utility functions.
 """
 
+import json
 import os
 import shutil
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest import mock
 
 import pytest
 import requests
+import responses
 
 import nf_core.create
 import nf_core.list
+import nf_core.startup
 import nf_core.utils
 
 from .utils import with_temporary_folder
@@ -207,3 +212,169 @@ def test_validate_file_md5():
         nf_core.utils.validate_file_md5(test_file, different_md5)
     with pytest.raises(ValueError):
         nf_core.utils.validate_file_md5(test_file, non_hex_string)
+
+
+@mock.patch("nf_core.utils.nextflow_cmd")
+def test_fetch_wf_config_cache_dependencies(mock_nextflow_cmd, tmp_path, monkeypatch):
+    """The config cache is invalidated by changes to included configs and NXF_* variables"""
+    monkeypatch.setenv("NXF_HOME", str(tmp_path / "nxf_home"))
+    monkeypatch.delenv("NXF_OFFLINE", raising=False)
+    (tmp_path / "nxf_home").mkdir()
+    pipeline_dir = tmp_path / "pipeline"
+    (pipeline_dir / "conf").mkdir(parents=True)
+    (pipeline_dir / "main.nf").write_text("params.input = null\n")
+    (pipeline_dir / "nextflow.config").write_text("includeConfig 'conf/base.config'\n")
+    (pipeline_dir / "conf" / "base.config").write_text("process.cpus = 1\n")
+    mock_nextflow_cmd.return_value = b"process.cpus = 1\n"
+
+    assert nf_core.utils.fetch_wf_config(pipeline_dir) == {"process.cpus": "1", "params.input": "null"}
+    nf_core.utils.fetch_wf_config(pipeline_dir)
+    assert mock_nextflow_cmd.call_count == 1
+
+    (pipeline_dir / "conf" / "base.config").write_text("process.cpus = 2\n")
+    nf_core.utils.fetch_wf_config(pipeline_dir)
+    assert mock_nextflow_cmd.call_count == 2
+
+    monkeypatch.setenv("NXF_OFFLINE", "true")
+    nf_core.utils.fetch_wf_config(pipeline_dir)
+    assert mock_nextflow_cmd.call_count == 3
+
+    nf_core.utils.fetch_wf_config(pipeline_dir, profile="test")
+    mock_nextflow_cmd.assert_called_with(f"nextflow config -flat -profile test {pipeline_dir}")
+    assert mock_nextflow_cmd.call_count == 4
+
+
+def test_prune_wf_config_cache(tmp_path):
+    for i in range(5):
+        cache_path = tmp_path / f"wf-config-cache-{i}.json"
+        cache_path.write_text("{}")
+        os.utime(cache_path, (1000 + i, 1000 + i))
+    nf_core.utils.prune_wf_config_cache(tmp_path, max_entries=3)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"wf-config-cache-{i}.json" for i in [2, 3, 4]]
+
+
+@pytest.fixture
+def version_cache(tmp_path, monkeypatch):
+    """Point the version check to an empty cache"""
+    monkeypatch.delenv("NFCORE_NO_VERSION_CHECK", raising=False)
+    monkeypatch.setattr(nf_core.startup, "VERSION_CACHE_FILE", str(tmp_path / "tools_version.json"))
+    monkeypatch.setattr(nf_core.startup, "_remote_version_checks", {})
+    return tmp_path / "tools_version.json"
+
+
+def test_check_if_outdated_background(version_cache):
+    """The version check doesn't wait for the request, but caches its result"""
+    request_sent = threading.Event()
+    respond = threading.Event()
+
+    def slow_fetch(source_url):
+        request_sent.set()
+        respond.wait(5)
+        return "3.0"
+
+    with mock.patch("nf_core.startup.fetch_remote_version", side_effect=slow_fetch) as mock_fetch:
+        assert nf_core.utils.check_if_outdated("2.0", timeout=0) == (False, "2.0", None)
+        assert request_sent.wait(5)
+        # A second check while the request is running doesn't send another one
+        assert nf_core.utils.check_if_outdated("2.0", timeout=0) == (False, "2.0", None)
+        respond.set()
+        assert nf_core.utils.check_if_outdated("2.0", timeout=5) == (True, "2.0", "3.0")
+        assert mock_fetch.call_count == 1
+    assert json.loads(version_cache.read_text())["remote_version"] == "3.0"
+
+
+def test_check_if_outdated_cache(version_cache):
+    source_url = "https://nf-co.re/tools_version?v=2.0"
+    nf_core.startup.write_cached_remote_version(source_url, "2.1")
+    with mock.patch("nf_core.startup.fetch_remote_version") as mock_fetch:
+        assert nf_core.utils.check_if_outdated("2.0", timeout=0) == (True, "2.0", "2.1")
+        mock_fetch.assert_not_called()
+    # The cache expires after a day
+    cache = json.loads(version_cache.read_text())
+    cache["timestamp"] -= nf_core.startup.VERSION_CACHE_MAX_AGE + 1
+    version_cache.write_text(json.dumps(cache))
+    assert nf_core.startup.read_cached_remote_version(source_url) is None
+
+
+@pytest.fixture
+def gh_session(monkeypatch):
+    """A GitHub API session with an in-memory cache"""
+    monkeypatch.setattr(nf_core.utils, "setup_requests_cachedir", lambda: {"backend": "memory", "expire_after": 3600})
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.setattr(nf_core.utils.os.path, "expanduser", lambda path: "/nonexistent")
+    session = nf_core.utils.GitHub_API_Session()
+    session.lazy_init()
+    return session
+
+
+@responses.activate
+def test_gh_api_conditional_request(gh_session):
+    url = "https://api.github.com/repos/nf-core/tools/pulls"
+    responses.get(url, json=[{"number": 1}], headers={"ETag": '"abc"'})
+    responses.get(url, status=304, match=[responses.matchers.header_matcher({"If-None-Match": '"abc"'})])
+    assert gh_session.get(url).json() == [{"number": 1}]
+    r = gh_session.get(url, refresh=True)
+    assert r.from_cache
+    assert r.json() == [{"number": 1}]
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_gh_api_get_paginated(gh_session):
+    url = "https://api.github.com/repos/nf-core/tools/branches"
+    next_url = f"{url}?per_page=100&page=2"
+    responses.get(
+        url,
+        json=[{"name": "master"}],
+        headers={"Link": f'<{next_url}>; rel="next", <{next_url}>; rel="last"'},
+        match=[responses.matchers.query_param_matcher({"per_page": "100"})],
+    )
+    responses.get(next_url, json=[{"name": "dev"}])
+    assert gh_session.get_paginated(url) == [{"name": "master"}, {"name": "dev"}]
+
+
+@responses.activate
+@mock.patch("nf_core.utils.time.sleep")
+def test_gh_api_rate_limit(mock_sleep, gh_session):
+    url = "https://api.github.com/repos/nf-core/tools"
+    reset = str(int(time.time()) + 30)
+    responses.get(url, status=403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+    responses.get(url, json={}, headers={"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": reset})
+    assert gh_session.get(url, force_refresh=True).status_code == 200
+    assert 25 < mock_sleep.call_args.args[0] <= 30
+    # Only one request left, so the next one is slowed down
+    mock_sleep.reset_mock()
+    gh_session.get(url, force_refresh=True)
+    assert 10 < mock_sleep.call_args.args[0] <= 15
+
+
+@responses.activate
+@mock.patch("nf_core.utils.time.sleep")
+def test_gh_api_request_retry_bounded(mock_sleep, gh_session):
+    url = "https://api.github.com/repos/nf-core/tools/pulls"
+    responses.post(url, status=403)
+    with pytest.raises(RuntimeError, match="got return code 403"):
+        gh_session.request_retry(url, post_data={"title": "test"})
+    assert len(responses.calls) == gh_session.retry_limit + 1
+
+
+@responses.activate
+def test_get_repo_releases_branches_github(gh_session, monkeypatch):
+    monkeypatch.setattr(nf_core.utils, "gh_api", gh_session)
+    wfs = nf_core.list.Workflows()
+    api_url = "https://api.github.com/repos/ewels/MultiQC"
+    responses.get(f"{api_url}/releases", json=[{"tag_name": "v1.0"}, {"tag_name": "v1.1"}])
+    responses.get(f"{api_url}/tags", json=[{"name": "v1.0", "commit": {"sha": "abc"}}])
+    responses.get(
+        f"{api_url}/branches",
+        json=[{"name": "main", "commit": {"sha": "def"}}, {"name": "TEMPLATE", "commit": {"sha": "ghi"}}],
+    )
+    pipeline, wf_releases, wf_branches = nf_core.utils.get_repo_releases_branches("ewels/MultiQC", wfs)
+    assert pipeline == "ewels/MultiQC"
+    assert wf_releases[0] == {"tag_name": "v1.0", "tag_sha": "abc"}
+    assert wf_branches == {"main": "def"}
+
+    for endpoint in ["releases", "tags", "branches"]:
+        responses.get(f"https://api.github.com/repos/made-up/pipeline/{endpoint}", status=404)
+    with pytest.raises(AssertionError, match="Not able to find pipeline 'made-up/pipeline'"):
+        nf_core.utils.get_repo_releases_branches("made-up/pipeline", wfs)
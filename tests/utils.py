@@ -3,6 +3,8 @@ Helper functions for tests
 """
 
 import functools
+import hashlib
+import json
 import os
 import tempfile
 from contextlib import contextmanager
@@ -108,3 +110,50 @@ def mock_biocontainers_api_calls(rsps: responses.RequestsMock, module, version):
         ],
     }
     rsps.get(biocontainers_api_url, json=biocontainers_mock, status=200)
+
+
+def mock_oci_registry_calls(rsps: responses.RequestsMock, registry, repository, tag, layers):
+    """Mock the Registry HTTP API v2 of a (local) registry serving an image with the given layer contents.
+
+    The tag resolves to a multi-platform index, which references the linux/amd64 manifest.
+    Returns the digests of the layers.
+    """
+    scheme = "http" if registry.split(":")[0] == "localhost" else "https"
+    base_url = f"{scheme}://{registry}/v2/{repository}"
+
+    def descriptor(media_type, content):
+        return {
+            "mediaType": media_type,
+            "digest": f"sha256:{hashlib.sha256(content).hexdigest()}",
+            "size": len(content),
+        }
+
+    config = json.dumps({"architecture": "amd64", "os": "linux"}).encode()
+    layer_descriptors = [descriptor("application/vnd.oci.image.layer.v1.tar+gzip", layer) for layer in layers]
+    manifest = json.dumps(
+        {
+            "schemaVersion": 2,
+            "mediaType": "application/vnd.oci.image.manifest.v1+json",
+            "config": descriptor("application/vnd.oci.image.config.v1+json", config),
+            "layers": layer_descriptors,
+        }
+    ).encode()
+    manifest_descriptor = descriptor("application/vnd.oci.image.manifest.v1+json", manifest)
+    index = {
+        "schemaVersion": 2,
+        "mediaType": "application/vnd.oci.image.index.v1+json",
+        "manifests": [
+            {
+                **manifest_descriptor,
+                "platform": {"architecture": "arm64", "os": "linux"},
+                "digest": "sha256:" + "0" * 64,
+            },
+            {**manifest_descriptor, "platform": {"architecture": "amd64", "os": "linux"}},
+        ],
+    }
+    rsps.get(f"{base_url}/manifests/{tag}", json=index, status=200)
+    rsps.get(f"{base_url}/manifests/{manifest_descriptor['digest']}", body=manifest, status=200)
+    rsps.get(f"{base_url}/blobs/{descriptor('', config)['digest']}", body=config, status=200)
+    for layer_descriptor, layer in zip(layer_descriptors, layers):
+        rsps.get(f"{base_url}/blobs/{layer_descriptor['digest']}", body=layer, status=200)
+    return [layer_descriptor["digest"] for layer_descriptor in layer_descriptors]